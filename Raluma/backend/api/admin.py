@@ -0,0 +1,76 @@
+"""
+Служебные операции администратора.
+POST /api/admin/backups         → запустить бэкап БД (202)
+GET  /api/admin/backups/status  → ход последнего бэкапа
+GET  /api/admin/backups         → список файлов бэкапов
+GET  /api/admin/queries         → самые дорогие запросы к БД
+DELETE /api/admin/queries       → сбросить статистику запросов
+GET  /api/admin/profile         → профиль процесса за N секунд (speedscope JSON)
+"""
+
+from dataclasses import asdict
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+import models
+import backup
+import profiler
+import query_stats
+from auth import require_admin
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.post("/backups", status_code=202)
+def start_backup(
+    incremental: bool = False,
+    current_user: models.User = Depends(require_admin),
+):
+    try:
+        status = backup.start_backup(incremental)
+    except backup.BackupBusy:
+        raise HTTPException(status_code=409, detail="Бэкап уже выполняется")
+    return asdict(status)
+
+
+@router.get("/backups/status")
+def backup_status(current_user: models.User = Depends(require_admin)):
+    status = backup.current_status()
+    if status is None:
+        raise HTTPException(status_code=404, detail="Бэкап ещё не запускался")
+    return asdict(status)
+
+
+@router.get("/backups")
+def list_backups(current_user: models.User = Depends(require_admin)):
+    return backup.list_backups()
+
+
+@router.get("/queries")
+def top_queries(
+    limit: int = Query(default=20, ge=1, le=500),
+    order: Literal["total", "max", "avg", "count"] = "total",
+    current_user: models.User = Depends(require_admin),
+):
+    return query_stats.top(limit, order)
+
+
+@router.delete("/queries")
+def reset_queries(current_user: models.User = Depends(require_admin)):
+    query_stats.reset()
+    return {"ok": True}
+
+
+@router.get("/profile")
+def profile_process(
+    seconds: float = Query(default=10, gt=0, le=profiler.MAX_SECONDS),
+    interval_ms: float = Query(default=profiler.INTERVAL_MS, ge=1, le=1000),
+    current_user: models.User = Depends(require_admin),
+):
+    """Снять профиль всех потоков воркера. Открывать в speedscope.app."""
+    try:
+        return profiler.profile_process(seconds, interval_ms)
+    except profiler.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="Профайлер уже запущен")
@@ -1,30 +1,57 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
 from database import get_db
 import models
 import schemas
-from auth import verify_password, create_access_token, get_current_user
+import login_limiter
+import metrics
+from auth import (
+    verify_password,
+    hash_password,
+    needs_rehash,
+    create_access_token,
+    get_current_user,
+    invalidate_user,
+)
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=schemas.TokenResponse)
-def login(data: schemas.LoginRequest, db: Session = Depends(get_db)):
+def login(data: schemas.LoginRequest, request: Request, db: Session = Depends(get_db)):
+    # Лимит проверяется до БД и bcrypt — перебор не должен стоить CPU
+    ip = login_limiter.client_ip(request)
+    wait = login_limiter.attempt(data.username, ip)
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много попыток входа, попробуйте позже",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
     user = db.query(models.User).filter(models.User.username == data.username).first()
     if not user or not verify_password(data.password, user.password_hash):
+        login_limiter.failed(data.username, ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный логин или пароль",
         )
+    login_limiter.succeeded(data.username, ip)
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Аккаунт деактивирован",
         )
+    # Сменилась BCRYPT_ROUNDS — пароль известен, перехэшируем незаметно
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(data.password)
+        metrics.inc("raluma_password_rehash_total")
     user.last_login = datetime.utcnow()
     db.commit()
+    invalidate_user(user.id)  # /me должен показать новый last_login
     token = create_access_token(user.id, user.username, user.role)
     return {"access_token": token}
 
@@ -0,0 +1,46 @@
+"""
+Сводная спецификация проекта.
+GET /api/projects/{pid}/bom?format=json|csv
+"""
+
+from dataclasses import asdict
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models
+from auth import get_current_user
+from api.projects import _get_project_or_404
+from engine.bom import aggregate_bom, bom_csv
+from engine.slide_calc import calculate_slide_cached
+
+router = APIRouter(prefix="/api/projects", tags=["bom"])
+
+
+@router.get("/{project_id}/bom")
+def project_bom(
+    project_id: int,
+    format: str = Query(default="json", pattern="^(json|csv)$"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    project = _get_project_or_404(project_id, db, current_user)
+    sections = [s for s in project.sections if s.system == "СЛАЙД"]
+    # Расчёт берётся из LRU: после правки одной секции пересчитывается только она
+    lines = aggregate_bom([calculate_slide_cached(s) for s in sections])
+    if format == "csv":
+        filename = quote(f"Спецификация_{project.number}.csv")
+        return Response(
+            # utf-8-sig — чтобы Excel узнал кодировку
+            bom_csv(lines).encode("utf-8-sig"),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
+        )
+    return {
+        "project_id": project.id,
+        "sections": len(sections),
+        "lines": [asdict(line) for line in lines],
+    }
@@ -0,0 +1,51 @@
+"""
+Расчёт без сохранения — для живого предпросмотра в редакторе.
+POST /api/calc/slide       → SlideCalcResult по данным формы секции
+POST /api/calc/slide/batch → расчёт по столбцам для списка секций
+                             (не больше CALC_BATCH_MAX, иначе 422)
+"""
+
+import json
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Annotated
+
+from fastapi import APIRouter, Body, Depends
+from fastapi.responses import Response
+
+import models
+import schemas
+from auth import get_current_user
+from engine.slide_calc import CALC_CACHE_SIZE, calc_key, calculate_by_key
+from engine.slide_batch import (
+    BATCH_MAX,
+    calculate_slide_batch,
+    columns_from_sections,
+)
+
+router = APIRouter(prefix="/api/calc", tags=["calc"])
+
+
+@lru_cache(maxsize=CALC_CACHE_SIZE)
+def _calc_json(key: tuple) -> bytes:
+    # Сериализуем сами и кэшируем готовые байты: jsonable_encoder дороже расчёта
+    result = calculate_by_key(key)
+    return json.dumps(asdict(result), ensure_ascii=False).encode()
+
+
+@router.post("/slide")
+def calc_slide(
+    data: schemas.SectionBase,
+    current_user: models.User = Depends(get_current_user),
+):
+    return Response(_calc_json(calc_key(data)), media_type="application/json")
+
+
+@router.post("/slide/batch")
+def calc_slide_batch(
+    data: Annotated[list[schemas.SectionBase], Body(max_length=BATCH_MAX)],
+    current_user: models.User = Depends(get_current_user),
+):
+    columns = calculate_slide_batch(columns_from_sections(data))
+    body = {"count": len(data), "columns": columns}
+    return Response(json.dumps(body, ensure_ascii=False), media_type="application/json")
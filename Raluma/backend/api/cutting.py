@@ -0,0 +1,76 @@
+"""
+Раскрой профилей из хлыстов.
+GET  /api/projects/{pid}/cutting → план раскроя одного проекта
+POST /api/cutting                → общий раскрой нескольких проектов
+"""
+
+from dataclasses import asdict
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models
+import schemas
+from auth import get_current_user
+from api.projects import _get_project_or_404
+from engine import cutting
+from engine.slide_calc import calculate_slide_cached
+
+router = APIRouter(prefix="/api", tags=["cutting"])
+
+
+def _settings(
+    stock: Optional[List[float]], kerf: Optional[float], trim: Optional[float]
+):
+    stock = stock or list(cutting.STOCK_LENGTHS)
+    kerf = cutting.KERF_MM if kerf is None else kerf
+    trim = cutting.TRIM_MM if trim is None else trim
+    if any(s <= 0 for s in stock) or kerf < 0 or trim < 0 or trim >= max(stock):
+        raise HTTPException(status_code=400, detail="Некорректные параметры раскроя")
+    return stock, kerf, trim
+
+
+def project_cutting_plan(projects, stock=None, kerf=None, trim=None) -> cutting.CutPlan:
+    """План раскроя по всем секциям СЛАЙД перечисленных проектов."""
+    stock, kerf, trim = _settings(stock, kerf, trim)
+    results = [
+        calculate_slide_cached(s)
+        for p in projects
+        for s in p.sections
+        if s.system == "СЛАЙД"
+    ]
+    return cutting.optimize_cutting(
+        cutting.pieces_from_results(results), stock, kerf, trim
+    )
+
+
+@router.get("/projects/{project_id}/cutting")
+def get_project_cutting(
+    project_id: int,
+    stock: Optional[List[float]] = Query(default=None),
+    kerf: Optional[float] = None,
+    trim: Optional[float] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    project = _get_project_or_404(project_id, db, current_user)
+    plan = project_cutting_plan([project], stock, kerf, trim)
+    return {"project_ids": [project.id], **asdict(plan)}
+
+
+@router.post("/cutting")
+def get_cutting(
+    data: schemas.CuttingRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    if not data.project_ids:
+        raise HTTPException(status_code=400, detail="Не выбраны проекты")
+    project_ids = list(dict.fromkeys(data.project_ids))
+    projects = [_get_project_or_404(pid, db, current_user) for pid in project_ids]
+    plan = project_cutting_plan(
+        projects, data.stock_lengths, data.kerf_mm, data.trim_mm
+    )
+    return {"project_ids": project_ids, **asdict(plan)}
@@ -2,65 +2,138 @@
 Эндпоинты для производственных документов.
 GET  /api/projects/{pid}/sections/{sid}/preview  → HTML для iframe
 GET  /api/projects/{pid}/sections/{sid}/pdf      → PDF файл
+GET  /api/projects/{pid}/pdf                     → PDF всех листов СЛАЙД проекта
 PATCH /api/projects/{pid}/sections/{sid}/overrides → сохранить правки
+
+У preview и pdf листа ?profile=1 (только админ) возвращает вместо документа
+профиль его генерации в формате speedscope — см. profiler.py.
 """
 
-import io
 import json
 
 from typing import Optional
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from database import get_db
+import metrics
 import models
-from auth import get_current_user, decode_token
+import profiler
+import tracing
+from auth import get_current_user, decode_token, load_active_user
+from api.projects import _get_project_or_404
 from engine.slide_calc import calculate_slide
-from engine.pdf import render_preview, render_pdf_html, generate_pdf
+from api.cutting import project_cutting_plan
+from engine.pdf import (
+    render_preview,
+    render_pdf_html,
+    render_cutting_html,
+    render_sheet_html,
+    STAGE,
+    PDF_BYTES,
+)
+from engine import pdf_cache, render_pool
 
 router = APIRouter(prefix="/api/projects", tags=["documents"])
 
 
+@tracing.traced("db_section")
 def _get_section_or_404(
     project_id: int, section_id: int, db: Session, current_user: models.User
 ):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Проект не найден")
-    if current_user.role == "user" and project.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Нет доступа")
-    section = (
-        db.query(models.Section)
+    # Один запрос по первичным ключам; разбор причины — только при промахе
+    row = (
+        db.query(models.Section, models.Project)
+        .join(models.Project, models.Section.project_id == models.Project.id)
         .filter(
             models.Section.id == section_id,
             models.Section.project_id == project_id,
         )
         .first()
     )
+    if row:
+        section, project = row
+    else:
+        project = (
+            db.query(models.Project).filter(models.Project.id == project_id).first()
+        )
+        section = None
+    if not project:
+        raise HTTPException(status_code=404, detail="Проект не найден")
+    if current_user.role == "user" and project.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Нет доступа")
     if not section:
         raise HTTPException(status_code=404, detail="Секция не найдена")
     return project, section
 
 
+@tracing.traced("auth")
 def _get_user_by_token(token: Optional[str], db: Session) -> models.User:
     """Аутентификация через query-параметр ?token= (для iframe)."""
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     payload = decode_token(token)
-    user = db.query(models.User).filter(models.User.id == int(payload["sub"])).first()
-    if not user or not user.is_active:
+    user = load_active_user(int(payload["sub"]), db)
+    if user is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
     return user
 
 
+def _calculate(section):
+    with tracing.span("calc"), metrics.timer(STAGE, stage="calc"):
+        return calculate_slide(section)
+
+
+def _profiled(current_user: models.User, name: str, fn, *args) -> JSONResponse:
+    """?profile=1: выполнить fn под профайлером и вернуть speedscope JSON."""
+    if current_user.role not in ("admin", "superadmin"):
+        raise HTTPException(status_code=403, detail="Недостаточно прав")
+    try:
+        return JSONResponse(profiler.profile_call(name, fn, *args))
+    except profiler.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="Профайлер уже запущен")
+
+
+def _sheet_html(project, section, is_pdf: bool) -> str:
+    """Расчёт и HTML листа без метрик и спанов — то, что повторяет профайлер."""
+    return render_sheet_html(project, section, calculate_slide(section), is_pdf)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def pdf_filename(project, section) -> str:
+    return f"ПЛ_{project.number}_сек{section.order}.pdf"
+
+
+def _attachment_headers(filename: str) -> dict:
+    encoded = quote(filename)
+    return {"Content-Disposition": f"attachment; filename*=UTF-8''{encoded}"}
+
+
+def pdf_response(pdf_bytes: bytes, filename: str) -> Response:
+    return Response(
+        pdf_bytes,
+        media_type="application/pdf",
+        headers=_attachment_headers(filename),
+    )
+
+
 @router.get("/{project_id}/sections/{section_id}/preview", response_class=HTMLResponse)
 def preview_section(
     project_id: int,
     section_id: int,
     token: Optional[str] = Query(default=None),
+    profile: bool = Query(default=False),
+    if_none_match: Optional[str] = Header(default=None),
     db: Session = Depends(get_db),
 ):
     current_user = _get_user_by_token(token, db)
@@ -69,15 +142,75 @@ def preview_section(
         return HTMLResponse(
             "<p style='padding:20px;font-family:sans-serif'>Производственный лист доступен только для системы СЛАЙД</p>"
         )
-    calc = calculate_slide(section)
+    if profile:
+        return _profiled(
+            current_user,
+            f"preview {project.number} сек{section.order}",
+            _sheet_html,
+            project,
+            section,
+            False,
+        )
+    # ETag — от того же состояния, что и ключ PDF-кэша: без изменений 304 без расчёта
+    etag = f'"{pdf_cache.cache_key(project, section)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    calc = _calculate(section)
     html = render_preview(project, section, calc)
-    return HTMLResponse(html)
+    return HTMLResponse(html, headers=headers)
+
+
+def _render_section_pdf(project, section) -> bytes:
+    calc = _calculate(section)
+    html = render_pdf_html(project, section, calc)
+    try:
+        with tracing.span("render_pdf"), metrics.timer(STAGE, stage="render_pdf"):
+            pdf_bytes = render_pool.render(html)
+    except render_pool.RenderTimeout:
+        raise HTTPException(status_code=504, detail="Превышено время рендеринга PDF")
+    metrics.inc(PDF_BYTES, len(pdf_bytes), kind="section")
+    return pdf_bytes
+
+
+def _render_project_pdf(project, sections) -> bytes:
+    """
+    Листы рендерятся в render_pool (готовые берутся из кэша листов),
+    затем склеиваются вместе с картой раскроя одной задачей пула.
+    """
+    parts: list[bytes | None] = []
+    pending = []
+    for section in sections:
+        key = pdf_cache.cache_key(project, section)
+        cached = pdf_cache.get(key)
+        if cached is None:
+            html = render_pdf_html(project, section, _calculate(section))
+            pending.append((len(parts), key, render_pool.submit(html)))
+        parts.append(cached)
+    html = render_cutting_html([project], project_cutting_plan([project]))
+    pending.append((len(parts), None, render_pool.submit(html)))
+    parts.append(None)
+    try:
+        with tracing.span("render_pdf"), metrics.timer(STAGE, stage="render_pdf"):
+            for i, key, future in pending:
+                parts[i] = render_pool.wait(future)
+                if key is not None:
+                    pdf_cache.put(key, parts[i])
+            pdf_bytes = render_pool.merge(parts)
+    except render_pool.RenderTimeout:
+        raise HTTPException(status_code=504, detail="Превышено время рендеринга PDF")
+    finally:
+        for _, _, future in pending:
+            future.cancel()
+    metrics.inc(PDF_BYTES, len(pdf_bytes), kind="project")
+    return pdf_bytes
 
 
 @router.get("/{project_id}/sections/{section_id}/pdf")
 def download_pdf(
     project_id: int,
     section_id: int,
+    profile: bool = Query(default=False),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -86,19 +219,52 @@ def download_pdf(
         raise HTTPException(
             status_code=400, detail="PDF доступен только для системы СЛАЙД"
         )
-    calc = calculate_slide(section)
-    html = render_pdf_html(project, section, calc)
-    pdf_bytes = generate_pdf(html)
-    filename = f"ПЛ_{project.number}_сек{section.order}.pdf"
-    from urllib.parse import quote
-    encoded = quote(filename)
-    return StreamingResponse(
-        io.BytesIO(pdf_bytes),
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded}"
-        },
-    )
+    if profile:
+        # Профилируются расчёт и HTML в процессе API; вёрстка WeasyPrint идёт
+        # в render_pool и сюда не попадает (см. profiler.py)
+        return _profiled(
+            current_user,
+            f"pdf {project.number} сек{section.order}",
+            _sheet_html,
+            project,
+            section,
+            True,
+        )
+    key = pdf_cache.cache_key(project, section)
+    pdf_bytes = pdf_cache.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = _render_section_pdf(project, section)
+        pdf_cache.put(key, pdf_bytes)
+    return pdf_response(pdf_bytes, pdf_filename(project, section))
+
+
+@router.get("/{project_id}/pdf")
+def download_project_pdf(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Все листы СЛАЙД проекта и карта раскроя одним PDF.
+
+    Ответ не стримится: листы рендерятся в render_pool (каждый — отдельный
+    PDF), и склеить их можно только целиком, после готовности последнего.
+    Первый байт уходит после склейки; повторные запросы — из кэша.
+    """
+    project = _get_project_or_404(project_id, db, current_user)
+    sections = [s for s in project.sections if s.system == "СЛАЙД"]
+    if not sections:
+        raise HTTPException(
+            status_code=400, detail="В проекте нет секций системы СЛАЙД"
+        )
+    filename = f"ПЛ_{project.number}.pdf"
+    key = pdf_cache.project_cache_key(project, sections)
+    cached = pdf_cache.get(key)
+    if cached is not None:
+        return pdf_response(cached, filename)
+    pdf_bytes = _render_project_pdf(project, sections)
+    pdf_cache.put(key, pdf_bytes)
+    return pdf_response(pdf_bytes, filename)
 
 
 class OverridesPayload(BaseModel):
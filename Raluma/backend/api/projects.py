@@ -1,19 +1,31 @@
+import base64
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, selectinload
 
 from database import get_db
 import models
 import schemas
 from auth import get_current_user
+from project_copy import copy_projects
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
 
 def _get_project_or_404(
-    project_id: int, db: Session, current_user: models.User
+    project_id: int, db: Session, current_user: models.User, options=()
 ) -> models.Project:
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    """options — стратегии загрузки (selectinload и т.п.) для этого запроса."""
+    project = (
+        db.query(models.Project)
+        .options(*options)
+        .filter(models.Project.id == project_id)
+        .first()
+    )
     if not project:
         raise HTTPException(status_code=404, detail="Проект не найден")
     # user видит только свои проекты; admin/superadmin видят все
@@ -22,15 +34,122 @@ def _get_project_or_404(
     return project
 
 
+# ?fields=summary — секции без тяжёлых полей, для списка секций в редакторе
+SECTION_SUMMARY_FIELDS = (
+    "id",
+    "project_id",
+    "order",
+    "name",
+    "system",
+    "width",
+    "height",
+    "panels",
+    "quantity",
+)
+
+
+def _section_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """fields=summary | через запятую имена полей SectionOut; None — все поля."""
+    if fields is None:
+        return None
+    if fields == "summary":
+        return SECTION_SUMMARY_FIELDS
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(names) - set(schemas.SectionOut.model_fields))
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Неизвестные поля секции: {', '.join(unknown)}"
+        )
+    return tuple(dict.fromkeys(["id", *names]))
+
+
+def _sections_loader(fields: Optional[tuple[str, ...]]):
+    """Секции одним SELECT ... IN; при fields — только нужные колонки."""
+    loader = selectinload(models.Project.sections)
+    if fields is not None:
+        loader = loader.load_only(*(getattr(models.Section, f) for f in fields))
+    return loader
+
+
+def _project_out(project: models.Project, fields: Optional[tuple[str, ...]]):
+    """Ответ без обращений к БД — можно собрать до commit()."""
+    if fields is None:
+        return schemas.ProjectOut.model_validate(project)
+    data = schemas.ProjectList.model_validate(project).model_dump(mode="json")
+    data["sections"] = [{f: getattr(s, f) for f in fields} for s in project.sections]
+    return JSONResponse(data)
+
+
+def _encode_cursor(project: models.Project) -> str:
+    raw = f"{project.created_at.isoformat()}|{project.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, project_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(project_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def _like_prefix(value: str) -> str:
+    """Шаблон LIKE «начинается с value»: % и _ из ввода — буквальные."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
 @router.get("", response_model=list[schemas.ProjectList])
 def list_projects(
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    customer: Optional[str] = None,
+    status: Optional[str] = None,
+    glass_status: Optional[str] = None,
+    paint_status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    query = db.query(models.Project)
+    """
+    Проекты от новых к старым. Без limit — весь список (как раньше).
+    С limit — страница; курсор следующей страницы в заголовке X-Next-Cursor
+    (keyset по (created_at, id): любая страница — один проход по индексу).
+    customer — начало имени заказчика (LIKE по индексу NOCASE): регистр
+    не учитывается только у латиницы, кириллицу ищите в нужном регистре
+    или полнотекстовым поиском (/api/search).
+    """
+    P = models.Project
+    query = db.query(P)
     if current_user.role == "user":
-        query = query.filter(models.Project.created_by == current_user.id)
-    return query.order_by(models.Project.created_at.desc()).all()
+        query = query.filter(P.created_by == current_user.id)
+    for column, value in (
+        (P.status, status),
+        (P.glass_status, glass_status),
+        (P.paint_status, paint_status),
+    ):
+        if value is not None:
+            query = query.filter(column == value)
+    if customer:
+        query = query.filter(P.customer.like(_like_prefix(customer), escape="\\"))
+    if created_from is not None:
+        query = query.filter(P.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(P.created_at < created_to)
+    if cursor:
+        query = query.filter(tuple_(P.created_at, P.id) < _decode_cursor(cursor))
+    query = query.order_by(P.created_at.desc(), P.id.desc())
+    if limit is None:
+        return query.all()
+
+    projects = query.limit(limit + 1).all()
+    if len(projects) > limit:
+        projects = projects[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(projects[-1])
+    return projects
 
 
 @router.post("", response_model=schemas.ProjectOut, status_code=201)
@@ -56,26 +175,37 @@ def create_project(
 @router.get("/{project_id}", response_model=schemas.ProjectOut)
 def get_project(
     project_id: int,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    return _get_project_or_404(project_id, db, current_user)
+    section_fields = _section_fields(fields)
+    project = _get_project_or_404(
+        project_id, db, current_user, options=[_sections_loader(section_fields)]
+    )
+    return _project_out(project, section_fields)
 
 
 @router.put("/{project_id}", response_model=schemas.ProjectOut)
 def update_project(
     project_id: int,
     data: schemas.ProjectUpdate,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    project = _get_project_or_404(project_id, db, current_user)
+    section_fields = _section_fields(fields)
+    project = _get_project_or_404(
+        project_id, db, current_user, options=[_sections_loader(section_fields)]
+    )
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(project, field, value)
     project.updated_at = datetime.utcnow()
+    # Ответ собираем до commit: все значения уже в объекте, перечитывать
+    # проект и секции после commit (expire) не нужно
+    out = _project_out(project, section_fields)
     db.commit()
-    db.refresh(project)
-    return project
+    return out
 
 
 @router.delete("/{project_id}", status_code=204)
@@ -89,99 +219,48 @@ def delete_project(
     db.commit()
 
 
+@router.post("/copy", response_model=list[schemas.ProjectList], status_code=201)
+def copy_many_projects(
+    data: schemas.ProjectCopyRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Копии нескольких проектов одним запросом (в одной транзакции)."""
+    project_ids = list(dict.fromkeys(data.project_ids))
+    if not project_ids:
+        raise HTTPException(status_code=400, detail="Не выбраны проекты")
+    found = {
+        p.id: p
+        for p in db.query(models.Project).filter(models.Project.id.in_(project_ids))
+    }
+    for project_id in project_ids:
+        project = found.get(project_id)
+        if project is None:
+            raise HTTPException(status_code=404, detail="Проект не найден")
+        if current_user.role == "user" and project.created_by != current_user.id:
+            raise HTTPException(status_code=403, detail="Нет доступа к проекту")
+    new_ids = copy_projects(db, project_ids, current_user.id, data.with_overrides)
+    db.commit()
+    copies = {
+        p.id: p for p in db.query(models.Project).filter(models.Project.id.in_(new_ids))
+    }
+    return [copies[i] for i in new_ids]
+
+
 @router.post("/{project_id}/copy", response_model=schemas.ProjectOut, status_code=201)
 def copy_project(
     project_id: int,
+    with_overrides: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    source = _get_project_or_404(project_id, db, current_user)
-    new_project = models.Project(
-        number=source.number + "-копия",
-        customer=source.customer,
-        system=source.system,
-        subtype=source.subtype,
-        extra_parts=source.extra_parts,
-        comments=source.comments,
-        production_stages=source.production_stages,
-        status=source.status,
-        glass_status=source.glass_status,
-        glass_invoice=source.glass_invoice,
-        glass_ready_date=source.glass_ready_date,
-        paint_status=source.paint_status,
-        paint_ship_date=source.paint_ship_date,
-        paint_received_date=source.paint_received_date,
-        current_stage=source.current_stage,
-        order_items=source.order_items,
-        created_by=current_user.id,
+    _get_project_or_404(project_id, db, current_user)
+    [new_id] = copy_projects(db, [project_id], current_user.id, with_overrides)
+    # Копию читаем и сериализуем в той же транзакции — после commit
+    # ни пользователь, ни проект не перечитываются
+    copy = _get_project_or_404(
+        new_id, db, current_user, options=[_sections_loader(None)]
     )
-    db.add(new_project)
-    db.flush()
-    for s in source.sections:
-        new_section = models.Section(
-            project_id=new_project.id,
-            order=s.order,
-            name=s.name,
-            system=s.system,
-            width=s.width,
-            height=s.height,
-            panels=s.panels,
-            quantity=s.quantity,
-            glass_type=s.glass_type,
-            painting_type=s.painting_type,
-            ral_color=s.ral_color,
-            corner_left=s.corner_left,
-            corner_right=s.corner_right,
-            external_width=s.external_width,
-            rails=s.rails,
-            threshold=s.threshold,
-            first_panel_inside=s.first_panel_inside,
-            unused_track=s.unused_track,
-            inter_glass_profile=s.inter_glass_profile,
-            profile_left=s.profile_left,
-            profile_right=s.profile_right,
-            lock=s.lock,
-            handle=s.handle,
-            floor_latches_left=s.floor_latches_left,
-            floor_latches_right=s.floor_latches_right,
-            handle_offset_left=s.handle_offset_left,
-            handle_offset_right=s.handle_offset_right,
-            profile_left_wall=s.profile_left_wall,
-            profile_left_lock_bar=s.profile_left_lock_bar,
-            profile_left_p_bar=s.profile_left_p_bar,
-            profile_left_handle_bar=s.profile_left_handle_bar,
-            profile_left_bubble=s.profile_left_bubble,
-            profile_right_wall=s.profile_right_wall,
-            profile_right_lock_bar=s.profile_right_lock_bar,
-            profile_right_p_bar=s.profile_right_p_bar,
-            profile_right_handle_bar=s.profile_right_handle_bar,
-            profile_right_bubble=s.profile_right_bubble,
-            lock_left=s.lock_left,
-            lock_right=s.lock_right,
-            slide_rows=s.slide_rows,
-            center_handle=s.center_handle,
-            center_lock=s.center_lock,
-            center_handle_offset=s.center_handle_offset,
-            center_floor_latches_left=s.center_floor_latches_left,
-            center_floor_latches_right=s.center_floor_latches_right,
-            book_subtype=s.book_subtype,
-            handle_left=s.handle_left,
-            handle_right=s.handle_right,
-            doors=s.doors,
-            door_side=s.door_side,
-            door_type=s.door_type,
-            door_opening=s.door_opening,
-            compensator=s.compensator,
-            angle_left=s.angle_left,
-            angle_right=s.angle_right,
-            book_system=s.book_system,
-            door_system=s.door_system,
-            cs_shape=s.cs_shape,
-            cs_width2=s.cs_width2,
-            extra_parts=s.extra_parts,
-            comments=s.comments,
-        )
-        db.add(new_section)
+    out = _project_out(copy, None)
     db.commit()
-    db.refresh(new_project)
-    return new_project
+    return out
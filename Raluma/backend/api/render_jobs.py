@@ -0,0 +1,92 @@
+"""
+Фоновый рендер PDF через пул процессов.
+POST /api/projects/{pid}/sections/{sid}/pdf-jobs → создать задачу (202; 503 — очередь полна)
+GET  /api/render-jobs/{job_id}                   → статус: queued | running | done | failed
+GET  /api/render-jobs/{job_id}/pdf               → готовый PDF
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models
+from auth import get_current_user
+from engine.pdf import render_pdf_html
+from engine import pdf_cache, render_pool
+from api.documents import (
+    _calculate,
+    _get_section_or_404,
+    pdf_filename,
+    pdf_response,
+)
+
+router = APIRouter(prefix="/api", tags=["render-jobs"])
+
+
+def _job_out(job: render_pool.RenderJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "error": job.error,
+        "filename": job.filename,
+    }
+
+
+def _get_job_or_404(job_id: str, current_user: models.User) -> render_pool.RenderJob:
+    job = render_pool.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    if current_user.role == "user" and job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Нет доступа")
+    return job
+
+
+@router.post("/projects/{project_id}/sections/{section_id}/pdf-jobs", status_code=202)
+def create_pdf_job(
+    project_id: int,
+    section_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    project, section = _get_section_or_404(project_id, section_id, db, current_user)
+    if section.system != "СЛАЙД":
+        raise HTTPException(
+            status_code=400, detail="PDF доступен только для системы СЛАЙД"
+        )
+    key = pdf_cache.cache_key(project, section)
+    cached = pdf_cache.get(key)
+    html = None
+    if cached is None:
+        html = render_pdf_html(project, section, _calculate(section))
+    try:
+        job = render_pool.create_job(
+            html, key, current_user.id, pdf_filename(project, section), result=cached
+        )
+    except render_pool.RenderQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Очередь рендеринга заполнена, повторите позже",
+            headers={"Retry-After": "5"},
+        )
+    return _job_out(job)
+
+
+@router.get("/render-jobs/{job_id}")
+def get_render_job(
+    job_id: str,
+    current_user: models.User = Depends(get_current_user),
+):
+    return _job_out(_get_job_or_404(job_id, current_user))
+
+
+@router.get("/render-jobs/{job_id}/pdf")
+def get_render_job_pdf(
+    job_id: str,
+    current_user: models.User = Depends(get_current_user),
+):
+    job = _get_job_or_404(job_id, current_user)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail="PDF ещё не готов")
+    return pdf_response(job.result, job.filename)
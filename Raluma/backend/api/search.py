@@ -0,0 +1,77 @@
+"""
+Полнотекстовый поиск по проектам и секциям (FTS5, см. migrations.FTS_TABLES).
+GET /api/search?q=
+"""
+
+import re
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models
+from auth import get_current_user
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_MAX_TOKENS = 8
+
+# bm25: веса колонок в порядке migrations.FTS_TABLES
+_PROJECTS_SQL = """
+SELECT p.id, p.number, p.customer, p.status,
+       snippet(projects_fts, -1, '[', ']', '…', 8) AS snippet,
+       bm25(projects_fts, 10.0, 5.0, 1.0, 1.0) AS rank
+FROM projects_fts
+JOIN projects p ON p.id = projects_fts.rowid
+WHERE projects_fts MATCH :q {owner}
+ORDER BY rank
+LIMIT :limit
+"""
+
+_SECTIONS_SQL = """
+SELECT s.id, s.project_id, s.name, s.ral_color, p.number AS project_number,
+       snippet(sections_fts, -1, '[', ']', '…', 8) AS snippet,
+       bm25(sections_fts, 5.0, 1.0, 3.0) AS rank
+FROM sections_fts
+JOIN sections s ON s.id = sections_fts.rowid
+JOIN projects p ON p.id = s.project_id
+WHERE sections_fts MATCH :q {owner}
+ORDER BY rank
+LIMIT :limit
+"""
+
+
+def fts_query(q: str) -> str:
+    """
+    Пользовательская строка → запрос FTS5: все слова обязательны,
+    каждое как префикс («слай» найдёт «СЛАЙД»). Операторы FTS5 из ввода
+    не проходят — каждое слово берётся в кавычки.
+    """
+    tokens = _TOKEN.findall(q)[:_MAX_TOKENS]
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+@router.get("/search")
+def search(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    match = fts_query(q)
+    if not match:
+        return {"projects": [], "sections": []}
+    params = {"q": match, "limit": limit}
+    owner = ""
+    # user видит только свои проекты; admin/superadmin видят все
+    if current_user.role == "user":
+        owner = "AND p.created_by = :uid"
+        params["uid"] = current_user.id
+    projects = db.execute(text(_PROJECTS_SQL.format(owner=owner)), params)
+    sections = db.execute(text(_SECTIONS_SQL.format(owner=owner)), params)
+    return {
+        "projects": [dict(row._mapping) for row in projects],
+        "sections": [dict(row._mapping) for row in sections],
+    }
@@ -36,6 +36,28 @@ def list_sections(
     )
 
 
+@router.get("/{project_id}/sections/{section_id}", response_model=schemas.SectionOut)
+def get_section(
+    project_id: int,
+    section_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Полные данные одной секции (редактор грузит их по требованию)."""
+    _get_project_or_403(project_id, db, current_user)
+    section = (
+        db.query(models.Section)
+        .filter(
+            models.Section.id == section_id,
+            models.Section.project_id == project_id,
+        )
+        .first()
+    )
+    if not section:
+        raise HTTPException(status_code=404, detail="Секция не найдена")
+    return section
+
+
 @router.post(
     "/{project_id}/sections", response_model=schemas.SectionOut, status_code=201
 )
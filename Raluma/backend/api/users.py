@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 import models
 import schemas
-from auth import require_admin, hash_password, generate_password
+from auth import require_admin, hash_password, generate_password, invalidate_user
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -90,6 +90,7 @@ def update_user(
     if data.password:
         user.password_hash = hash_password(data.password)
     db.commit()
+    invalidate_user(user_id)
     db.refresh(user)
     return user
 
@@ -109,6 +110,7 @@ def delete_user(
         raise HTTPException(status_code=403, detail="Недостаточно прав")
     db.delete(user)
     db.commit()
+    invalidate_user(user_id)
 
 
 @router.post("/{user_id}/reset-password", response_model=schemas.ResetPasswordResponse)
@@ -125,4 +127,5 @@ def reset_password(
     new_password = generate_password()
     user.password_hash = hash_password(new_password)
     db.commit()
+    invalidate_user(user_id)
     return {"new_password": new_password}
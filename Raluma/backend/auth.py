@@ -1,6 +1,10 @@
 import os
 import secrets
 import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
 
 import bcrypt
@@ -10,21 +14,104 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from database import get_db
+import metrics
 import models
+import tracing
 
 SECRET_KEY = os.getenv("SECRET_KEY", "change-me-in-production-please-use-env-var")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 часа
 
+# Сколько секунд запись пользователя живёт в кэше процесса. Правки через
+# api/users и вход сбрасывают запись сразу; TTL ограничивает устаревание,
+# если БД меняют в обход (другой процесс, ручной SQL). 0 — кэш выключен.
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+
+# bcrypt: стоимость (2^rounds итераций) и отдельный ограниченный пул.
+# bcrypt отпускает GIL, но съедает ~250 мс CPU при rounds=12 — без пула
+# утренний поток входов занимает весь threadpool. HASH_WORKERS хэшей
+# выполняются одновременно, ещё HASH_QUEUE ждут; остальным — 503 сразу.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+HASH_QUEUE = int(os.getenv("HASH_QUEUE", "16"))
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT", "10"))
+
 bearer_scheme = HTTPBearer()
 
+_hash_executor = ThreadPoolExecutor(
+    max_workers=max(1, HASH_WORKERS), thread_name_prefix="bcrypt"
+)
+_hash_slots = threading.BoundedSemaphore(max(1, HASH_WORKERS) + HASH_QUEUE)
+
+metrics.counter("raluma_password_hash_rejected_total", "bcrypt: отказ, очередь полна")
+metrics.counter("raluma_password_rehash_total", "Пароль перехэширован при входе")
+
+_USER_COLUMNS = [c.key for c in models.User.__table__.columns]
+_user_cache: dict[int, tuple[float, dict]] = {}  # id → (истекает, значения колонок)
+_user_cache_lock = threading.Lock()
+# Поколения для invalidate_user: промах кэша сохраняет прочитанную запись,
+# только если за время SELECT пользователя не сбрасывали
+_user_generation: dict[int, int] = {}
+_user_cache_epoch = 0
+
+metrics.counter("raluma_user_cache_hits_total", "Пользователь найден в кэше")
+metrics.counter("raluma_user_cache_misses_total", "Пользователь загружен из БД")
+metrics.gauge(
+    "raluma_user_cache_hit_ratio",
+    "Доля попаданий в кэш пользователей",
+    lambda: (
+        metrics.value("raluma_user_cache_hits_total")
+        / max(
+            1,
+            metrics.value("raluma_user_cache_hits_total")
+            + metrics.value("raluma_user_cache_misses_total"),
+        )
+    ),
+)
+
+
+def _run_hash(fn, *args):
+    """Выполнить fn в пуле bcrypt. Пул и очередь заняты — 503 без ожидания."""
+    if not _hash_slots.acquire(blocking=False):
+        metrics.inc("raluma_password_hash_rejected_total")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, повторите вход через несколько секунд",
+            headers={"Retry-After": "2"},
+        )
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except FutureTimeout:
+        future.cancel()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, повторите вход через несколько секунд",
+            headers={"Retry-After": "2"},
+        )
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return _run_hash(
+        lambda: bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+    )
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode(), hashed.encode())
+    return _run_hash(bcrypt.checkpw, plain.encode(), hashed.encode())
+
+
+def needs_rehash(hashed: str) -> bool:
+    """Хэш сделан с другой стоимостью, чем BCRYPT_ROUNDS ($2b$<rounds>$...)."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
 
 
 def create_access_token(user_id: int, username: str, role: str) -> str:
@@ -48,13 +135,56 @@ def decode_token(token: str) -> dict:
         )
 
 
+def invalidate_user(user_id: int | None = None) -> None:
+    """Сбросить запись пользователя в кэше (None — весь кэш)."""
+    global _user_cache_epoch
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+            _user_cache_epoch += 1
+        else:
+            _user_cache.pop(user_id, None)
+            _user_generation[user_id] = _user_generation.get(user_id, 0) + 1
+
+
+def _cache_generation(user_id: int) -> tuple[int, int]:
+    with _user_cache_lock:
+        return _user_cache_epoch, _user_generation.get(user_id, 0)
+
+
+def load_active_user(user_id: int, db: Session) -> models.User | None:
+    """
+    Активный пользователь по id или None. Из кэша возвращается отдельная
+    копия (не привязанная к сессии): её можно читать, но не сохранять.
+    """
+    now = time.monotonic()
+    entry = _user_cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        metrics.inc("raluma_user_cache_hits_total")
+        return models.User(**entry[1])
+    metrics.inc("raluma_user_cache_misses_total")
+    generation = _cache_generation(user_id)
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user or not user.is_active:
+        invalidate_user(user_id)
+        return None
+    if USER_CACHE_TTL > 0:
+        values = {key: getattr(user, key) for key in _USER_COLUMNS}
+        with _user_cache_lock:
+            # Сброс между SELECT и записью — прочитанное уже устарело
+            if generation == (_user_cache_epoch, _user_generation.get(user_id, 0)):
+                _user_cache[user_id] = (now + USER_CACHE_TTL, values)
+    return user
+
+
+@tracing.traced("auth")
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: Session = Depends(get_db),
 ) -> models.User:
     payload = decode_token(credentials.credentials)
-    user = db.query(models.User).filter(models.User.id == int(payload["sub"])).first()
-    if not user or not user.is_active:
+    user = load_active_user(int(payload["sub"]), db)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Пользователь не найден"
         )
@@ -0,0 +1,371 @@
+"""
+Онлайн-бэкап SQLite.
+
+Снимок делается через SQLite online backup API порциями страниц с паузой
+между порциями: приложение продолжает читать и писать, диск не забивается.
+Снимок всегда согласован (включая данные, ещё не перенесённые из WAL).
+
+Полный бэкап — gzip всего снимка: raluma_<ts>.full.db.gz.
+Инкрементальный — только страницы, изменившиеся с прошлого снимка:
+raluma_<base ts>_<ts>.inc.gz, где base — полный бэкап, от которого идёт
+цепочка. Хэши страниц последнего снимка лежат в state.pages + state.json.
+Бэкап и восстановление берут эксклюзивный flock на backup.lock в каталоге
+бэкапов: админский эндпоинт и cron/CLI не пишут state одновременно.
+
+Настройки (env):
+  BACKUP_DIR       — каталог бэкапов (по умолчанию <каталог БД>/backups)
+  BACKUP_PAGES     — страниц за один шаг backup API
+  BACKUP_SLEEP_MS  — пауза между шагами, мс
+  BACKUP_KEEP      — сколько полных цепочек хранить
+  BACKUP_FULL_EVERY — после стольких инкрементов следующий бэкап — полный
+
+CLI (из каталога backend):
+  python -m backup full
+  python -m backup incremental
+  python -m backup restore <raluma_….full.db.gz> <out.db> [--until <ts>]
+"""
+
+import argparse
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy.engine import make_url
+
+from database import SQLALCHEMY_DATABASE_URL
+
+DB_PATH = make_url(SQLALCHEMY_DATABASE_URL).database or ""
+BACKUP_DIR = os.getenv(
+    "BACKUP_DIR", os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "backups")
+)
+PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES", "256"))
+SLEEP_MS = int(os.getenv("BACKUP_SLEEP_MS", "10"))
+KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+FULL_EVERY = int(os.getenv("BACKUP_FULL_EVERY", "288"))  # сутки по 5 минут
+
+_INC_MAGIC = b"RLMINC1\n"
+_INC_HEADER = struct.Struct("<II")  # page_size, page_count
+_PAGE_NO = struct.Struct("<I")
+_DIGEST = 8
+_LOCK_FILE = "backup.lock"
+
+
+class BackupBusy(Exception):
+    pass
+
+
+@dataclass
+class BackupStatus:
+    kind: str  # full | incremental
+    status: str = "running"  # running | done | failed
+    pages_total: int = 0
+    pages_done: int = 0
+    pages_written: int = 0
+    file: str | None = None
+    bytes: int = 0
+    error: str | None = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+
+_lock = threading.Lock()
+_status: BackupStatus | None = None
+
+
+@contextmanager
+def _dir_lock(directory: str):
+    """Эксклюзивная блокировка каталога бэкапов между процессами (ждёт освобождения)."""
+    with open(os.path.join(directory, _LOCK_FILE), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _timestamp() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+
+def _snapshot(source_path: str, target_path: str, status: BackupStatus) -> None:
+    """Согласованная копия БД через backup API, порциями с паузами."""
+
+    def progress(_status_code, remaining, total):
+        status.pages_total = total
+        status.pages_done = total - remaining
+
+    src = sqlite3.connect(source_path)
+    dst = sqlite3.connect(target_path)
+    try:
+        src.backup(dst, pages=PAGES_PER_STEP, progress=progress, sleep=SLEEP_MS / 1000)
+        # Снимок — обычный файл без WAL: его можно сжимать и сравнивать постранично
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+        src.close()
+
+
+def _pages(path: str):
+    """(page_size, итератор страниц) файла БД."""
+    with open(path, "rb") as f:
+        header = f.read(100)
+    page_size = struct.unpack(">H", header[16:18])[0]
+    page_size = 65536 if page_size == 1 else page_size
+
+    def iterate():
+        with open(path, "rb") as f:
+            while page := f.read(page_size):
+                yield page
+
+    return page_size, iterate()
+
+
+def _digest(page: bytes) -> bytes:
+    return hashlib.blake2b(page, digest_size=_DIGEST).digest()
+
+
+def _state_paths(directory: str):
+    return os.path.join(directory, "state.json"), os.path.join(directory, "state.pages")
+
+
+def _load_state(directory: str):
+    meta_path, pages_path = _state_paths(directory)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        with open(pages_path, "rb") as f:
+            digests = f.read()
+    except (OSError, ValueError):
+        return None, b""
+    return meta, digests
+
+
+def _save_state(directory: str, meta: dict, digests: bytes) -> None:
+    meta_path, pages_path = _state_paths(directory)
+    for path, data in ((pages_path, digests), (meta_path, json.dumps(meta).encode())):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+def _write_full(snapshot: str, target: str, status: BackupStatus) -> bytes:
+    """gzip снимка → target. Возвращает хэши страниц."""
+    _, pages = _pages(snapshot)
+    digests = bytearray()
+    with gzip.open(target + ".tmp", "wb", compresslevel=6) as out:
+        for page in pages:
+            out.write(page)
+            digests += _digest(page)
+    os.replace(target + ".tmp", target)
+    status.pages_written = len(digests) // _DIGEST
+    return bytes(digests)
+
+
+def _write_incremental(
+    snapshot: str, target: str, previous: bytes, status: BackupStatus
+) -> bytes:
+    """Только изменившиеся страницы → target. Возвращает хэши страниц снимка."""
+    page_size, pages = _pages(snapshot)
+    digests = bytearray()
+    page_count = os.path.getsize(snapshot) // page_size
+    written = 0
+    with gzip.open(target + ".tmp", "wb", compresslevel=6) as out:
+        out.write(_INC_MAGIC + _INC_HEADER.pack(page_size, page_count))
+        for no, page in enumerate(pages):
+            d = _digest(page)
+            digests += d
+            if previous[no * _DIGEST : (no + 1) * _DIGEST] != d:
+                out.write(_PAGE_NO.pack(no) + page)
+                written += 1
+    os.replace(target + ".tmp", target)
+    status.pages_written = written
+    return bytes(digests)
+
+
+def _rotate(directory: str) -> None:
+    """Оставить KEEP последних полных бэкапов с их инкрементами."""
+    fulls = sorted(f for f in os.listdir(directory) if f.endswith(".full.db.gz"))
+    for old in fulls[: max(0, len(fulls) - KEEP)]:
+        base = old.removesuffix(".full.db.gz")
+        for name in os.listdir(directory):
+            if name == old or (
+                name.startswith(base + "_") and name.endswith(".inc.gz")
+            ):
+                os.remove(os.path.join(directory, name))
+
+
+def run_backup(
+    incremental: bool = False,
+    source_path: str | None = None,
+    directory: str | None = None,
+    status: BackupStatus | None = None,
+) -> BackupStatus:
+    """
+    Сделать бэкап синхронно. incremental=True без базовой цепочки, с другим
+    размером страницы или после FULL_EVERY инкрементов даёт полный бэкап.
+    """
+    source_path = source_path or DB_PATH
+    directory = directory or BACKUP_DIR
+    os.makedirs(directory, exist_ok=True)
+    with _dir_lock(directory):
+        return _run_backup(incremental, source_path, directory, status)
+
+
+def _run_backup(
+    incremental: bool, source_path: str, directory: str, status: BackupStatus | None
+) -> BackupStatus:
+    meta, previous = _load_state(directory)
+    if incremental and (
+        meta is None
+        or not os.path.exists(os.path.join(directory, meta["base"]))
+        or meta["increments"] >= FULL_EVERY
+    ):
+        incremental = False
+    status = status or BackupStatus(kind="incremental" if incremental else "full")
+    status.kind = "incremental" if incremental else "full"
+
+    try:
+        with tempfile.TemporaryDirectory(dir=directory) as tmp:
+            snapshot = os.path.join(tmp, "snapshot.db")
+            _snapshot(source_path, snapshot, status)
+            page_size, _ = _pages(snapshot)
+            if incremental and page_size != meta["page_size"]:
+                status.kind, incremental = "full", False
+            ts = _timestamp()
+            if incremental:
+                base = meta["base"].removesuffix(".full.db.gz")
+                name = f"{base}_{ts}.inc.gz"
+                digests = _write_incremental(
+                    snapshot, os.path.join(directory, name), previous, status
+                )
+                meta["increments"] += 1
+            else:
+                name = f"raluma_{ts}.full.db.gz"
+                digests = _write_full(snapshot, os.path.join(directory, name), status)
+                meta = {"base": name, "increments": 0}
+            meta["page_size"] = page_size
+            _save_state(directory, meta, digests)
+        _rotate(directory)
+        status.file = name
+        status.bytes = os.path.getsize(os.path.join(directory, name))
+        status.status = "done"
+    except Exception as e:
+        status.status = "failed"
+        status.error = str(e) or e.__class__.__name__
+        raise
+    finally:
+        status.finished_at = time.time()
+    return status
+
+
+def start_backup(incremental: bool = False) -> BackupStatus:
+    """Запустить бэкап в фоновом потоке. Второй одновременный — BackupBusy."""
+    global _status
+    with _lock:
+        if _status is not None and _status.status == "running":
+            raise BackupBusy()
+        _status = BackupStatus(kind="incremental" if incremental else "full")
+        status = _status
+
+    def target():
+        try:
+            run_backup(incremental, status=status)
+        except Exception:
+            pass  # ошибка уже в status
+
+    threading.Thread(target=target, name="db-backup", daemon=True).start()
+    return status
+
+
+def current_status() -> BackupStatus | None:
+    return _status
+
+
+def list_backups(directory: str | None = None) -> list[dict]:
+    directory = directory or BACKUP_DIR
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    return [
+        {"file": name, "bytes": os.path.getsize(os.path.join(directory, name))}
+        for name in names
+        if name.endswith((".full.db.gz", ".inc.gz"))
+    ]
+
+
+def restore(full_path: str, target: str, until: str | None = None) -> int:
+    """
+    Восстановить БД: полный бэкап + его инкременты по порядку
+    (до метки времени until включительно). Возвращает число применённых инкрементов.
+    """
+    directory = os.path.dirname(os.path.abspath(full_path))
+    with _dir_lock(directory):
+        return _restore(full_path, directory, target, until)
+
+
+def _restore(full_path: str, directory: str, target: str, until: str | None) -> int:
+    base = os.path.basename(full_path).removesuffix(".full.db.gz")
+    increments = sorted(
+        name
+        for name in os.listdir(directory)
+        if name.startswith(base + "_") and name.endswith(".inc.gz")
+    )
+    if until:
+        increments = [
+            n
+            for n in increments
+            if n.removeprefix(base + "_").removesuffix(".inc.gz") <= until
+        ]
+    with gzip.open(full_path, "rb") as src, open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    with open(target, "r+b") as dst:
+        for name in increments:
+            with gzip.open(os.path.join(directory, name), "rb") as inc:
+                if inc.read(len(_INC_MAGIC)) != _INC_MAGIC:
+                    raise ValueError(f"Не инкремент: {name}")
+                page_size, page_count = _INC_HEADER.unpack(inc.read(_INC_HEADER.size))
+                while head := inc.read(_PAGE_NO.size):
+                    (no,) = _PAGE_NO.unpack(head)
+                    dst.seek(no * page_size)
+                    dst.write(inc.read(page_size))
+            dst.truncate(page_count * page_size)
+    return len(increments)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бэкап БД Ралюма")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("full", help="полный бэкап")
+    sub.add_parser("incremental", help="только изменившиеся страницы")
+    p_restore = sub.add_parser("restore", help="восстановить из бэкапа")
+    p_restore.add_argument("full", help="файл .full.db.gz")
+    p_restore.add_argument("target", help="куда записать БД")
+    p_restore.add_argument("--until", help="метка времени последнего инкремента")
+    args = parser.parse_args()
+
+    if args.command == "restore":
+        n = restore(args.full, args.target, args.until)
+        print(f"Восстановлено: {args.target} (инкрементов: {n})")
+        return
+    st = run_backup(incremental=args.command == "incremental")
+    print(
+        f"{st.kind}: {st.file} ({st.bytes} байт, "
+        f"страниц записано {st.pages_written} из {st.pages_total})"
+    )
+
+
+if __name__ == "__main__":
+    main()
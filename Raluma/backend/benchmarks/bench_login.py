@@ -0,0 +1,98 @@
+"""
+Нагрузочный тест входа: много одновременных POST /api/auth/login.
+
+Показывает пропускную способность входов, p99, число отказов 503
+(очередь bcrypt полна) и задержку /health во время нагрузки — лёгкие
+запросы не должны ждать за bcrypt.
+
+Нужен запущенный сервер:
+    uvicorn main:app &
+    python -m benchmarks.bench_login [--url http://127.0.0.1:8000]
+        [--threads 32] [--seconds 10] [--username admin --password admin123]
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def _request(url: str, body: dict | None = None) -> int:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        url, data=data, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _p99(values: list[float]) -> float:
+    values = sorted(values) or [0]
+    return values[max(0, int(len(values) * 0.99) - 1)] * 1000
+
+
+def run(url: str, threads: int, seconds: float, username: str, password: str):
+    stats = {"ok": 0, "busy": 0, "other": 0, "latencies": [], "health": []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    body = {"username": username, "password": password}
+
+    def login_worker():
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            code = _request(url + "/api/auth/login", body)
+            elapsed = time.perf_counter() - t0
+            with lock:
+                key = "ok" if code == 200 else "busy" if code == 503 else "other"
+                stats[key] += 1
+                stats["latencies"].append(elapsed)
+
+    def health_worker():
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            _request(url + "/health")
+            stats["health"].append(time.perf_counter() - t0)
+            time.sleep(0.05)
+
+    workers = [threading.Thread(target=login_worker) for _ in range(threads)]
+    workers.append(threading.Thread(target=health_worker))
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return {
+        "logins_per_s": stats["ok"] / seconds,
+        "p99_ms": _p99(stats["latencies"]),
+        "busy": stats["busy"],
+        "other": stats["other"],
+        "health_p99_ms": _p99(stats["health"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+
+    r = run(
+        args.url.rstrip("/"), args.threads, args.seconds, args.username, args.password
+    )
+    print(f"входов/с:        {r['logins_per_s']:.1f}")
+    print(f"p99 входа, мс:   {r['p99_ms']:.0f}")
+    print(f"503 (занято):    {r['busy']}")
+    print(f"другие ошибки:   {r['other']}")
+    print(f"p99 /health, мс: {r['health_p99_ms']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Микробенчмарк calculate_slide с порогом регрессии.
+
+Корпус — детерминированный набор секций, как их заводят в редакторе:
+1 и 2 ряда, 3 и 5 рельс, разные пороги, окраска, межстекольный профиль,
+пристенные/замковые/ручечные профили, замки, ручки, шпингалеты.
+Меряется: вызовов/с, p50 и p99 одного вызова, пиковая память на вызов
+(tracemalloc, отдельным проходом — он сам замедляет код).
+
+Запуск из Raluma/backend:
+    python -m benchmarks.bench_slide_calc run
+    python -m benchmarks.bench_slide_calc save       # записать baseline
+    python -m benchmarks.bench_slide_calc compare [--max-regression 10]
+
+compare завершается с кодом 1, если вызовов/с меньше, а p99 или память
+больше базовых более чем на --max-regression процентов. Baseline зависит
+от машины — перезаписывать его на той же, где запускается compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from engine.slide_calc import calculate_slide
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline_slide_calc.json")
+
+THRESHOLDS = [
+    "Стандартный анод",
+    "Стандартный окраш",
+    "Накладной анод",
+    "Накладной окраш",
+]
+PAINTING = ["", "RAL стандарт", "RAL нестандарт", "Анодированный"]
+GLASS = [
+    "10ММ ЗАКАЛЕННОЕ ПРОЗРАЧНОЕ",
+    "10ММ ЗАКАЛЕННОЕ МАТОВОЕ",
+    "8ММ ЗАКАЛЕННОЕ ПРОЗРАЧНОЕ",
+    "6ММ ЗАКАЛЕННОЕ ПРОЗРАЧНОЕ",
+]
+INTER_GLASS = [
+    "",
+    "Алюминиевый RS2061",
+    "Прозрачный с фетром RS1006",
+    "h-профиль RS1004",
+]
+LOCKS = ["Без", "ЗАМОК-ЗАЩЕЛКА 1стор", "ЗАМОК-ЗАЩЕЛКА 2стор с ключом"]
+HANDLES = [
+    "Без",
+    "Без ручки (подвижная)",
+    "Ручка-кноб RS3014",
+    "Стеклянная ручка RS3017",
+]
+
+
+def _section(rnd: random.Random) -> SimpleNamespace:
+    rails = rnd.choice([3, 5])
+    two_rows = rnd.random() < 0.3
+    if two_rows:
+        panels = rnd.choice([4, 6, 8, 10] if rails == 5 else [4, 6])
+    else:
+        panels = rnd.randint(2, rails)
+    painting = rnd.choice(PAINTING)
+    left_wall = rnd.random() < 0.7
+    right_wall = rnd.random() < 0.7
+    return SimpleNamespace(
+        width=rnd.randrange(1200, 9000, 10),
+        height=rnd.randrange(1800, 3200, 10),
+        panels=panels,
+        quantity=rnd.choice([1, 1, 1, 2, 3]),
+        rails=rails,
+        threshold=rnd.choice(THRESHOLDS),
+        painting_type=painting,
+        ral_color=str(rnd.choice([7016, 9005, 9016, 8017]))
+        if "RAL" in painting
+        else "",
+        glass_type=rnd.choice(GLASS),
+        first_panel_inside=rnd.choice(["Слева", "Справа"]),
+        unused_track=rnd.choice(["", "Внутренний", "Внешний"])
+        if panels < rails
+        else "",
+        inter_glass_profile=rnd.choice(INTER_GLASS),
+        profile_left_wall=left_wall,
+        profile_right_wall=right_wall,
+        profile_left_lock_bar=not left_wall and rnd.random() < 0.5,
+        profile_right_lock_bar=not right_wall and rnd.random() < 0.5,
+        profile_left_p_bar=rnd.random() < 0.2,
+        profile_right_p_bar=rnd.random() < 0.2,
+        profile_left_handle_bar=rnd.random() < 0.3,
+        profile_right_handle_bar=rnd.random() < 0.3,
+        profile_left_bubble=rnd.random() < 0.2,
+        profile_right_bubble=rnd.random() < 0.2,
+        lock_left=rnd.choice(LOCKS),
+        lock_right=rnd.choice(LOCKS),
+        handle_left=rnd.choice(HANDLES),
+        handle_right=rnd.choice(HANDLES),
+        handle_offset_left=rnd.choice([0, 0, 50, 100]),
+        handle_offset_right=rnd.choice([0, 0, 50, 100]),
+        floor_latches_left=rnd.random() < 0.3,
+        floor_latches_right=rnd.random() < 0.3,
+    )
+
+
+def corpus(size: int = 500, seed: int = 42) -> list[SimpleNamespace]:
+    rnd = random.Random(seed)
+    return [_section(rnd) for _ in range(size)]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def _timed_pass(sections) -> tuple[float, list[float]]:
+    latencies = []
+    t_start = time.perf_counter()
+    for s in sections:
+        t0 = time.perf_counter()
+        calculate_slide(s)
+        latencies.append(time.perf_counter() - t0)
+    return time.perf_counter() - t_start, latencies
+
+
+def _memory_pass(sections) -> float:
+    """Средний пик памяти одного вызова, КиБ."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for s in sections:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            calculate_slide(s)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return statistics.mean(peaks) / 1024
+
+
+def run(size: int = 500, repeat: int = 5, seed: int = 42) -> dict:
+    """
+    Лучший из repeat проходов корпуса (как timeit): медленные проходы —
+    шум от соседей по CPU, а не свойство кода.
+    """
+    sections = corpus(size, seed)
+    _timed_pass(sections)  # прогрев
+    rates, p50s, p99s = [], [], []
+    for _ in range(repeat):
+        elapsed, latencies = _timed_pass(sections)
+        latencies.sort()
+        rates.append(len(sections) / elapsed)
+        p50s.append(_percentile(latencies, 0.50) * 1e6)
+        p99s.append(_percentile(latencies, 0.99) * 1e6)
+    return {
+        "calls_per_s": round(max(rates), 1),
+        "p50_us": round(min(p50s), 2),
+        "p99_us": round(min(p99s), 2),
+        "alloc_kib_per_call": round(_memory_pass(sections), 2),
+        "corpus": size,
+        "seed": seed,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+
+
+# (метрика, больше — лучше)
+_CHECKS = [
+    ("calls_per_s", True),
+    ("p99_us", False),
+    ("alloc_kib_per_call", False),
+]
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> list[str]:
+    """Список регрессий больше max_regression процентов (пустой — всё хорошо)."""
+    failures = []
+    for name, higher_is_better in _CHECKS:
+        base, now = baseline[name], current[name]
+        if not base:
+            continue
+        change = (now - base) / base * 100
+        regression = -change if higher_is_better else change
+        if regression > max_regression:
+            failures.append(f"{name}: {base} → {now} ({change:+.1f}%)")
+    return failures
+
+
+def _print(result: dict, baseline: dict | None = None) -> None:
+    for name, _ in _CHECKS + [("p50_us", False)]:
+        line = f"{name:<20}{result[name]:>12}"
+        if baseline and baseline.get(name):
+            change = (result[name] - baseline[name]) / baseline[name] * 100
+            line += f"   база {baseline[name]:>10} ({change:+.1f}%)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["run", "save", "compare"])
+    parser.add_argument("--size", type=int, default=500, help="секций в корпусе")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--max-regression", type=float, default=10, help="допустимое ухудшение, %%"
+    )
+    args = parser.parse_args()
+
+    result = run(args.size, args.repeat)
+    if args.command == "run":
+        _print(result)
+    elif args.command == "save":
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        _print(result)
+        print(f"Baseline записан: {args.baseline}")
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if (baseline.get("corpus"), baseline.get("seed")) != (
+            result["corpus"],
+            result["seed"],
+        ):
+            sys.exit("Baseline снят на другом корпусе — пересоздайте его командой save")
+        _print(result, baseline)
+        failures = compare(baseline, result, args.max_regression)
+        if failures:
+            print(f"\nРегрессия больше {args.max_regression:g}%:")
+            for line in failures:
+                print("  " + line)
+            sys.exit(1)
+        print("\nРегрессий нет")
+
+
+if __name__ == "__main__":
+    main()
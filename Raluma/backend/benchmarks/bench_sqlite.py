@@ -0,0 +1,140 @@
+"""
+Нагрузочный тест SQLite: смешанное чтение/запись из нескольких потоков.
+
+Сравнивает настройки SQLite по умолчанию (rollback journal, FULL sync,
+без busy timeout) с профилем из database.SQLITE_PROFILE.
+
+Запуск из Raluma/backend:
+    python -m benchmarks.bench_sqlite [--threads 8] [--seconds 5] [--writes 0.2]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from database import SQLITE_PROFILE, apply_sqlite_profile
+
+# Как у sqlite3 без настроек: ждать блокировку не больше 0 мс
+DEFAULT_PROFILE = {"busy_timeout": 0, "journal_mode": "DELETE", "synchronous": "FULL"}
+
+_SCHEMA = """
+CREATE TABLE sections (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    width REAL,
+    height REAL,
+    document_overrides TEXT DEFAULT '{}'
+);
+CREATE INDEX ix_sections_project ON sections(project_id);
+"""
+
+
+def _prepare(path: str, rows: int, profile: dict) -> None:
+    conn = sqlite3.connect(path)
+    # journal_mode хранится в файле БД — выставляем один раз до старта потоков
+    apply_sqlite_profile(conn, profile)
+    conn.executescript(_SCHEMA)
+    conn.executemany(
+        "INSERT INTO sections (project_id, width, height) VALUES (?, ?, ?)",
+        [(i % 500, 2000 + i % 1000, 2400) for i in range(rows)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _connect(path: str, profile: dict) -> sqlite3.Connection:
+    # timeout=0: ожидание блокировки задаёт только PRAGMA busy_timeout профиля
+    conn = sqlite3.connect(
+        path, timeout=0, isolation_level=None, check_same_thread=False
+    )
+    apply_sqlite_profile(
+        conn, {k: v for k, v in profile.items() if k != "journal_mode"}
+    )
+    return conn
+
+
+def _worker(conn, deadline, write_ratio, seed, stats, lock):
+    rnd = random.Random(seed)
+    reads = writes = locked = 0
+    latencies = []
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            if rnd.random() < write_ratio:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "UPDATE sections SET document_overrides = ? WHERE id = ?",
+                    (f'{{"w": {rnd.random()}}}', rnd.randint(1, 5000)),
+                )
+                conn.execute("COMMIT")
+                writes += 1
+            else:
+                conn.execute(
+                    "SELECT * FROM sections WHERE project_id = ?",
+                    (rnd.randint(0, 499),),
+                ).fetchall()
+                reads += 1
+        except sqlite3.OperationalError:
+            locked += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+        latencies.append(time.perf_counter() - t0)
+    conn.close()
+    with lock:
+        stats["reads"] += reads
+        stats["writes"] += writes
+        stats["locked"] += locked
+        stats["latencies"].extend(latencies)
+
+
+def run(profile: dict, threads: int, seconds: float, write_ratio: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        _prepare(path, 5000, profile)
+        stats = {"reads": 0, "writes": 0, "locked": 0, "latencies": []}
+        lock = threading.Lock()
+        # Соединения открываем заранее, чтобы PRAGMA не конкурировали с нагрузкой
+        conns = [_connect(path, profile) for _ in range(threads)]
+        deadline = time.perf_counter() + seconds
+        workers = [
+            threading.Thread(
+                target=_worker,
+                args=(conn, deadline, write_ratio, i, stats, lock),
+            )
+            for i, conn in enumerate(conns)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    lat = sorted(stats["latencies"]) or [0]
+    return {
+        "ops_per_s": (stats["reads"] + stats["writes"]) / seconds,
+        "writes_per_s": stats["writes"] / seconds,
+        "locked": stats["locked"],
+        "p99_ms": lat[int(len(lat) * 0.99) - 1] * 1000 if len(lat) > 1 else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--writes", type=float, default=0.2, help="доля записей")
+    args = parser.parse_args()
+
+    print(f"{'профиль':<10}{'оп/с':>10}{'записей/с':>12}{'locked':>8}{'p99, мс':>10}")
+    for name, profile in (("default", DEFAULT_PROFILE), ("tuned", SQLITE_PROFILE)):
+        r = run(profile, args.threads, args.seconds, args.writes)
+        print(
+            f"{name:<10}{r['ops_per_s']:>10.0f}{r['writes_per_s']:>12.0f}"
+            f"{r['locked']:>8}{r['p99_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,70 @@
-from sqlalchemy import create_engine
+"""
+Подключение к БД.
+
+Для SQLite на каждом новом соединении выставляются PRAGMA (env):
+  SQLITE_JOURNAL_MODE    — WAL: читатели не блокируют писателя
+  SQLITE_SYNCHRONOUS     — NORMAL: в WAL не теряет целостность, fsync реже
+  SQLITE_BUSY_TIMEOUT_MS — сколько ждать блокировку вместо «database is locked»
+  SQLITE_MMAP_SIZE       — байт файла БД, читаемых через mmap
+  SQLITE_CACHE_SIZE      — страничный кэш; отрицательное — в КиБ
+  SQLITE_TEMP_STORE      — MEMORY: временные таблицы и сортировки в памяти
+"""
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 import os
 
+import query_stats
+
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./raluma.db")
 
+# busy_timeout первым: смене journal_mode нужна блокировка файла
+SQLITE_PROFILE = {
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL").upper(),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper(),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY").upper(),
+}
+
+_ALLOWED = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+
+def apply_sqlite_profile(dbapi_conn, profile: dict) -> None:
+    """Выставить PRAGMA из profile на DBAPI-соединении sqlite3."""
+    cursor = dbapi_conn.cursor()
+    try:
+        for name, value in profile.items():
+            if name in _ALLOWED and value not in _ALLOWED[name]:
+                raise ValueError(f"Недопустимое значение PRAGMA {name}: {value}")
+            cursor.execute(f"PRAGMA {name}={value if name in _ALLOWED else int(value)}")
+    finally:
+        cursor.close()
+
+
+def _is_file_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and url != "sqlite://"
+
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+
+if _is_file_sqlite(SQLALCHEMY_DATABASE_URL):
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, connection_record):
+        apply_sqlite_profile(dbapi_conn, SQLITE_PROFILE)
+
+
+query_stats.install(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -21,3 +78,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def optimize_db() -> None:
+    """PRAGMA optimize — обновить статистику планировщика (при остановке)."""
+    if not SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
@@ -0,0 +1,116 @@
+"""
+Картинки профилей и фурнитуры для производственного листа.
+
+Каждый файл из assets/profiles читается и кодируется в data URI один раз
+на процесс; при изменении mtime файл перечитывается.
+
+ASSET_MAX_PX — уменьшать картинки до этого размера по большей стороне
+(в листе они занимают ~15 мм, 300 px — с запасом для печати).
+0 — отдавать файлы как есть.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+from dataclasses import dataclass
+
+ASSETS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "profiles"
+)
+MAX_PX = int(os.getenv("ASSET_MAX_PX", "300"))
+
+_MIME = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png"}
+
+
+@dataclass
+class _Asset:
+    mtime_ns: int
+    size: int
+    data_uri: str
+
+
+def _shrink(raw: bytes, ext: str, max_px: int) -> bytes:
+    """Уменьшить и пережать картинку. Возвращает исходные байты, если выигрыша нет."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return raw
+    try:
+        img = Image.open(io.BytesIO(raw))
+        img.load()
+        if max(img.size) > max_px:
+            img.thumbnail((max_px, max_px))
+        out = io.BytesIO()
+        if ext == "png":
+            img.save(out, format="PNG", optimize=True)
+        else:
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            img.save(out, format="JPEG", quality=85, optimize=True)
+    except Exception:
+        return raw
+    data = out.getvalue()
+    return data if len(data) < len(raw) else raw
+
+
+class AssetStore:
+    def __init__(self, directory: str, max_px: int = 0):
+        self.directory = directory
+        self.max_px = max_px
+        self._assets: dict[str, _Asset] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, filename: str, st: os.stat_result) -> _Asset:
+        with open(os.path.join(self.directory, filename), "rb") as f:
+            raw = f.read()
+        ext = filename.rsplit(".", 1)[-1].lower()
+        if self.max_px > 0:
+            raw = _shrink(raw, ext, self.max_px)
+        mime = _MIME.get(ext, "image/jpeg")
+        uri = f"data:{mime};base64,{base64.b64encode(raw).decode()}"
+        return _Asset(st.st_mtime_ns, st.st_size, uri)
+
+    def data_uri(self, filename: str) -> str:
+        """Имя файла → data URI или пустая строка, если файла нет."""
+        if not filename or os.sep in filename or filename.startswith("."):
+            return ""
+        try:
+            st = os.stat(os.path.join(self.directory, filename))
+        except OSError:
+            return ""
+        asset = self._assets.get(filename)
+        if (
+            asset is None
+            or asset.mtime_ns != st.st_mtime_ns
+            or asset.size != st.st_size
+        ):
+            with self._lock:
+                asset = self._load(filename, st)
+                self._assets[filename] = asset
+        return asset.data_uri
+
+    def preload(self) -> int:
+        """Загрузить все картинки заранее (при старте приложения)."""
+        if not os.path.isdir(self.directory):
+            return 0
+        names = sorted(os.listdir(self.directory))
+        for name in names:
+            self.data_uri(name)
+        return len(names)
+
+    def signature(self) -> str:
+        """Хэш набора файлов (имя, размер, mtime) и настроек — для ключей кэша."""
+        h = hashlib.sha256(f"max_px={self.max_px};".encode())
+        try:
+            entries = sorted(os.scandir(self.directory), key=lambda e: e.name)
+        except OSError:
+            return h.hexdigest()
+        for entry in entries:
+            st = entry.stat()
+            h.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+        return h.hexdigest()
+
+
+store = AssetStore(ASSETS_DIR, MAX_PX)
@@ -0,0 +1,150 @@
+"""
+Сводная спецификация (BOM) по проекту.
+Суммирует профили, стёкла, фурнитуру и саморезы всех секций:
+профили — по артикулу и длине, стёкла — по типу и размеру,
+фурнитура и саморезы — по артикулу.
+
+Количество изделий (quantity) уже учтено в SlideCalcResult,
+поэтому здесь количества только складываются.
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+
+from engine.slide_calc import SlideCalcResult
+
+
+@dataclass
+class BomLine:
+    kind: str  # profile | glass | hardware | screw
+    article: str
+    name: str
+    length_mm: float | None  # для стёкол — ширина
+    height_mm: float | None
+    unit: str  # шт | м
+    qty: float
+    color: str = ""  # цвет окрашенного профиля
+
+
+_KIND_ORDER = {"profile": 0, "glass": 1, "hardware": 2, "screw": 3}
+
+
+def aggregate_bom(results: list[SlideCalcResult]) -> list[BomLine]:
+    """Один проход по расчётам секций. Окрашенные профили разных цветов — разные позиции."""
+    lines: dict[tuple, BomLine] = {}
+
+    def add(key, line):
+        if line.qty == 0:
+            return
+        existing = lines.get(key)
+        if existing is None:
+            lines[key] = line
+        else:
+            existing.qty += line.qty
+
+    for calc in results:
+        for p in calc.profiles:
+            color = calc.color_text if p.painted else ""
+            key = ("profile", p.article, p.length_mm, color)
+            add(
+                key,
+                BomLine(
+                    "profile",
+                    p.article,
+                    p.name,
+                    p.length_mm,
+                    None,
+                    "шт",
+                    p.qty,
+                    color,
+                ),
+            )
+        for g in calc.glass:
+            key = ("glass", calc.glass_type, g.width_mm, g.height_mm)
+            add(
+                key,
+                BomLine(
+                    "glass", "", calc.glass_type, g.width_mm, g.height_mm, "шт", g.qty
+                ),
+            )
+        for h in calc.hardware:
+            if h.sub_items:
+                for sub in h.sub_items:
+                    add(
+                        ("hardware", sub.article),
+                        BomLine(
+                            "hardware",
+                            sub.article,
+                            f"{h.name.split(',')[0]} {sub.label}",
+                            None,
+                            None,
+                            h.unit,
+                            sub.value,
+                        ),
+                    )
+                continue
+            # «Замок-защёлка 1-стор (слева)» → без стороны: стороны разных секций суммируются
+            add(
+                ("hardware", h.article),
+                BomLine(
+                    "hardware",
+                    h.article,
+                    h.name.split(" (")[0],
+                    None,
+                    None,
+                    h.unit,
+                    h.value,
+                ),
+            )
+        for s in calc.screws:
+            add(
+                ("screw", s.article),
+                BomLine("screw", s.article, s.name, None, None, "шт", s.qty),
+            )
+
+    for line in lines.values():
+        if line.unit == "м":
+            line.qty = round(line.qty, 3)
+    return sorted(
+        lines.values(),
+        key=lambda x: (_KIND_ORDER[x.kind], x.article, -(x.length_mm or 0)),
+    )
+
+
+def bom_csv(lines: list[BomLine]) -> str:
+    """CSV для Excel: разделитель «;», десятичная запятая."""
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter=";")
+    writer.writerow(
+        [
+            "Тип",
+            "Артикул",
+            "Наименование",
+            "Длина/ширина, мм",
+            "Высота, мм",
+            "Цвет",
+            "Ед.",
+            "Кол-во",
+        ]
+    )
+
+    def num(v):
+        if v is None:
+            return ""
+        return f"{v:.3f}".rstrip("0").rstrip(".").replace(".", ",")
+
+    for line in lines:
+        writer.writerow(
+            [
+                line.kind,
+                line.article,
+                line.name,
+                num(line.length_mm),
+                num(line.height_mm),
+                line.color,
+                line.unit,
+                num(line.qty),
+            ]
+        )
+    return out.getvalue()
@@ -0,0 +1,200 @@
+"""
+Раскрой профилей из хлыстов (линейный раскрой).
+
+Берёт отрезки ProfileItem из расчётов секций (одного или нескольких
+проектов), группирует по артикулу и цвету и раскладывает по хлыстам
+по убыванию длины (first-fit-decreasing, вариант best fit). Затем
+локальное улучшение: самый пустой хлыст пытаемся расселить по остаткам
+других, а каждый хлыст переносим на самую короткую складскую длину,
+в которую он помещается.
+
+Настройки (env):
+  CUT_STOCK_MM  — длины хлыстов через запятую, мм (по умолчанию 6000)
+  CUT_KERF_MM   — ширина пропила, мм
+  CUT_TRIM_MM   — торцовка: сколько срезается с конца хлыста, мм
+"""
+
+import os
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+
+from engine.slide_calc import SlideCalcResult
+
+STOCK_LENGTHS = tuple(
+    float(x) for x in os.getenv("CUT_STOCK_MM", "6000").split(",") if x.strip()
+)
+KERF_MM = float(os.getenv("CUT_KERF_MM", "4"))
+TRIM_MM = float(os.getenv("CUT_TRIM_MM", "10"))
+
+# Не режутся из хлыста: уплотнитель идёт в бухте
+NON_BAR_ARTICLES = {"RS1002"}
+
+# Сколько раз пробуем расселить самый пустой хлыст
+_MAX_IMPROVE_PASSES = 50
+
+
+@dataclass
+class CutBar:
+    stock_mm: float
+    cuts: list[float] = field(default_factory=list)
+    used_mm: float = 0  # отрезки + пропилы + торцовка
+    waste_mm: float = 0
+
+
+@dataclass
+class CutGroup:
+    article: str
+    name: str
+    color: str
+    pieces: int
+    pieces_mm: float
+    stock_mm: float
+    yield_pct: float
+    bars: list[CutBar]
+
+
+@dataclass
+class CutPlan:
+    stock_lengths: list[float]
+    kerf_mm: float
+    trim_mm: float
+    bars: int
+    pieces: int
+    yield_pct: float
+    groups: list[CutGroup]
+    oversize: list[dict]  # отрезки длиннее самого длинного хлыста
+
+
+def pieces_from_results(results: list[SlideCalcResult]) -> dict[tuple, list[float]]:
+    """(артикул, наименование, цвет) → список длин всех отрезков."""
+    groups: dict[tuple, list[float]] = {}
+    for calc in results:
+        for p in calc.profiles:
+            if p.length_mm <= 0 or p.qty <= 0 or p.article in NON_BAR_ARTICLES:
+                continue
+            color = calc.color_text if p.painted else ""
+            groups.setdefault((p.article, p.name, color), []).extend(
+                [p.length_mm] * p.qty
+            )
+    return groups
+
+
+def _fit_decreasing(pieces: list[float], capacity: float, kerf: float):
+    """
+    Отрезки по убыванию длины, каждый — в уже начатый хлыст, если влезает.
+    Остатки хранятся отсортированным списком (остаток, № хлыста), поэтому подходящий хлыст — с наименьшим достаточным остатком (best fit) —
+    ищется бинарным поиском: O(n log n) вместо O(n · хлысты).
+    """
+    bars: list[list[float]] = []
+    free: list[tuple[float, int]] = []
+    for length in sorted(pieces, reverse=True):
+        need = length + kerf
+        i = bisect_left(free, (need, -1))
+        if i < len(free):
+            rest, idx = free.pop(i)
+        else:
+            bars.append([])
+            rest, idx = capacity, len(bars) - 1
+        bars[idx].append(length)
+        insort(free, (rest - need, idx))
+    return bars
+
+
+def _improve(bars: list[list[float]], capacity: float, kerf: float) -> None:
+    """
+    Расселить самый пустой хлыст по остаткам остальных (best fit, от длинных
+    отрезков к коротким). Получилось — хлыст убирается, пробуем следующий.
+    """
+    for _ in range(_MAX_IMPROVE_PASSES):
+        if len(bars) < 2:
+            return
+        used = [sum(b) + kerf * len(b) for b in bars]
+        weakest = min(range(len(bars)), key=used.__getitem__)
+        rest = {i: capacity - used[i] for i in range(len(bars)) if i != weakest}
+        moves = []
+        for length in sorted(bars[weakest], reverse=True):
+            need = length + kerf
+            fits = [i for i, r in rest.items() if r >= need]
+            if not fits:
+                return
+            target = min(fits, key=rest.__getitem__)
+            rest[target] -= need
+            moves.append((target, length))
+        for target, length in moves:
+            bars[target].append(length)
+        del bars[weakest]
+
+
+def _pack_group(
+    pieces: list[float], stock_lengths: list[float], kerf: float, trim: float
+):
+    capacity = max(stock_lengths) - trim
+    bars = _fit_decreasing(pieces, capacity, kerf)
+    _improve(bars, capacity, kerf)
+    result = []
+    for cuts in bars:
+        cuts.sort(reverse=True)
+        used = sum(cuts) + kerf * len(cuts) + trim
+        # Самая короткая складская длина, в которую помещается раскладка
+        stock = min(s for s in stock_lengths if s >= used - 1e-9)
+        result.append(
+            CutBar(
+                stock_mm=stock,
+                cuts=cuts,
+                used_mm=round(used, 1),
+                waste_mm=round(stock - used, 1),
+            )
+        )
+    result.sort(key=lambda b: (b.waste_mm, -b.stock_mm))
+    return result
+
+
+def _yield(pieces_mm: float, stock_mm: float) -> float:
+    return round(pieces_mm / stock_mm * 100, 1) if stock_mm else 0.0
+
+
+def optimize_cutting(
+    groups: dict[tuple, list[float]],
+    stock_lengths: list[float] | tuple[float, ...] = STOCK_LENGTHS,
+    kerf_mm: float = KERF_MM,
+    trim_mm: float = TRIM_MM,
+) -> CutPlan:
+    """Раскрой всех групп отрезков (см. pieces_from_results)."""
+    stock_lengths = sorted(set(stock_lengths))
+    capacity = max(stock_lengths) - trim_mm
+    out_groups = []
+    oversize = []
+    for (article, name, color), lengths in sorted(groups.items()):
+        fit = [x for x in lengths if x + kerf_mm <= capacity]
+        for x in lengths:
+            if x + kerf_mm > capacity:
+                oversize.append({"article": article, "color": color, "length_mm": x})
+        if not fit:
+            continue
+        bars = _pack_group(fit, stock_lengths, kerf_mm, trim_mm)
+        pieces_mm = sum(fit)
+        stock_mm = sum(b.stock_mm for b in bars)
+        out_groups.append(
+            CutGroup(
+                article=article,
+                name=name,
+                color=color,
+                pieces=len(fit),
+                pieces_mm=round(pieces_mm, 1),
+                stock_mm=stock_mm,
+                yield_pct=_yield(pieces_mm, stock_mm),
+                bars=bars,
+            )
+        )
+    total_pieces_mm = sum(g.pieces_mm for g in out_groups)
+    total_stock_mm = sum(g.stock_mm for g in out_groups)
+    return CutPlan(
+        stock_lengths=stock_lengths,
+        kerf_mm=kerf_mm,
+        trim_mm=trim_mm,
+        bars=sum(len(g.bars) for g in out_groups),
+        pieces=sum(g.pieces for g in out_groups),
+        yield_pct=_yield(total_pieces_mm, total_stock_mm),
+        groups=out_groups,
+        oversize=oversize,
+    )
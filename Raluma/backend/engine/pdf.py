@@ -3,81 +3,144 @@ PDF/HTML движок для производственного листа.
 Jinja2 → HTML → WeasyPrint → bytes
 """
 
-import base64
+import io
 import json
 import os
+import threading
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+import metrics
+import tracing
+from engine.assets import ASSETS_DIR, store as asset_store
 
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TEMPLATES_DIR = os.path.join(BACKEND_DIR, "templates")
-ASSETS_DIR = os.path.join(BACKEND_DIR, "assets", "profiles")
+SECTION_TEMPLATE = "section_sheet.html"
+CUTTING_TEMPLATE = "cutting_plan.html"
+# Скомпилированные шаблоны на диске — переживают перезапуск воркеров
+JINJA_CACHE_DIR = os.getenv(
+    "JINJA_CACHE_DIR", os.path.join(BACKEND_DIR, "cache", "jinja")
+)
+# RALUMA_DEV=1 — перечитывать шаблоны при изменении (для разработки)
+DEV_MODE = os.getenv("RALUMA_DEV", "0") == "1"
+
+# render_html пишется здесь, calc и render_pdf — в api/documents.py:
+# WeasyPrint работает в процессах render_pool, их метрики сюда не доходят
+STAGE = metrics.histogram(
+    "raluma_stage_duration_seconds", "Этапы листа: calc, render_html, render_pdf"
+)
+PDF_BYTES = metrics.counter("raluma_pdf_bytes_total", "Байт PDF сгенерировано")
 
 
 def _img_b64(filename: str) -> str:
     """Jinja2-фильтр: имя файла → data URI base64 или пустая строка."""
-    if not filename:
-        return ""
-    path = os.path.join(ASSETS_DIR, filename)
-    if not os.path.exists(path):
-        return ""
-    with open(path, "rb") as f:
-        data = base64.b64encode(f.read()).decode()
-    ext = filename.rsplit(".", 1)[-1].lower()
-    mime = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png"}.get(
-        ext, "image/jpeg"
-    )
-    return f"data:{mime};base64,{data}"
+    return asset_store.data_uri(filename)
 
 
-def _get_env() -> Environment:
-    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=False)
-    env.filters["img_b64"] = _img_b64
-    env.filters["enumerate"] = enumerate
-    return env
+def _bytecode_cache() -> FileSystemBytecodeCache | None:
+    try:
+        os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(JINJA_CACHE_DIR)
 
 
-def render_preview(project, section, calc) -> str:
-    """
-    Рендерит HTML-строку с contenteditable для предпросмотра в iframe.
-    calc — SlideCalcResult из engine.slide_calc.
-    """
+_env: Environment | None = None
+_env_lock = threading.Lock()
+
+
+def _get_env() -> Environment:
+    """Одно окружение Jinja на процесс: шаблон компилируется один раз."""
+    global _env
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                env = Environment(
+                    loader=FileSystemLoader(TEMPLATES_DIR),
+                    autoescape=False,
+                    auto_reload=DEV_MODE,
+                    bytecode_cache=_bytecode_cache(),
+                )
+                env.filters["img_b64"] = _img_b64
+                env.filters["enumerate"] = enumerate
+                _env = env
+    return _env
+
+
+def warmup() -> None:
+    """Скомпилировать шаблон и загрузить картинки заранее (при старте приложения)."""
+    _get_env().get_template(SECTION_TEMPLATE)
+    asset_store.preload()
+
+
+def render_sheet_html(project, section, calc, is_pdf: bool) -> str:
+    """HTML листа без метрик и трассировки (профайлер вызывает его в цикле)."""
     overrides = {}
     try:
         overrides = json.loads(section.document_overrides or "{}")
     except Exception:
         pass
-
-    env = _get_env()
-    template = env.get_template("section_sheet.html")
+    template = _get_env().get_template(SECTION_TEMPLATE)
     return template.render(
         project=project,
         section=section,
         calc=calc,
         overrides=overrides,
-        is_pdf=False,
+        is_pdf=is_pdf,
     )
 
 
+def render_preview(project, section, calc) -> str:
+    """
+    Рендерит HTML-строку с contenteditable для предпросмотра в iframe.
+    calc — SlideCalcResult из engine.slide_calc.
+    """
+    with tracing.span("render_html"), metrics.timer(STAGE, stage="render_html"):
+        return render_sheet_html(project, section, calc, is_pdf=False)
+
+
 def render_pdf_html(project, section, calc) -> str:
     """
     Рендерит HTML для WeasyPrint (без contenteditable JS, без интерактивности).
     """
-    overrides = {}
-    try:
-        overrides = json.loads(section.document_overrides or "{}")
-    except Exception:
-        pass
+    with tracing.span("render_html"), metrics.timer(STAGE, stage="render_html"):
+        return render_sheet_html(project, section, calc, is_pdf=True)
+
+
+def _mm(value: float) -> str:
+    return f"{value:.1f}".removesuffix(".0")
 
-    env = _get_env()
-    template = env.get_template("section_sheet.html")
-    return template.render(
-        project=project,
-        section=section,
-        calc=calc,
-        overrides=overrides,
-        is_pdf=True,
-    )
+
+def render_cutting_html(projects, plan) -> str:
+    """
+    HTML карты раскроя (plan — CutPlan из engine.cutting).
+    Одинаковые хлысты сворачиваются в одну строку «× N».
+    """
+    groups = []
+    for g in plan.groups:
+        rows: dict[tuple, dict] = {}
+        for bar in g.bars:
+            key = (bar.stock_mm, tuple(bar.cuts))
+            if key in rows:
+                rows[key]["count"] += 1
+            else:
+                labels = [_mm(c) for c in bar.cuts]
+                rows[key] = {"bar": bar, "labels": labels, "count": 1}
+        groups.append(
+            {
+                "article": g.article,
+                "name": g.name,
+                "color": g.color,
+                "pieces": g.pieces,
+                "yield_pct": g.yield_pct,
+                "bars_count": len(g.bars),
+                "rows": list(rows.values()),
+            }
+        )
+    with tracing.span("render_html"), metrics.timer(STAGE, stage="render_html"):
+        template = _get_env().get_template(CUTTING_TEMPLATE)
+        return template.render(projects=projects, plan=plan, groups=groups)
 
 
 def generate_pdf(html: str) -> bytes:
@@ -85,3 +148,15 @@ def generate_pdf(html: str) -> bytes:
     from weasyprint import HTML as WH
 
     return WH(string=html, base_url=ASSETS_DIR).write_pdf()
+
+
+def merge_pdfs(parts: list[bytes]) -> bytes:
+    """Несколько готовых PDF → один, страницы по порядку, без повторной вёрстки."""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for data in parts:
+        writer.append(io.BytesIO(data))
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
@@ -0,0 +1,156 @@
+"""
+Дисковый кэш готовых PDF производственных листов.
+
+Ключ — sha256 от строки секции, шапки проекта, document_overrides,
+версии расчёта (slide_calc.CALC_VERSION), mtime шаблона и набора картинок
+профилей. Любая правка любого из них даёт новый ключ, поэтому инвалидация
+не нужна — старые файлы просто вытесняются.
+
+Вытеснение — LRU по mtime файла (при попадании mtime обновляется),
+общий размер ограничен PDF_CACHE_MAX_BYTES. PDF_CACHE_MAX_BYTES=0 — кэш выключен.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from engine.assets import store as asset_store
+from engine import cutting
+from engine.slide_calc import CALC_VERSION
+from engine.pdf import BACKEND_DIR, CUTTING_TEMPLATE, SECTION_TEMPLATE, TEMPLATES_DIR
+
+CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(BACKEND_DIR, "cache", "pdf"))
+MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+# После вытеснения оставляем запас, чтобы не чистить каталог на каждой записи
+_EVICT_TARGET = 0.9
+
+# Поля проекта, попадающие в шапку листа
+PROJECT_HEADER_FIELDS = ("id", "number", "customer")
+
+
+def _template_mtime(name: str = SECTION_TEMPLATE) -> int:
+    try:
+        return os.stat(os.path.join(TEMPLATES_DIR, name)).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _overrides(section) -> dict:
+    try:
+        return json.loads(section.document_overrides or "{}")
+    except Exception:
+        return {}
+
+
+def cache_key(project, section) -> str:
+    """sha256 всего, от чего зависит содержимое PDF."""
+    row = {
+        c.name: getattr(section, c.key)
+        for c in section.__table__.columns
+        if c.name != "document_overrides"
+    }
+    payload = {
+        "section": row,
+        "project": {f: getattr(project, f) for f in PROJECT_HEADER_FIELDS},
+        "overrides": _overrides(section),
+        "calc": CALC_VERSION,
+        "template": _template_mtime(),
+        "assets": asset_store.signature(),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def project_cache_key(project, sections) -> str:
+    """
+    Ключ сводного PDF проекта — от ключей всех входящих листов
+    и настроек карты раскроя в конце документа.
+    """
+    keys = "".join(cache_key(project, s) for s in sections)
+    plan = (
+        cutting.STOCK_LENGTHS,
+        cutting.KERF_MM,
+        cutting.TRIM_MM,
+        _template_mtime(CUTTING_TEMPLATE),
+    )
+    return hashlib.sha256(f"project:{keys}:{plan}".encode()).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.pdf")
+
+
+def get(key: str) -> bytes | None:
+    """Байты PDF из кэша или None. При попадании файл становится «самым свежим»."""
+    if MAX_BYTES <= 0:
+        return None
+    path = _path(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return data
+
+
+def put(key: str, data: bytes) -> None:
+    """Атомарно записать PDF в кэш и при необходимости вытеснить старые файлы."""
+    if MAX_BYTES <= 0 or len(data) > MAX_BYTES:
+        return
+    path = _path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return
+    _evict()
+
+
+def _evict() -> None:
+    """LRU: удаляем самые старые по mtime файлы, пока размер не уйдёт под лимит."""
+    files = []
+    total = 0
+    for root, _dirs, names in os.walk(CACHE_DIR):
+        for name in names:
+            if not name.endswith(".pdf"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+    if total <= MAX_BYTES:
+        return
+    target = MAX_BYTES * _EVICT_TARGET
+    for _mtime, size, path in sorted(files):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def clear() -> None:
+    """Удалить все файлы кэша."""
+    for root, _dirs, names in os.walk(CACHE_DIR):
+        for name in names:
+            try:
+                os.remove(os.path.join(root, name))
+            except OSError:
+                pass
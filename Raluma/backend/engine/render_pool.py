@@ -0,0 +1,331 @@
+"""
+Пул рендеринга PDF (WeasyPrint) вне процесса API.
+
+WeasyPrint держит GIL на всё время вёрстки, поэтому рендер вынесен
+в отдельные процессы: эндпоинты только отправляют HTML и ждут байты.
+
+Настройки (env):
+  RENDER_WORKERS    — число процессов; 0 — рендер в одном потоке (dev/тесты)
+  RENDER_TIMEOUT    — секунд на одну задачу; отсчёт — с её старта в воркере,
+                      время в очереди не считается
+  RENDER_MEMORY_MB  — лимит адресного пространства процесса (0 — без лимита)
+  RENDER_JOB_TTL    — сколько секунд хранить завершённые задачи
+  RENDER_MAX_JOBS   — сколько фоновых задач может ждать и выполняться
+                      одновременно; сверх — RenderQueueFull (503)
+
+Фоновые задачи (create_job/get_job) хранятся в памяти процесса API,
+поэтому API запускается одним процессом uvicorn (см. Dockerfile):
+при нескольких воркерах опрос задачи попадал бы в чужой процесс.
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+import metrics
+from engine import pdf as pdf_engine
+from engine import pdf_cache
+
+WORKERS = int(os.getenv("RENDER_WORKERS", str(min(2, os.cpu_count() or 1))))
+TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "60"))
+MEMORY_MB = int(os.getenv("RENDER_MEMORY_MB", "1024"))
+JOB_TTL = float(os.getenv("RENDER_JOB_TTL", "600"))
+MAX_JOBS = int(os.getenv("RENDER_MAX_JOBS", "32"))
+# Запас сверх TIMEOUT: воркер сам прерывает задачу по SIGALRM
+_WAIT_GRACE = 5.0
+# Как часто ожидающий проверяет, не стартовала ли задача в воркере
+_START_POLL = 0.5
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+# ── Код воркера (выполняется в дочернем процессе) ────────────────────────────
+
+
+# Воркеры сообщают сюда id задачи в момент её старта
+_start_queue = None
+
+
+def _init_worker(memory_mb: int, start_queue) -> None:
+    global _start_queue
+    _start_queue = start_queue
+    if memory_mb > 0:
+        import resource
+
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _on_alarm(signum, frame):
+    raise RenderTimeout()
+
+
+def _run_in_worker(fn, arg, timeout: float, task_id: str) -> bytes:
+    _start_queue.put(task_id)
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(arg)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _run_in_thread(fn, arg, task_id: str) -> bytes:
+    _mark_started(task_id)
+    return fn(arg)
+
+
+# ── Пул ──────────────────────────────────────────────────────────────────────
+
+# id задачи → monotonic-время старта в воркере (None — ещё в очереди)
+_tasks: dict[str, float | None] = {}
+_tasks_lock = threading.Lock()
+
+
+def _mark_started(task_id: str) -> None:
+    with _tasks_lock:
+        if task_id in _tasks:
+            _tasks[task_id] = time.monotonic()
+
+
+def _drain_started() -> None:
+    """Забрать сообщения о старте задач от процессов пула."""
+    start_queue = _start_queue
+    if start_queue is None:
+        return
+    while True:
+        try:
+            task_id = start_queue.get_nowait()
+        except (queue.Empty, OSError, ValueError):
+            return
+        _mark_started(task_id)
+
+
+def started_at(future: Future) -> float | None:
+    """Когда задача стартовала в воркере (monotonic) или None — ещё в очереди."""
+    _drain_started()
+    with _tasks_lock:
+        return _tasks.get(future.task_id)
+
+
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> Executor:
+    global _executor
+    global _start_queue
+    with _executor_lock:
+        if _executor is None:
+            if WORKERS > 0:
+                ctx = multiprocessing.get_context("spawn")
+                if _start_queue is None:
+                    _start_queue = ctx.Queue()
+                _executor = ProcessPoolExecutor(
+                    max_workers=WORKERS,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                    initargs=(MEMORY_MB, _start_queue),
+                )
+            else:
+                _executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="pdf-render"
+                )
+        return _executor
+
+
+def _reset_executor(broken: Executor | None) -> None:
+    global _executor
+    if broken is None:
+        return
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _forget(task_id: str) -> None:
+    with _tasks_lock:
+        _tasks.pop(task_id, None)
+
+
+def _submit(fn, arg) -> Future:
+    """Задача пула. Упавший пул (OOM, segfault) пересоздаётся."""
+    executor = _get_executor()
+    task_id = uuid.uuid4().hex
+    with _tasks_lock:
+        _tasks[task_id] = None
+    try:
+        if isinstance(executor, ProcessPoolExecutor):
+            future = executor.submit(_run_in_worker, fn, arg, TIMEOUT, task_id)
+        else:
+            future = executor.submit(_run_in_thread, fn, arg, task_id)
+    except BrokenProcessPool:
+        _forget(task_id)
+        _reset_executor(executor)
+        return _submit(fn, arg)
+    future.task_id = task_id
+    future.add_done_callback(lambda f: _forget(task_id))
+    return future
+
+
+def submit(html: str) -> Future:
+    """Отправить HTML на рендер."""
+    return _submit(pdf_engine.generate_pdf, html)
+
+
+def wait(future: Future) -> bytes:
+    """
+    Дождаться задачи пула. GIL процесса API при ожидании свободен.
+    Срок — TIMEOUT с момента старта задачи в воркере: пока она в очереди,
+    ожидание не ограничено.
+    """
+    while True:
+        started = started_at(future)
+        if started is None:
+            timeout = _START_POLL
+        else:
+            timeout = max(0.0, started + TIMEOUT + _WAIT_GRACE - time.monotonic())
+        try:
+            return future.result(timeout=timeout)
+        except BrokenProcessPool:
+            _reset_executor(_executor)
+            raise
+        except TimeoutError:
+            if started is not None:
+                future.cancel()
+                raise RenderTimeout()
+
+
+def render(html: str) -> bytes:
+    """Синхронный рендер через пул."""
+    return wait(submit(html))
+
+
+def merge(parts: list[bytes]) -> bytes:
+    """Склеить готовые PDF в один документ — тоже в пуле, с тем же таймаутом и лимитом памяти."""
+    return wait(_submit(pdf_engine.merge_pdfs, parts))
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ── Фоновые задачи ───────────────────────────────────────────────────────────
+
+
+@dataclass
+class RenderJob:
+    id: str
+    user_id: int
+    filename: str
+    cache_key: str
+    status: str = "queued"  # queued | running | done | failed
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    result: bytes | None = None
+    future: Future | None = field(default=None, repr=False)
+
+
+_jobs: dict[str, RenderJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _purge_expired() -> None:
+    now = time.time()
+    with _jobs_lock:
+        for job_id in [
+            j.id
+            for j in _jobs.values()
+            if j.finished_at is not None and now - j.finished_at > JOB_TTL
+        ]:
+            del _jobs[job_id]
+
+
+def _finish(job: RenderJob, future: Future) -> None:
+    error = None
+    try:
+        result = future.result()
+    except BrokenProcessPool:
+        error = "Процесс рендеринга аварийно завершился"
+        _reset_executor(_executor)
+    except RenderTimeout:
+        error = "Превышено время рендеринга"
+    except MemoryError:
+        error = "Превышен лимит памяти рендеринга"
+    except Exception as e:
+        error = str(e) or e.__class__.__name__
+    else:
+        metrics.inc(pdf_engine.PDF_BYTES, len(result), kind="job")
+        pdf_cache.put(job.cache_key, result)
+    with _jobs_lock:
+        if error is None:
+            job.result = result
+            job.status = "done"
+        else:
+            job.status = "failed"
+            job.error = error
+        job.finished_at = time.time()
+        job.future = None
+
+
+def create_job(
+    html: str | None,
+    cache_key: str,
+    user_id: int,
+    filename: str,
+    result: bytes | None = None,
+) -> RenderJob:
+    """
+    Поставить рендер в очередь и сразу вернуть задачу.
+    result — PDF уже есть в кэше, задача создаётся завершённой.
+    Незавершённых задач уже MAX_JOBS — RenderQueueFull.
+    """
+    _purge_expired()
+    job = RenderJob(
+        id=uuid.uuid4().hex, user_id=user_id, filename=filename, cache_key=cache_key
+    )
+    if result is not None:
+        job.result = result
+        job.status = "done"
+        job.finished_at = time.time()
+        with _jobs_lock:
+            _jobs[job.id] = job
+        return job
+    with _jobs_lock:
+        active = sum(1 for j in _jobs.values() if j.finished_at is None)
+        if active >= MAX_JOBS:
+            raise RenderQueueFull()
+        _jobs[job.id] = job
+    job.future = submit(html)
+    job.future.add_done_callback(lambda f: _finish(job, f))
+    return job
+
+
+def get_job(job_id: str) -> RenderJob | None:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        future = job.future if job is not None else None
+    if future is not None and started_at(future) is not None:
+        with _jobs_lock:
+            if job.status == "queued":
+                job.status = "running"
+    return job
@@ -0,0 +1,294 @@
+"""
+Пакетный расчёт СЛАЙД 1 ряд по столбцам.
+
+Вход — столбцы полей секции (CALC_FIELDS → список значений),
+выход — столбцы результатов: размеры стёкол, длины и количества профилей,
+количество фурнитуры и саморезов. Каждая величина считается одним проходом
+по столбцу, без объектов SlideCalcResult на каждую секцию.
+
+Таблицы и формулы — общие с calculate_slide (engine/slide_calc.py),
+здесь только обход по столбцам, поэтому числа совпадают до бита.
+
+Настройки (env):
+  CALC_BATCH_MAX — сколько секций принимает POST /api/calc/slide/batch
+"""
+
+import os
+
+from engine.slide_calc import (
+    CALC_FIELDS,
+    INTER_GLASS_ARTICLES,
+    INTER_GLASS_WITH_BRUSH,
+    SCREW_4838,
+    THRESHOLD_ARTICLES,
+    brush_7x6_m,
+    brush_7x12_m,
+    damper_qty,
+    edge_profile_length,
+    glass_widths,
+    handle_article,
+    inter_glass_count,
+    is_deaf,
+    is_painted,
+    is_standard_threshold,
+    lock_article,
+    middle_glass_qty,
+    middle_profile_length,
+    profile_lengths,
+    side_allowances,
+    sides,
+)
+
+BATCH_MAX = int(os.getenv("CALC_BATCH_MAX", "1000"))
+
+# Профили: слот → артикул/длина/кол-во (кол-во 0 — профиля в секции нет)
+PROFILE_SLOTS = (
+    "threshold",
+    "top_guide",
+    "wall",
+    "inter_glass",
+    "lock_bar",
+    "handle_bar",
+    "p_bar",
+    "bubble",
+    "floor_latch",
+)
+
+
+def columns_from_sections(sections) -> dict[str, list]:
+    """Список секций (ORM / pydantic / SimpleNamespace) → столбцы CALC_FIELDS."""
+    return {f: [getattr(s, f, None) for s in sections] for f in CALC_FIELDS}
+
+
+def _count(left: list, right: list, article: str) -> list[int]:
+    """Сколько сторон с артикулом замка/ручки article."""
+    return [sides(x == article, y == article) for x, y in zip(left, right)]
+
+
+def calculate_slide_batch(columns: dict[str, list]) -> dict[str, list]:
+    """
+    Пакетный расчёт. columns — {поле: [значение по каждой секции]},
+    отсутствующие поля считаются пустыми. Возвращает {величина: [по секциям]}.
+    """
+    n = max((len(v) for v in columns.values()), default=0)
+
+    def col(name):
+        return columns.get(name) or [None] * n
+
+    def flag(name):
+        return [bool(v) for v in col(name)]
+
+    W = [float(v or 2000) for v in col("width")]
+    H = [float(v or 2400) for v in col("height")]
+    P = [int(v or 3) for v in col("panels")]
+    Q = [int(v or 1) for v in col("quantity")]
+    rails = [int(v or 3) for v in col("rails")]
+    std = [is_standard_threshold(v or "") for v in col("threshold")]
+    painted = [is_painted(v or "") for v in col("painting_type")]
+
+    wall_l, wall_r = flag("profile_left_wall"), flag("profile_right_wall")
+    lock_bar_l, lock_bar_r = (
+        flag("profile_left_lock_bar"),
+        flag("profile_right_lock_bar"),
+    )
+    p_bar_l, p_bar_r = flag("profile_left_p_bar"), flag("profile_right_p_bar")
+    hb_l, hb_r = flag("profile_left_handle_bar"), flag("profile_right_handle_bar")
+    bub_l, bub_r = flag("profile_left_bubble"), flag("profile_right_bubble")
+    a = [int(v or 0) for v in col("handle_offset_left")]
+    b = [int(v or 0) for v in col("handle_offset_right")]
+
+    handle_l = [v or "Без" for v in col("handle_left")]
+    handle_r = [v or "Без" for v in col("handle_right")]
+    lock_l = [v or "Без" for v in col("lock_left")]
+    lock_r = [v or "Без" for v in col("lock_right")]
+    left_deaf = list(map(is_deaf, handle_l, lock_l, hb_l))
+    right_deaf = list(map(is_deaf, handle_r, lock_r, hb_r))
+    ig_type = [v or "Без" for v in col("inter_glass_profile")]
+
+    # ── Длины ─────────────────────────────────────────────────────────────────
+    wall_count = list(map(sides, wall_l, wall_r))
+    threshold_len = [w - 16 * c for w, c in zip(W, wall_count)]
+    lengths = list(map(profile_lengths, H, std))
+    inter_glass_len = [x[0] for x in lengths]
+    lock_bar_len = [x[1] for x in lengths]
+    glass_H = [x[2] for x in lengths]
+
+    # ── Стёкла ────────────────────────────────────────────────────────────────
+    left_allow = list(map(side_allowances, wall_l, lock_bar_l, p_bar_l, hb_l, bub_l))
+    right_allow = list(map(side_allowances, wall_r, lock_bar_r, p_bar_r, hb_r, bub_r))
+    widths = list(map(glass_widths, W, P, a, b, left_allow, right_allow))
+
+    out: dict[str, list] = {}
+    out["glass_height"] = [round(g, 1) for g in glass_H]
+    out["glass_middle_width"] = [round(m, 1) for m, _, _ in widths]
+    out["glass_left_width"] = [round(lw, 1) for _, lw, _ in widths]
+    out["glass_right_width"] = [round(rw, 1) for _, _, rw in widths]
+    # Левое и правое одинаковые — в листе одна строка «Крайние»
+    edges_equal = [
+        p > 1 and lw == rw
+        for p, lw, rw in zip(P, out["glass_left_width"], out["glass_right_width"])
+    ]
+    out["glass_edges_equal"] = edges_equal
+    out["glass_left_qty"] = [q if p > 1 else 0 for q, p in zip(Q, P)]
+    out["glass_right_qty"] = out["glass_left_qty"]
+    out["glass_middle_qty"] = list(map(middle_glass_qty, P, Q))
+
+    # Стекольный профиль RS2021 — длина на каждое стекло
+    out["glass_profile_left"] = list(
+        map(edge_profile_length, out["glass_left_width"], hb_l, bub_l, left_deaf)
+    )
+    out["glass_profile_right"] = [
+        lp if eq else edge_profile_length(w, hb, bub, d)
+        for lp, eq, w, hb, bub, d in zip(
+            out["glass_profile_left"],
+            edges_equal,
+            out["glass_right_width"],
+            hb_r,
+            bub_r,
+            right_deaf,
+        )
+    ]
+    out["glass_profile_middle"] = list(
+        map(middle_profile_length, out["glass_middle_width"], ig_type)
+    )
+
+    # ── Профили ───────────────────────────────────────────────────────────────
+    lb_count = list(map(sides, lock_bar_l, lock_bar_r))
+    hb_count = list(map(sides, hb_l, hb_r))
+    pb_count = list(map(sides, p_bar_l, p_bar_r))
+    bub_count = list(map(sides, bub_l, bub_r))
+    latch_count = list(
+        map(sides, col("floor_latches_left"), col("floor_latches_right"))
+    )
+    has_ig = [ig != "Без" and p > 1 for ig, p in zip(ig_type, P)]
+    ig_article = [INTER_GLASS_ARTICLES.get(ig, "RS2061") for ig in ig_type]
+
+    def slot(name, article, length, qty, slot_painted):
+        out[f"{name}_article"] = article
+        out[f"{name}_length_mm"] = length
+        out[f"{name}_qty"] = qty
+        out[f"{name}_painted"] = slot_painted
+
+    rounded_threshold = [round(x, 1) for x in threshold_len]
+    slot(
+        "threshold",
+        [THRESHOLD_ARTICLES.get((r, s), "RS2323") for r, s in zip(rails, std)],
+        rounded_threshold,
+        Q,
+        painted,
+    )
+    slot(
+        "top_guide",
+        ["RS1313" if r == 3 else "RS1315" for r in rails],
+        rounded_threshold,
+        Q,
+        painted,
+    )
+    slot(
+        "wall",
+        ["RS2333" if r == 3 else "RS2335" for r in rails],
+        [round(h, 1) for h in H],
+        [q * c for q, c in zip(Q, wall_count)],
+        painted,
+    )
+    slot(
+        "inter_glass",
+        ig_article,
+        [round(x, 1) for x in inter_glass_len],
+        [(p - 1) * q if h else 0 for p, q, h in zip(P, Q, has_ig)],
+        [pt and art == "RS2061" for pt, art in zip(painted, ig_article)],
+    )
+    slot(
+        "lock_bar",
+        ["RS2081"] * n,
+        [round(x, 1) for x in lock_bar_len],
+        [c * q for c, q in zip(lb_count, Q)],
+        painted,
+    )
+    slot(
+        "handle_bar",
+        ["RS112"] * n,
+        [round(x, 1) for x in inter_glass_len],
+        [c * q for c, q in zip(hb_count, Q)],
+        painted,
+    )
+    slot(
+        "p_bar",
+        ["RS1082"] * n,
+        [round(x, 1) for x in lock_bar_len],
+        [c * q for c, q in zip(pb_count, Q)],
+        painted,
+    )
+    slot(
+        "bubble",
+        ["RS1002"] * n,
+        [round(g - 17, 1) for g in glass_H],
+        [c * q for c, q in zip(bub_count, Q)],
+        [False] * n,
+    )
+    slot(
+        "floor_latch",
+        ["RS205"] * n,
+        [0] * n,
+        [c * q for c, q in zip(latch_count, Q)],
+        [False] * n,
+    )
+
+    # ── Фурнитура ─────────────────────────────────────────────────────────────
+    ig_cnt = list(map(inter_glass_count, P, Q))
+    out["ru008_m"] = list(
+        map(brush_7x6_m, threshold_len, P, Q, inter_glass_len, hb_count)
+    )
+    out["ru007_m"] = list(map(brush_7x12_m, inter_glass_len, ig_cnt, ig_type))
+    damper = list(map(damper_qty, P, Q))
+    out["rsd1"] = damper
+    out["rsd2"] = damper
+    out["rs1121"] = [c * q for c, q in zip(hb_count, Q)]
+
+    lock_art_l = list(map(lock_article, lock_l))
+    lock_art_r = list(map(lock_article, lock_r))
+    lock3018 = _count(lock_art_l, lock_art_r, "RS3018")
+    lock3019 = _count(lock_art_l, lock_art_r, "RS3019")
+    out["rs3018"] = [c * q for c, q in zip(lock3018, Q)]
+    out["rs3019"] = [c * q for c, q in zip(lock3019, Q)]
+    out["rs122"] = [(x + y) * q for x, y, q in zip(lock3018, lock3019, Q)]
+    out["rs3020"] = out["rs122"]
+    out["ru005"] = [p * 2 * q for p, q in zip(P, Q)]
+    handle_art_l = list(map(handle_article, handle_l))
+    handle_art_r = list(map(handle_article, handle_r))
+    out["rs3017"] = [
+        c * q for c, q in zip(_count(handle_art_l, handle_art_r, "RS3017"), Q)
+    ]
+    out["rs3014"] = [
+        c * q for c, q in zip(_count(handle_art_l, handle_art_r, "RS3014"), Q)
+    ]
+    brush_ig = [
+        c > 0 and ig in INTER_GLASS_WITH_BRUSH for c, ig in zip(ig_cnt, ig_type)
+    ]
+    first_right = [(v or "Справа") == "Справа" for v in col("first_panel_inside")]
+    out["rs107l"] = [
+        c if ok and fr else 0 for c, ok, fr in zip(ig_cnt, brush_ig, first_right)
+    ]
+    out["rs107r"] = [
+        c if ok and not fr else 0 for c, ok, fr in zip(ig_cnt, brush_ig, first_right)
+    ]
+    out["rs105"] = damper
+    out["rs106"] = [
+        sides(not ld, not rd) * q for ld, rd, q in zip(left_deaf, right_deaf, Q)
+    ]
+    out["rs107"] = [x + y for x, y in zip(out["rs105"], out["rs106"])]
+
+    # ── Саморезы ──────────────────────────────────────────────────────────────
+    out["screw_4819"] = [x * 2 for x in out["rs107"]]
+    out["screw_3913m"] = [
+        r * 2 + c * 7 * q for r, c, q in zip(out["ru005"], lb_count, Q)
+    ]
+    out["screw_4838"] = [SCREW_4838.get((r, s), 8) for r, s in zip(rails, std)]
+    out["screw_3913o"] = [c * q * 7 for c, q in zip(pb_count, Q)]
+    out["screw_5425"] = [
+        sides(ld, rd) * q for ld, rd, q in zip(left_deaf, right_deaf, Q)
+    ]
+    out["screw_3513"] = [x * 2 for x in out["rs122"]]
+    out["ru1039"] = Q
+    out["rs150"] = Q
+    return out
@@ -4,7 +4,14 @@
 Выходные данные: SlideCalcResult
 """
 
+import os
 from dataclasses import dataclass, field
+from functools import lru_cache
+from types import SimpleNamespace
+
+# Версия правил расчёта. Увеличивать при любом изменении формул или таблиц:
+# входит в ключ кэша PDF и ETag листа (engine/pdf_cache.py)
+CALC_VERSION = 1
 
 
 @dataclass
@@ -70,14 +77,14 @@ class SlideCalcResult:
     panel_rails: list[int] = field(default_factory=list)  # panel i → rail index
 
 
-def _is_standard_threshold(threshold: str | None) -> bool:
+def is_standard_threshold(threshold: str | None) -> bool:
     """True если порог стандартный (анод или окраш), False если накладной."""
     if not threshold:
         return True
     return "накладной" not in threshold.lower()
 
 
-def _is_painted(painting_type: str | None) -> bool:
+def is_painted(painting_type: str | None) -> bool:
     """True если профиль красится (RAL стандарт или нестандарт)."""
     if not painting_type:
         return False
@@ -85,6 +92,158 @@ def _is_painted(painting_type: str | None) -> bool:
     return "рал" in pt or "ral" in pt
 
 
+# ── Таблицы и формулы одной секции (общие с engine/slide_batch.py) ────────────
+
+THRESHOLD_ARTICLES = {
+    (3, True): "RS2323",
+    (3, False): "RS23231",
+    (5, True): "RS2325",
+    (5, False): "RS23251",
+}
+INTER_GLASS_ARTICLES = {
+    "Алюминиевый RS2061": "RS2061",
+    "Прозрачный RS1006": "RS1006",
+    "Прозрачный с фетром RS1006": "RS1006",
+    "h-профиль RS1004": "RS1004",
+}
+# Межстекольные профили со щёточным уплотнителем 7×12 и заглушкой RS107L/R
+INTER_GLASS_WITH_BRUSH = (
+    "Алюминиевый RS2061",
+    "Прозрачный RS1006",
+    "Прозрачный с фетром RS1006",
+)
+# Саморезы 4,8×38 по (рельсов, стандартный порог)
+SCREW_4838 = {(3, True): 8, (5, True): 12, (3, False): 4, (5, False): 6}
+
+
+def sides(left, right) -> int:
+    """Сколько сторон (0–2) с признаком."""
+    return (1 if left else 0) + (1 if right else 0)
+
+
+def side_allowances(wall: bool, lock_bar: bool, p_bar: bool, handle_bar: bool, bubble: bool):
+    """Вычеты по одной стороне для ширины стёкол: (pp, rp, pz, kr, kp), мм."""
+    if handle_bar and lock_bar:
+        rp = 59.5
+    elif handle_bar and p_bar:
+        rp = 27
+    else:
+        rp = 0
+    return (
+        16 if wall else 0,
+        rp,
+        5 if bubble else 0,
+        8 if handle_bar else 0,
+        16 if (p_bar and bubble) else 0,
+    )
+
+
+def glass_widths(W: float, P: int, a: int, b: int, left: tuple, right: tuple):
+    """
+    (промежуточное, левое, правое) — ширины стёкол до округления.
+    left/right — side_allowances; при одной панели крайних стёкол нет (0.0).
+    """
+    ppl, rpl, pzl, krlr, krlp = left
+    ppr, rpr, pzr, krrr, krrp = right
+    if P == 1:
+        return W - ppr - ppl - pzl - pzr, 0.0, 0.0
+    middle_W = (
+        W
+        - ppr
+        - ppl
+        - rpr
+        - rpl
+        - pzl
+        - pzr
+        - krlr
+        - krlp
+        - krrr
+        - krrp
+        - a
+        - b
+        + 9.5 * (P - 1)
+    ) / P
+    return middle_W, middle_W + a + krlr + krlp, middle_W + b + krrr + krrp
+
+
+def middle_glass_qty(P: int, Q: int) -> int:
+    if P == 1:
+        return Q
+    return (P - 2) * Q if P > 2 else 0
+
+
+def profile_lengths(H: float, std: bool):
+    """(межстекольный и ручка-профиль, профиль-замок и П-профиль, высота стекла)."""
+    if std:
+        return H - 162, H - 65, H - 106
+    return H - 150, H - 55, H - 94
+
+
+def is_deaf(handle: str, lock: str, handle_bar: bool) -> bool:
+    """Глухая крайняя панель: без ручки, замка и профиля-ручки."""
+    return (handle.lower() == "глухая" or handle == "Без") and lock == "Без" and not handle_bar
+
+
+def edge_profile_length(width: float, handle_bar: bool, bubble: bool, deaf: bool) -> float:
+    """Стекольный профиль RS2021 крайнего стекла."""
+    length = width
+    if handle_bar:
+        length += 16
+    if bubble and not deaf:
+        length -= 3
+    return round(length, 1)
+
+
+def middle_profile_length(width: float, inter_glass_type: str) -> float:
+    """Стекольный профиль RS2021 промежуточного стекла."""
+    length = width
+    if inter_glass_type != "Без":
+        length -= 3
+    return round(length, 1)
+
+
+def inter_glass_count(P: int, Q: int) -> int:
+    return (P - 1) * Q if P > 1 else 0
+
+
+def damper_qty(P: int, Q: int) -> int:
+    """RSD1, RSD2 и заглушки RS105 — по две на каждый стык панелей."""
+    return (P - 1) * 2 * Q if P > 1 else 0
+
+
+def brush_7x6_m(top_len: float, P: int, Q: int, handle_bar_len: float, hb_count: int) -> float:
+    """RU008: по верхнему направляющему на каждую панель и по профилям-ручкам."""
+    handle_bar_len_m = handle_bar_len / 1000
+    top_len_m = top_len / 1000
+    return round(top_len_m * P * 2 * Q + (handle_bar_len_m + 0.03) * hb_count * Q, 3)
+
+
+def brush_7x12_m(inter_glass_len: float, inter_glass_cnt: int, inter_glass_type: str) -> float:
+    """RU007: в межстекольные профили со щёточным уплотнителем."""
+    if inter_glass_cnt > 0 and inter_glass_type in INTER_GLASS_WITH_BRUSH:
+        ig_len_m = inter_glass_len / 1000
+        return round((ig_len_m + 0.03) * inter_glass_cnt, 3)
+    return 0.0
+
+
+def lock_article(lock: str) -> str | None:
+    """Замок-защёлка: RS3018 (1-сторонний), RS3019 (2-сторонний / с ключом)."""
+    if "1стор" in lock or "1-сторон" in lock.lower():
+        return "RS3018"
+    if "2стор" in lock or "2-сторон" in lock.lower() or "ключ" in lock.lower():
+        return "RS3019"
+    return None
+
+
+def handle_article(handle: str) -> str | None:
+    """Ручка: RS3017 (стеклянная), RS3014 (кноб)."""
+    if "стеклян" in handle.lower() or "RS3017" in handle:
+        return "RS3017"
+    if "кноб" in handle.lower() or "RS3014" in handle:
+        return "RS3014"
+    return None
+
+
 def calculate_slide(section) -> SlideCalcResult:
     """
     Основной расчёт для системы СЛАЙД 1 ряд.
@@ -101,8 +260,8 @@ def calculate_slide(section) -> SlideCalcResult:
     painting_type = section.painting_type or ""
     ral_color = section.ral_color or ""
 
-    std = _is_standard_threshold(threshold)
-    painted = _is_painted(painting_type)
+    std = is_standard_threshold(threshold)
+    painted = is_painted(painting_type)
 
     # ── Текстовые описания ────────────────────────────────────────────────────
 
@@ -145,29 +304,8 @@ def calculate_slide(section) -> SlideCalcResult:
     bubble_l = bool(section.profile_left_bubble)
     bubble_r = bool(section.profile_right_bubble)
 
-    ppl = 16 if wall_l else 0
-    ppr = 16 if wall_r else 0
-
-    if handle_bar_l and lock_bar_l:
-        rpl = 59.5
-    elif handle_bar_l and p_bar_l:
-        rpl = 27
-    else:
-        rpl = 0
-
-    if handle_bar_r and lock_bar_r:
-        rpr = 59.5
-    elif handle_bar_r and p_bar_r:
-        rpr = 27
-    else:
-        rpr = 0
-
-    pzl = 5 if bubble_l else 0
-    pzr = 5 if bubble_r else 0
-    krlr = 8 if handle_bar_l else 0
-    krrr = 8 if handle_bar_r else 0
-    krlp = 16 if (p_bar_l and bubble_l) else 0
-    krrp = 16 if (p_bar_r and bubble_r) else 0
+    left_allowances = side_allowances(wall_l, lock_bar_l, p_bar_l, handle_bar_l, bubble_l)
+    right_allowances = side_allowances(wall_r, lock_bar_r, p_bar_r, handle_bar_r, bubble_r)
 
     a = int(section.handle_offset_left or 0)
     b = int(section.handle_offset_right or 0)
@@ -179,99 +317,50 @@ def calculate_slide(section) -> SlideCalcResult:
     lock_l = section.lock_left or "Без"
     lock_r = section.lock_right or "Без"
 
-    left_is_deaf = (
-        (handle_l.lower() == "глухая" or handle_l == "Без")
-        and lock_l == "Без"
-        and not handle_bar_l
-    )
-    right_is_deaf = (
-        (handle_r.lower() == "глухая" or handle_r == "Без")
-        and lock_r == "Без"
-        and not handle_bar_r
-    )
+    left_is_deaf = is_deaf(handle_l, lock_l, handle_bar_l)
+    right_is_deaf = is_deaf(handle_r, lock_r, handle_bar_r)
 
     # ── Длины профилей ────────────────────────────────────────────────────────
 
-    wall_count = (1 if wall_l else 0) + (1 if wall_r else 0)
+    wall_count = sides(wall_l, wall_r)
     threshold_len = W - 16 * wall_count
 
-    if std:
-        inter_glass_len = H - 162
-        lock_bar_len = H - 65
-        handle_bar_len = H - 162
-        p_bar_len = H - 65
-        glass_H = H - 106
-    else:
-        inter_glass_len = H - 150
-        lock_bar_len = H - 55
-        handle_bar_len = H - 150
-        p_bar_len = H - 55
-        glass_H = H - 94
+    inter_glass_len, lock_bar_len, glass_H = profile_lengths(H, std)
+    handle_bar_len = inter_glass_len
+    p_bar_len = lock_bar_len
 
     # ── Расчёт стёкол ─────────────────────────────────────────────────────────
 
     inter_glass_type = section.inter_glass_profile or "Без"
 
+    middle_W, left_W, right_W = glass_widths(
+        W, P, a, b, left_allowances, right_allowances
+    )
+    middle_qty = middle_glass_qty(P, Q)
+
     if P == 1:
         # Особый случай: одна глухая панель
-        middle_W = W - ppr - ppl - pzl - pzr
         result.glass.append(
-            GlassItem("Промежуточное", round(middle_W, 1), round(glass_H, 1), Q)
+            GlassItem("Промежуточное", round(middle_W, 1), round(glass_H, 1), middle_qty)
+        )
+    elif round(left_W, 1) == round(right_W, 1):
+        result.glass.append(GlassItem("Крайние", round(left_W, 1), round(glass_H, 1), 2 * Q))
+        result.glass.append(
+            GlassItem("Промежуточные", round(middle_W, 1), round(glass_H, 1), middle_qty)
         )
     else:
-        middle_W = (
-            W
-            - ppr
-            - ppl
-            - rpr
-            - rpl
-            - pzl
-            - pzr
-            - krlr
-            - krlp
-            - krrr
-            - krrp
-            - a
-            - b
-            + 9.5 * (P - 1)
-        ) / P
-        left_W = middle_W + a + krlr + krlp
-        right_W = middle_W + b + krrr + krrp
-
-        if round(left_W, 1) == round(right_W, 1):
-            result.glass.append(GlassItem("Крайние", round(left_W, 1), round(glass_H, 1), 2 * Q))
-            result.glass.append(
-                GlassItem(
-                    "Промежуточные",
-                    round(middle_W, 1),
-                    round(glass_H, 1),
-                    (P - 2) * Q if P > 2 else 0,
-                )
-            )
-        else:
-            result.glass.append(GlassItem("Левое", round(left_W, 1), round(glass_H, 1), Q))
-            result.glass.append(
-                GlassItem(
-                    "Промежуточные",
-                    round(middle_W, 1),
-                    round(glass_H, 1),
-                    (P - 2) * Q if P > 2 else 0,
-                )
-            )
-            result.glass.append(
-                GlassItem("Правое", round(right_W, 1), round(glass_H, 1), Q)
-            )
+        result.glass.append(GlassItem("Левое", round(left_W, 1), round(glass_H, 1), Q))
+        result.glass.append(
+            GlassItem("Промежуточные", round(middle_W, 1), round(glass_H, 1), middle_qty)
+        )
+        result.glass.append(
+            GlassItem("Правое", round(right_W, 1), round(glass_H, 1), Q)
+        )
 
     # ── Профили ───────────────────────────────────────────────────────────────
 
     # Порог
-    threshold_articles = {
-        (3, True): "RS2323",
-        (3, False): "RS23231",
-        (5, True): "RS2325",
-        (5, False): "RS23251",
-    }
-    threshold_article = threshold_articles.get((rails, std), "RS2323")
+    threshold_article = THRESHOLD_ARTICLES.get((rails, std), "RS2323")
     result.profiles.append(
         ProfileItem(
             article=threshold_article,
@@ -320,13 +409,7 @@ def calculate_slide(section) -> SlideCalcResult:
 
     # Межстекольный
     if inter_glass_type != "Без" and P > 1:
-        ig_articles = {
-            "Алюминиевый RS2061": "RS2061",
-            "Прозрачный RS1006": "RS1006",
-            "Прозрачный с фетром RS1006": "RS1006",
-            "h-профиль RS1004": "RS1004",
-        }
-        ig_article = ig_articles.get(inter_glass_type, "RS2061")
+        ig_article = INTER_GLASS_ARTICLES.get(inter_glass_type, "RS2061")
         ig_note = (
             "вставить фетровое уплотнение" if ig_article in ("RS2061", "RS1006") else ""
         )
@@ -344,7 +427,7 @@ def calculate_slide(section) -> SlideCalcResult:
         )
 
     # Боковой профиль-замок RS2081
-    lb_count = (1 if lock_bar_l else 0) + (1 if lock_bar_r else 0)
+    lb_count = sides(lock_bar_l, lock_bar_r)
     if lb_count > 0:
         result.profiles.append(
             ProfileItem(
@@ -360,7 +443,7 @@ def calculate_slide(section) -> SlideCalcResult:
         )
 
     # Ручка-профиль RS112
-    hb_count = (1 if handle_bar_l else 0) + (1 if handle_bar_r else 0)
+    hb_count = sides(handle_bar_l, handle_bar_r)
     if hb_count > 0:
         result.profiles.append(
             ProfileItem(
@@ -376,7 +459,7 @@ def calculate_slide(section) -> SlideCalcResult:
         )
 
     # П-профиль RS1082
-    pb_count = (1 if p_bar_l else 0) + (1 if p_bar_r else 0)
+    pb_count = sides(p_bar_l, p_bar_r)
     if pb_count > 0:
         result.profiles.append(
             ProfileItem(
@@ -392,7 +475,7 @@ def calculate_slide(section) -> SlideCalcResult:
         )
 
     # Пузырьковый RS1002
-    bub_count = (1 if bubble_l else 0) + (1 if bubble_r else 0)
+    bub_count = sides(bubble_l, bubble_r)
     if bub_count > 0:
         bub_len = glass_H - 17
         result.profiles.append(
@@ -409,9 +492,7 @@ def calculate_slide(section) -> SlideCalcResult:
         )
 
     # Защёлка в пол RS205
-    latch_count = (1 if section.floor_latches_left else 0) + (
-        1 if section.floor_latches_right else 0
-    )
+    latch_count = sides(section.floor_latches_left, section.floor_latches_right)
     if latch_count > 0:
         result.profiles.append(
             ProfileItem(
@@ -428,26 +509,16 @@ def calculate_slide(section) -> SlideCalcResult:
 
     # Стекольный профиль RS2021
     for g in result.glass:
-        base_len = g.width_mm
-        if g.position == "Левое":
-            if handle_bar_l:
-                base_len += 16
-            if bubble_l and not left_is_deaf:
-                base_len -= 3
+        if g.position in ("Левое", "Крайние"):
+            g.glass_profile_length = edge_profile_length(
+                g.width_mm, handle_bar_l, bubble_l, left_is_deaf
+            )
         elif g.position == "Правое":
-            if handle_bar_r:
-                base_len += 16
-            if bubble_r and not right_is_deaf:
-                base_len -= 3
-        elif g.position == "Крайние":
-            if handle_bar_l:
-                base_len += 16
-            if bubble_l and not left_is_deaf:
-                base_len -= 3
-        elif g.position == "Промежуточные" or g.position == "Промежуточное":
-            if inter_glass_type != "Без":
-                base_len -= 3
-        g.glass_profile_length = round(base_len, 1)
+            g.glass_profile_length = edge_profile_length(
+                g.width_mm, handle_bar_r, bubble_r, right_is_deaf
+            )
+        else:
+            g.glass_profile_length = middle_profile_length(g.width_mm, inter_glass_type)
 
     glass_profile_items = {}
     for g in result.glass:
@@ -473,19 +544,9 @@ def calculate_slide(section) -> SlideCalcResult:
     # ── Фурнитура ─────────────────────────────────────────────────────────────
 
     # Щёточный уплотнитель (RU008 + RU007 в одной ячейке)
-    handle_bar_len_m = handle_bar_len / 1000
-    top_len_m = top_len / 1000
-    ru008_m = round(top_len_m * P * 2 * Q + (handle_bar_len_m + 0.03) * hb_count * Q, 3)
-
-    inter_glass_cnt = (P - 1) * Q if P > 1 else 0
-    ru007_m = 0.0
-    if inter_glass_cnt > 0 and inter_glass_type in (
-        "Алюминиевый RS2061",
-        "Прозрачный RS1006",
-        "Прозрачный с фетром RS1006",
-    ):
-        ig_len_m = inter_glass_len / 1000
-        ru007_m = round((ig_len_m + 0.03) * inter_glass_cnt, 3)
+    ru008_m = brush_7x6_m(top_len, P, Q, handle_bar_len, hb_count)
+    inter_glass_cnt = inter_glass_count(P, Q)
+    ru007_m = brush_7x12_m(inter_glass_len, inter_glass_cnt, inter_glass_type)
 
     result.hardware.append(
         HardwareItem(
@@ -503,13 +564,13 @@ def calculate_slide(section) -> SlideCalcResult:
     )
 
     # RSD1 демпфер + RSD2 компенсатор
-    damper_qty = (P - 1) * 2 * Q if P > 1 else 0
-    if damper_qty > 0:
+    dampers = damper_qty(P, Q)
+    if dampers > 0:
         result.hardware.append(
-            HardwareItem("RSD1", "Демпфер", damper_qty, "шт", "RSD1.jpg", "rsd1")
+            HardwareItem("RSD1", "Демпфер", dampers, "шт", "RSD1.jpg", "rsd1")
         )
         result.hardware.append(
-            HardwareItem("RSD2", "Компенсатор", damper_qty, "шт", "RSD2.jpg", "rsd2")
+            HardwareItem("RSD2", "Компенсатор", dampers, "шт", "RSD2.jpg", "rsd2")
         )
 
     # RS1121 накладка на ручку-профиль
@@ -531,10 +592,11 @@ def calculate_slide(section) -> SlideCalcResult:
     lock3018_sides: list[str] = []
     lock3019_sides: list[str] = []
     for lk, side_name in [(lock_l, "слева"), (lock_r, "справа")]:
-        if "1стор" in lk or "1-сторон" in lk.lower():
+        lock_art = lock_article(lk)
+        if lock_art == "RS3018":
             lock3018 += 1
             lock3018_sides.append(side_name)
-        elif "2стор" in lk or "2-сторон" in lk.lower() or "ключ" in lk.lower():
+        elif lock_art == "RS3019":
             lock3019 += 1
             lock3019_sides.append(side_name)
 
@@ -590,9 +652,10 @@ def calculate_slide(section) -> SlideCalcResult:
     rs3017_qty = 0
     rs3014_qty = 0
     for h in [handle_l, handle_r]:
-        if "стеклян" in h.lower() or "RS3017" in h:
+        handle_art = handle_article(h)
+        if handle_art == "RS3017":
             rs3017_qty += 1
-        elif "кноб" in h.lower() or "RS3014" in h:
+        elif handle_art == "RS3014":
             rs3014_qty += 1
 
     if rs3017_qty > 0:
@@ -615,11 +678,7 @@ def calculate_slide(section) -> SlideCalcResult:
 
     # RS107R/L заглушка межстекольного
     first_panel = section.first_panel_inside or "Справа"
-    if inter_glass_cnt > 0 and inter_glass_type in (
-        "Алюминиевый RS2061",
-        "Прозрачный RS1006",
-        "Прозрачный с фетром RS1006",
-    ):
+    if inter_glass_cnt > 0 and inter_glass_type in INTER_GLASS_WITH_BRUSH:
         if first_panel == "Справа":
             # 1-я панель справа → сдвиг влево → RS107L
             result.hardware.append(
@@ -646,10 +705,10 @@ def calculate_slide(section) -> SlideCalcResult:
             )
 
     # RS105 заглушка стекольного
-    rs105_qty = (P - 1) * 2 * Q if P > 1 else 0
+    rs105_qty = damper_qty(P, Q)
 
     # RS106 — на крайние панели если они не глухие
-    rs106_qty = ((0 if left_is_deaf else 1) + (0 if right_is_deaf else 1)) * Q
+    rs106_qty = sides(not left_is_deaf, not right_is_deaf) * Q
 
     if rs105_qty > 0:
         result.hardware.append(
@@ -700,8 +759,7 @@ def calculate_slide(section) -> SlideCalcResult:
     )
 
     # 4,8×38 A2
-    screw4838_map = {(3, True): 8, (5, True): 12, (3, False): 4, (5, False): 6}
-    screw4838 = screw4838_map.get((rails, std), 8)
+    screw4838 = SCREW_4838.get((rails, std), 8)
     result.screws.append(
         ScrewItem("Саморез 4,8×38 A2 (DIN7982)", "4,8×38 A2", screw4838, "DIN7982.png",
                   note="Прикрутить RS1333/1335 к RS1313/1315 и порогу")
@@ -716,7 +774,7 @@ def calculate_slide(section) -> SlideCalcResult:
         )
 
     # 5,4×25 A2 — глухие панели
-    deaf_count = (1 if left_is_deaf else 0) + (1 if right_is_deaf else 0)
+    deaf_count = sides(left_is_deaf, right_is_deaf)
     screw5425 = deaf_count * Q
     if screw5425 > 0:
         result.screws.append(
@@ -738,13 +796,7 @@ def calculate_slide(section) -> SlideCalcResult:
     # ── Чеклист ───────────────────────────────────────────────────────────────
 
     ig = section.inter_glass_profile or "Без"
-    ig_article_map = {
-        "Алюминиевый RS2061": "RS2061",
-        "Прозрачный RS1006": "RS1006",
-        "Прозрачный с фетром RS1006": "RS1006",
-        "h-профиль RS1004": "RS1004",
-    }
-    ig_a = ig_article_map.get(ig, "")
+    ig_a = INTER_GLASS_ARTICLES.get(ig, "")
     if ig_a in ("RS2061", "RS1006") and P > 1:
         result.checklist.append(f"Вставить фетровое уплотнение 7×12 в {ig_a}")
 
@@ -768,3 +820,60 @@ def calculate_slide(section) -> SlideCalcResult:
     result.checklist.append("Приклеить наклейку РАЛЮМА (верх, право)")
 
     return result
+
+
+# ── Кэш расчёта ───────────────────────────────────────────────────────────────
+
+# Поля секции, которые читает calculate_slide — нормализованный вход для кэша
+CALC_FIELDS = (
+    "width",
+    "height",
+    "panels",
+    "quantity",
+    "rails",
+    "threshold",
+    "painting_type",
+    "ral_color",
+    "glass_type",
+    "first_panel_inside",
+    "unused_track",
+    "inter_glass_profile",
+    "profile_left_wall",
+    "profile_right_wall",
+    "profile_left_lock_bar",
+    "profile_right_lock_bar",
+    "profile_left_p_bar",
+    "profile_right_p_bar",
+    "profile_left_handle_bar",
+    "profile_right_handle_bar",
+    "profile_left_bubble",
+    "profile_right_bubble",
+    "handle_offset_left",
+    "handle_offset_right",
+    "handle_left",
+    "handle_right",
+    "lock_left",
+    "lock_right",
+    "floor_latches_left",
+    "floor_latches_right",
+)
+
+CALC_CACHE_SIZE = int(os.getenv("CALC_CACHE_SIZE", "1024"))
+
+
+def calc_key(section) -> tuple:
+    return tuple(getattr(section, f, None) for f in CALC_FIELDS)
+
+
+@lru_cache(maxsize=CALC_CACHE_SIZE)
+def calculate_by_key(key: tuple) -> SlideCalcResult:
+    """Расчёт по ключу calc_key (кэшируется). Результат изменять нельзя."""
+    return calculate_slide(SimpleNamespace(**dict(zip(CALC_FIELDS, key))))
+
+
+def calculate_slide_cached(section) -> SlideCalcResult:
+    """
+    calculate_slide с LRU-кэшем по нормализованному входу.
+    Результат общий для всех вызовов — изменять его нельзя.
+    """
+    return calculate_by_key(calc_key(section))
@@ -0,0 +1,277 @@
+"""
+Ограничение попыток входа (защита от перебора паролей).
+
+Скользящее окно LOGIN_WINDOW секунд: считаются неудачные входы отдельно
+по логину и по IP клиента. Набрал LOGIN_MAX_PER_USER (или
+LOGIN_MAX_PER_IP) неудач в окне — следующие попытки отклоняются с 429
+ещё до запроса к БД и bcrypt. Успешный вход сбрасывает счётчик логина.
+
+Проверка и учёт атомарны: attempt() заранее записывает попытку как неудачу
+(параллельные запросы не проскочат лимит все сразу), верный пароль её
+снимает (succeeded).
+
+Хранилище:
+  в памяти процесса (по умолчанию) — достаточно для одного воркера uvicorn;
+  LOGIN_LIMITER_DB=<путь к sqlite> — общий файл для нескольких воркеров.
+
+IP берётся из X-Forwarded-For (последний адрес — его добавил Caddy),
+если LOGIN_TRUST_PROXY=1, иначе — адрес TCP-соединения. По умолчанию 0:
+без прокси перед API заголовок подделывает сам клиент. В docker-compose
+включено — backend доступен только через Caddy.
+"""
+
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import metrics
+
+WINDOW = float(os.getenv("LOGIN_WINDOW", "900"))
+MAX_PER_USER = int(os.getenv("LOGIN_MAX_PER_USER", "5"))
+MAX_PER_IP = int(os.getenv("LOGIN_MAX_PER_IP", "30"))
+LIMITER_DB = os.getenv("LOGIN_LIMITER_DB", "")
+TRUST_PROXY = os.getenv("LOGIN_TRUST_PROXY", "0") == "1"
+
+# Память не растёт бесконечно: при таком числе ключей выкидываем пустые
+_SWEEP_AT = 10_000
+
+
+class MemoryStore:
+    """Метки времени неудач по ключу — в deque, старые отрезаются при чтении."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits: dict[str, deque] = {}
+
+    def _prune(self, key: str, now: float) -> deque | None:
+        hits = self._hits.get(key)
+        if hits is None:
+            return None
+        while hits and hits[0] <= now - WINDOW:
+            hits.popleft()
+        if not hits:
+            del self._hits[key]
+            return None
+        return hits
+
+    def _wait(self, key: str, limit: int, now: float) -> float:
+        hits = self._prune(key, now)
+        if hits is None or len(hits) < limit:
+            return 0
+        return hits[-limit] + WINDOW - now
+
+    def _record(self, key: str, now: float) -> None:
+        if len(self._hits) >= _SWEEP_AT:
+            for k in list(self._hits):
+                self._prune(k, now)
+        self._hits.setdefault(key, deque()).append(now)
+
+    def check(self, key: str, limit: int, now: float) -> float:
+        """Сколько секунд ждать (0 — можно пробовать)."""
+        with self._lock:
+            return self._wait(key, limit, now)
+
+    def record(self, key: str, now: float) -> None:
+        with self._lock:
+            self._record(key, now)
+
+    def attempt(
+        self, limits: list[tuple[str, int]], now: float
+    ) -> tuple[str | None, float]:
+        """
+        Проверить все ключи и, если ни один не заблокирован, записать попытку
+        по каждому — одним шагом. Возвращает (заблокированный ключ, ожидание).
+        """
+        with self._lock:
+            for key, limit in limits:
+                wait = self._wait(key, limit, now)
+                if wait > 0:
+                    return key, wait
+            for key, _ in limits:
+                self._record(key, now)
+            return None, 0
+
+    def release(self, key: str) -> None:
+        """Снять одну (последнюю) попытку по ключу."""
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits:
+                hits.pop()
+                if not hits:
+                    del self._hits[key]
+
+    def clear(self, key: str | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._hits.clear()
+            else:
+                self._hits.pop(key, None)
+
+    def locked(self, limits: dict[str, int], now: float) -> int:
+        with self._lock:
+            count = 0
+            for key in list(self._hits):
+                hits = self._prune(key, now)
+                limit = limits.get(key.split(":", 1)[0])
+                if hits is not None and limit and len(hits) >= limit:
+                    count += 1
+            return count
+
+
+class SqliteStore:
+    """То же в отдельном файле SQLite — общий для всех воркеров."""
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS login_failures (key TEXT NOT NULL, ts REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_login_failures_key_ts"
+        " ON login_failures (key, ts)",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        with contextlib.closing(self._open()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for stmt in self._SCHEMA:
+                conn.execute(stmt)
+
+    def _open(self) -> sqlite3.Connection:
+        # Транзакции открываются явно (_transaction), не модулем sqlite3
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Соединение на одну операцию, закрывается всегда. BEGIN IMMEDIATE
+        сразу берёт блокировку записи: проверка и запись других воркеров
+        ждут, пока эта транзакция не завершится.
+        """
+        with contextlib.closing(self._open()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _wait(conn, key: str, limit: int, now: float) -> float:
+        rows = conn.execute(
+            "SELECT ts FROM login_failures WHERE key = ? AND ts > ?"
+            " ORDER BY ts DESC LIMIT ?",
+            (key, now - WINDOW, limit),
+        ).fetchall()
+        if len(rows) < limit:
+            return 0
+        return rows[-1][0] + WINDOW - now
+
+    @staticmethod
+    def _record(conn, key: str, now: float) -> None:
+        conn.execute("INSERT INTO login_failures VALUES (?, ?)", (key, now))
+        conn.execute("DELETE FROM login_failures WHERE ts <= ?", (now - WINDOW,))
+
+    def check(self, key: str, limit: int, now: float) -> float:
+        with contextlib.closing(self._open()) as conn:
+            return self._wait(conn, key, limit, now)
+
+    def record(self, key: str, now: float) -> None:
+        with self._transaction() as conn:
+            self._record(conn, key, now)
+
+    def attempt(
+        self, limits: list[tuple[str, int]], now: float
+    ) -> tuple[str | None, float]:
+        with self._transaction() as conn:
+            for key, limit in limits:
+                wait = self._wait(conn, key, limit, now)
+                if wait > 0:
+                    return key, wait
+            for key, _ in limits:
+                self._record(conn, key, now)
+            return None, 0
+
+    def release(self, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM login_failures WHERE rowid = ("
+                "SELECT rowid FROM login_failures WHERE key = ?"
+                " ORDER BY ts DESC LIMIT 1)",
+                (key,),
+            )
+
+    def clear(self, key: str | None = None) -> None:
+        with self._transaction() as conn:
+            if key is None:
+                conn.execute("DELETE FROM login_failures")
+            else:
+                conn.execute("DELETE FROM login_failures WHERE key = ?", (key,))
+
+    def locked(self, limits: dict[str, int], now: float) -> int:
+        with contextlib.closing(self._open()) as conn:
+            rows = conn.execute(
+                "SELECT key, COUNT(*) FROM login_failures WHERE ts > ? GROUP BY key",
+                (now - WINDOW,),
+            ).fetchall()
+        return sum(1 for key, n in rows if n >= limits.get(key.split(":", 1)[0], n + 1))
+
+
+store = SqliteStore(LIMITER_DB) if LIMITER_DB else MemoryStore()
+
+metrics.counter("raluma_login_failures_total", "Неудачные попытки входа")
+metrics.counter("raluma_login_lockouts_total", "Вход отклонён лимитом попыток")
+metrics.gauge(
+    "raluma_login_locked_keys",
+    "Логинов и IP, заблокированных прямо сейчас",
+    lambda: store.locked({"user": MAX_PER_USER, "ip": MAX_PER_IP}, time.time()),
+)
+
+
+def client_ip(request) -> str:
+    if TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _keys(username: str, ip: str) -> list[tuple[str, str, int]]:
+    return [
+        ("user", f"user:{username.strip().lower()}", MAX_PER_USER),
+        ("ip", f"ip:{ip}", MAX_PER_IP),
+    ]
+
+
+def attempt(username: str, ip: str) -> float:
+    """
+    0 — попытку можно обрабатывать (она уже учтена как неудачная до
+    succeeded), иначе — через сколько секунд повторить.
+    Отказ учитывается в raluma_login_lockouts_total{scope="user"|"ip"}.
+    """
+    keys = _keys(username, ip)
+    blocked, wait = store.attempt([(key, limit) for _, key, limit in keys], time.time())
+    if blocked is not None:
+        scope = next(scope for scope, key, _ in keys if key == blocked)
+        metrics.inc("raluma_login_lockouts_total", scope=scope)
+    return wait
+
+
+def failed(username: str, ip: str) -> None:
+    """Пароль не подошёл: попытка уже записана attempt(), только метрика."""
+    metrics.inc("raluma_login_failures_total")
+
+
+def succeeded(username: str, ip: str) -> None:
+    """Пароль верный: счётчик логина сбрасывается, попытка с IP снимается."""
+    (_, user_key, _), (_, ip_key, _) = _keys(username, ip)
+    store.clear(user_key)
+    store.release(ip_key)
+
+
+def reset() -> None:
+    """Сбросить все счётчики (тесты, ручная разблокировка)."""
+    store.clear()
@@ -1,16 +1,33 @@
 import os
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+import anyio.to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from sqlalchemy import text
-from database import engine, Base
-import models  # noqa: F401 — нужен для создания таблиц
+from database import engine
+import metrics
+import tracing
+import models
 from auth import hash_password
-from database import SessionLocal
-from api import auth, users, projects, sections, documents
+from database import SessionLocal, optimize_db
+from api import (
+    auth,
+    users,
+    projects,
+    sections,
+    documents,
+    render_jobs,
+    calc,
+    bom,
+    cutting,
+    admin,
+    search,
+)
+from engine import pdf as pdf_engine, render_pool
 from migrations import run_migrations
 
 
@@ -35,12 +52,44 @@ def seed_superadmin():
         db.close()
 
 
+REQUESTS = metrics.counter("raluma_http_requests_total", "HTTP-запросы")
+LATENCY = metrics.histogram(
+    "raluma_http_request_duration_seconds", "Время до начала ответа по маршрутам"
+)
+QUERIES = metrics.histogram(
+    "raluma_http_request_db_queries",
+    "Запросов к БД на HTTP-запрос",
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+
+
+def _threadpool_gauges() -> None:
+    """Очередь threadpool, в котором FastAPI выполняет синхронные эндпоинты."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    metrics.gauge(
+        "raluma_threadpool_busy",
+        "Занятые потоки threadpool",
+        lambda: limiter.statistics().borrowed_tokens,
+    )
+    metrics.gauge(
+        "raluma_threadpool_waiting",
+        "Запросы, ждущие свободный поток",
+        lambda: limiter.statistics().tasks_waiting,
+    )
+    metrics.gauge(
+        "raluma_threadpool_size", "Размер threadpool", lambda: limiter.total_tokens
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+    _threadpool_gauges()
     run_migrations()
     seed_superadmin()
+    pdf_engine.warmup()
     yield
+    render_pool.shutdown()
+    optimize_db()
 
 
 app = FastAPI(
@@ -63,14 +112,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """Метрики и трасса запроса. Стриминговые ответы — до начала тела."""
+    token, queries = metrics.begin_request()
+    trace_token, trace = tracing.begin()
+    t0 = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["Server-Timing"] = trace.server_timing()
+        return response
+    finally:
+        # Шаблон пути, а не сам путь: /api/projects/{project_id}, не /api/projects/17
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.inc(
+            REQUESTS, method=request.method, route=path, status=str(status_code)
+        )
+        metrics.observe(
+            LATENCY, time.perf_counter() - t0, method=request.method, route=path
+        )
+        metrics.observe(QUERIES, queries[0], route=path)
+        metrics.end_request(token)
+        tracing.log_if_slow(trace, request.method, request.url.path, path, status_code)
+        tracing.end(trace_token)
+
+
 # Роутеры
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(projects.router)
 app.include_router(sections.router)
 app.include_router(documents.router)
+app.include_router(render_jobs.router)
+app.include_router(calc.router)
+app.include_router(bom.router)
+app.include_router(cutting.router)
+app.include_router(admin.router)
+app.include_router(search.router)
 
 
 @app.get("/health")
@@ -84,3 +169,9 @@ def health():
             content={"status": "error", "service": "Ралюма API", "detail": str(e)},
         )
     return {"status": "ok", "service": "Ралюма API"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Метрики процесса (Prometheus). Наружу не проксируется — см. Caddyfile."""
+    return metrics.render()
@@ -0,0 +1,174 @@
+"""
+Метрики процесса для GET /metrics (текстовый формат Prometheus).
+
+Счётчики объявляются один раз при импорте модуля, который их пишет:
+    LOGINS = metrics.counter("raluma_logins_total", "Успешные входы")
+    metrics.inc("raluma_logins_total")
+Производные значения (доли, размеры очередей) — через gauge(name, help, fn):
+fn вызывается при каждом чтении /metrics.
+Длительности — гистограммы:
+    metrics.histogram("raluma_stage_duration_seconds", "Этапы")
+    with metrics.timer("raluma_stage_duration_seconds", stage="calc"): ...
+
+Запросы к БД считаются и всего, и в пределах HTTP-запроса: middleware
+вызывает begin_request(), слушатель движка — count_query().
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+# Границы по умолчанию — секунды, от быстрых API до тяжёлого PDF
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_lock = threading.Lock()
+_meta: dict[str, tuple[str, str]] = {}  # имя → (тип, описание)
+_values: dict[str, dict[tuple, float]] = {}  # имя → {метки: значение}
+_gauges: dict[str, Callable[[], float]] = {}
+_buckets: dict[str, tuple[float, ...]] = {}
+# имя → {метки: [счётчики по корзинам..., сумма, количество]}
+_histograms: dict[str, dict[tuple, list[float]]] = {}
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def counter(name: str, help: str) -> str:
+    with _lock:
+        _meta.setdefault(name, ("counter", help))
+        _values.setdefault(name, {})
+    return name
+
+
+def gauge(name: str, help: str, fn: Callable[[], float]) -> str:
+    with _lock:
+        _meta[name] = ("gauge", help)
+        _gauges[name] = fn
+    return name
+
+
+def histogram(
+    name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+) -> str:
+    with _lock:
+        _meta.setdefault(name, ("histogram", help))
+        _buckets.setdefault(name, tuple(sorted(buckets)))
+        _histograms.setdefault(name, {})
+    return name
+
+
+def observe(name: str, value: float, **labels) -> None:
+    key = _labels_key(labels)
+    with _lock:
+        bounds = _buckets[name]
+        series = _histograms[name].get(key)
+        if series is None:
+            series = _histograms[name][key] = [0] * (len(bounds) + 3)
+        # Счётчики не накопительные — суммируются при выводе
+        series[bisect.bisect_left(bounds, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """Записать длительность блока в гистограмму name."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, **labels)
+
+
+_request_queries: ContextVar[list[int] | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def begin_request():
+    """Начать счёт запросов к БД для текущего HTTP-запроса. → (токен, счётчик)."""
+    holder = [0]
+    return _request_queries.set(holder), holder
+
+
+def end_request(token) -> None:
+    _request_queries.reset(token)
+
+
+def count_query() -> None:
+    inc("raluma_db_queries_total")
+    holder = _request_queries.get()
+    if holder is not None:
+        holder[0] += 1
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    key = _labels_key(labels)
+    with _lock:
+        series = _values[name]
+        series[key] = series.get(key, 0) + value
+
+
+def value(name: str, **labels) -> float:
+    with _lock:
+        return _values.get(name, {}).get(_labels_key(labels), 0)
+
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    parts = []
+    for k, v in key:
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _render_histogram(name: str, bounds: tuple, series: dict) -> list[str]:
+    lines = []
+    for key, counts in sorted(series.items()):
+        cumulative = 0
+        for bound, n in zip(bounds + (float("inf"),), counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else _format_value(bound)
+            labels = _format_labels(key + (("le", le),))
+            lines.append(f"{name}_bucket{labels} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{_format_labels(key)} {_format_value(counts[-2])}")
+        lines.append(f"{name}_count{_format_labels(key)} {_format_value(counts[-1])}")
+    return lines
+
+
+def render() -> str:
+    """Все метрики в текстовом формате Prometheus."""
+    lines = []
+    with _lock:
+        meta = dict(_meta)
+        values = {name: dict(series) for name, series in _values.items()}
+        gauges = dict(_gauges)
+        histograms = {
+            name: {key: list(series) for key, series in h.items()}
+            for name, h in _histograms.items()
+        }
+    for name, (kind, help) in sorted(meta.items()):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        if name in gauges:
+            try:
+                lines.append(f"{name} {_format_value(gauges[name]())}")
+            except Exception:
+                lines.append(f"{name} NaN")
+            continue
+        if name in histograms:
+            lines.extend(_render_histogram(name, _buckets[name], histograms[name]))
+            continue
+        for key, v in sorted(values.get(name, {}).items()):
+            lines.append(f"{name}{_format_labels(key)} {_format_value(v)}")
+    return "\n".join(lines) + "\n"
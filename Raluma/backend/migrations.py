@@ -1,14 +1,25 @@
 """
-Ручные SQLite-миграции.
+Версионные SQLite-миграции.
 
-SQLite не поддерживает IF NOT EXISTS для ALTER TABLE,
-поэтому каждый ALTER оборачиваем в try/except.
+Применённые версии записываются в таблицу schema_version. При старте
+выполняется один SELECT; если есть невыполненные миграции, они
+применяются в одной транзакции BEGIN IMMEDIATE — это блокировка записи
+на уровне файла БД, поэтому несколько воркеров не мигрируют одновременно:
+второй дождётся первого (busy timeout), перечитает версию и ничего не сделает.
 
-Вызывается из main.py при старте приложения.
+Новая миграция — новый элемент в конце MIGRATIONS с очередным номером.
+
+Таблицы моделей создаёт миграция 1 (в той же транзакции), отдельного
+create_all при старте нет. Вызывается из main.py при старте приложения.
 """
 
+from datetime import datetime, timezone
+
 from sqlalchemy import text
-from database import engine
+from sqlalchemy.exc import OperationalError
+
+import models  # noqa: F401 — таблицы моделей для Base.metadata
+from database import Base, engine
 
 
 # ── Новые колонки ──────────────────────────────────────────────────────────────
@@ -80,20 +91,173 @@ _DATA_MIGRATIONS = [
 ]
 
 
-def run_migrations():
-    """Выполнить все миграции. Безопасно вызывать при каждом старте."""
-    with engine.connect() as conn:
-        for col_sql in _ADD_COLUMNS:
-            try:
-                conn.execute(text(col_sql))
-                conn.commit()
-            except Exception:
-                pass  # колонка уже существует
-
-    with engine.connect() as conn:
-        for sql in _DATA_MIGRATIONS:
-            try:
-                conn.execute(text(sql))
-                conn.commit()
-            except Exception:
-                pass
+# ── Индексы ────────────────────────────────────────────────────────────────────
+
+# Список проектов: сортировка (created_at, id) по убыванию + фильтры.
+# Столбец фильтра первым — выборка по равенству сразу идёт в нужном порядке.
+_PROJECT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_projects_created ON projects (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_projects_owner_created "
+    "ON projects (created_by, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_projects_status_created "
+    "ON projects (status, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_projects_glass_status_created "
+    "ON projects (glass_status, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_projects_paint_status_created "
+    "ON projects (paint_status, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_projects_customer ON projects (customer)",
+]
+
+
+# Фильтр по началу имени заказчика — LIKE 'x%'. SQLite берёт для LIKE индекс
+# только с NOCASE (case_sensitive_like выключен); регистр NOCASE сворачивает
+# лишь у латиницы.
+_CUSTOMER_NOCASE_INDEX = [
+    "DROP INDEX IF EXISTS ix_projects_customer",
+    "CREATE INDEX IF NOT EXISTS ix_projects_customer_nocase "
+    "ON projects (customer COLLATE NOCASE)",
+]
+
+
+# ── Полнотекстовый поиск (FTS5) ────────────────────────────────────────────────
+
+# Таблица → индексируемые колонки. Индекс <table>_fts хранит только токены
+# (external content), текст берётся из самой таблицы; синхронизация — триггерами.
+FTS_TABLES = {
+    "projects": ("number", "customer", "comments", "extra_parts"),
+    "sections": ("name", "comments", "ral_color"),
+}
+# unicode61 приводит кириллицу к нижнему регистру; remove_diacritics — для латиницы
+_FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+
+def _fts_sql(table: str, columns: tuple[str, ...]) -> list[str]:
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+        f"content='{table}', content_rowid='id', tokenize='{_FTS_TOKENIZER}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        # Только при изменении индексируемых колонок: смена статуса индекс не трогает
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} "
+        f"BEGIN {delete} {insert} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _fts_indexes(conn):
+    for table, columns in FTS_TABLES.items():
+        for sql in _fts_sql(table, columns):
+            conn.exec_driver_sql(sql)
+
+
+def _columns(conn, table: str) -> set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def _create_tables(conn):
+    """Таблицы моделей, которых ещё нет, и недостающие колонки в старых."""
+    Base.metadata.create_all(bind=conn)
+    _add_columns(conn)
+
+
+def _add_columns(conn):
+    """Колонки, которых ещё нет (старые БД). В новых их уже создал create_all."""
+    existing: dict[str, set[str]] = {}
+    for sql in _ADD_COLUMNS:
+        # "ALTER TABLE <table> ADD COLUMN <column> <type>"
+        _, _, table, _, _, column, *_ = sql.split()
+        if table not in existing:
+            existing[table] = _columns(conn, table)
+        if existing[table] and column not in existing[table]:
+            conn.exec_driver_sql(sql)
+            existing[table].add(column)
+
+
+def _data_migrations(conn):
+    for sql in _DATA_MIGRATIONS:
+        conn.exec_driver_sql(sql)
+
+
+def _project_indexes(conn):
+    for sql in _PROJECT_INDEXES:
+        conn.exec_driver_sql(sql)
+
+
+def _customer_nocase_index(conn):
+    for sql in _CUSTOMER_NOCASE_INDEX:
+        conn.exec_driver_sql(sql)
+
+
+# (версия, описание, функция(conn)). Номера только растут, старые не меняются.
+MIGRATIONS = [
+    (1, "Таблицы моделей и колонки, добавленные после первого релиза", _create_tables),
+    (2, "system в секциях, переименование замков (ТЗ6)", _data_migrations),
+    (3, "Составные индексы для постраничного списка проектов", _project_indexes),
+    (4, "Полнотекстовый поиск по проектам и секциям (FTS5)", _fts_indexes),
+    (5, "NOCASE-индекс заказчика для фильтра LIKE", _customer_nocase_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+_CREATE_VERSION_TABLE = (
+    "CREATE TABLE IF NOT EXISTS schema_version ("
+    "version INTEGER PRIMARY KEY, description VARCHAR, applied_at VARCHAR)"
+)
+
+
+def current_version(conn) -> int:
+    """Последняя применённая версия; 0 — таблицы schema_version ещё нет."""
+    try:
+        row = conn.exec_driver_sql("SELECT MAX(version) FROM schema_version").first()
+    except OperationalError:
+        conn.rollback()
+        return 0
+    return row[0] or 0
+
+
+def run_migrations(bind=None) -> list[int]:
+    """
+    Применить невыполненные миграции. Возвращает номера применённых версий.
+    Ошибка миграции откатывает всю транзакцию и пробрасывается дальше.
+    """
+    bind = bind if bind is not None else engine
+    with bind.connect() as conn:
+        if current_version(conn) >= LATEST_VERSION:
+            return []
+        conn.rollback()
+
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            conn.exec_driver_sql(_CREATE_VERSION_TABLE)
+            # Пока ждали блокировку, другой процесс мог всё применить
+            version = current_version(conn)
+            applied = []
+            for number, description, migrate in MIGRATIONS:
+                if number <= version:
+                    continue
+                migrate(conn)
+                conn.execute(
+                    text(
+                        "INSERT INTO schema_version (version, description, applied_at) "
+                        "VALUES (:v, :d, :t)"
+                    ),
+                    {
+                        "v": number,
+                        "d": description,
+                        "t": datetime.now(timezone.utc).isoformat(),
+                    },
+                )
+                applied.append(number)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
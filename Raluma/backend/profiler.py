@@ -0,0 +1,166 @@
+"""
+Статистический профайлер для работающего воркера.
+
+Фоновый поток раз в PROFILE_INTERVAL_MS снимает стеки потоков через
+sys._current_frames() и считает одинаковые стеки. Результат — JSON
+в формате speedscope (https://www.speedscope.app): файл открывается там
+как flamegraph. Код приложения не меняется и не замедляется, пока
+профайлер не запущен; во время работы цена — один снимок стеков за такт.
+
+Кто профилирует:
+  GET /api/admin/profile?seconds=N — все потоки процесса N секунд;
+  ?profile=1 у preview / pdf листа — только поток этого запроса.
+Одновременно работает один профайлер (ProfilerBusy → 409).
+
+?profile=1 повторяет расчёт и HTML листа без метрик и спанов (счётчики
+не засоряются). Вёрстка WeasyPrint идёт в процессах render_pool и в профиль
+pdf не попадает; для её профиля — RENDER_WORKERS=0 и /api/admin/profile
+во время скачивания.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+# ?profile=1: быстрый лист (мс) повторяется, пока не наберётся столько секунд,
+# иначе в профиль попадёт пара случайных снимков
+MIN_REQUEST_SECONDS = float(os.getenv("PROFILE_MIN_REQUEST_SECONDS", "0.5"))
+# Глубже этого стек обрезается сверху (рекурсия не раздувает профиль)
+MAX_DEPTH = 200
+
+_busy = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _frame_key(frame) -> tuple[str, str, int]:
+    code = frame.f_code
+    return code.co_qualname, code.co_filename, code.co_firstlineno
+
+
+class Sampler:
+    """
+    with Sampler(threads={threading.get_ident()}) as s:
+        ...
+    s.speedscope("имя") — собранный профиль.
+    threads=None — все потоки, кроме самого профайлера и exclude.
+    """
+
+    def __init__(
+        self,
+        threads: set[int] | None = None,
+        interval_ms: float | None = None,
+        exclude: set[int] | None = None,
+    ):
+        self.threads = threads
+        self.exclude = exclude or set()
+        self.interval = (interval_ms or INTERVAL_MS) / 1000
+        self.stacks: Counter = Counter()  # (кадр от корня..., ) → секунд
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self):
+        if not _busy.acquire(blocking=False):
+            raise ProfilerBusy()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+        _busy.release()
+        return False
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while True:
+            self._sample(own, time.perf_counter() - last)
+            last = time.perf_counter()
+            if self._stop.wait(self.interval):
+                # Последний снимок — чтобы короткий запрос не остался пустым
+                self._sample(own, time.perf_counter() - last)
+                return
+
+    def _sample(self, own: int, weight: float) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own or ident in self.exclude:
+                continue
+            if self.threads is not None and ident not in self.threads:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(_frame_key(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += weight or self.interval
+            self.samples += 1
+
+    def speedscope(self, name: str) -> dict:
+        frames: list[dict] = []
+        index: dict[tuple, int] = {}
+        samples, weights = [], []
+        for stack, weight in self.stacks.most_common():
+            ids = []
+            for key in stack:
+                if key not in index:
+                    index[key] = len(frames)
+                    func, file, line = key
+                    frames.append({"name": func, "file": file, "line": line})
+                ids.append(index[key])
+            samples.append(ids)
+            weights.append(weight)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "raluma-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+def profile_call(name: str, fn, *args) -> dict:
+    """
+    Профиль вызова fn в текущем потоке. fn повторяется, пока суммарно
+    не пройдёт MIN_REQUEST_SECONDS; число повторов — в имени профиля.
+    """
+    runs = 0
+    with Sampler(threads={threading.get_ident()}) as sampler:
+        deadline = time.perf_counter() + MIN_REQUEST_SECONDS
+        while True:
+            fn(*args)
+            runs += 1
+            if time.perf_counter() >= deadline:
+                break
+    return sampler.speedscope(f"{name} ×{runs}" if runs > 1 else name)
+
+
+def profile_process(seconds: float, interval_ms: float | None = None) -> dict:
+    """Профиль всех потоков процесса за seconds секунд (блокирует вызывающего)."""
+    seconds = min(seconds, MAX_SECONDS)
+    # Вызывающий поток просто спит — в профиле он не нужен
+    with Sampler(interval_ms=interval_ms, exclude={threading.get_ident()}) as sampler:
+        time.sleep(seconds)
+    return sampler.speedscope(f"Ралюма API, {seconds:g} с")
@@ -0,0 +1,85 @@
+"""
+Копирование проектов целиком на стороне БД.
+
+Проект и его секции дублируются через INSERT ... SELECT: список колонок
+берётся из метаданных моделей, поэтому новые колонки копируются сами,
+а строки секций не проходят через Python. На проект — два запроса
+(проект и все его секции), на все проекты — одна транзакция.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+import models
+
+COPY_SUFFIX = "-копия"
+
+# Колонки, которые у копии задаются заново, а не переносятся из исходника
+_PROJECT_RESET = {"id", "created_at", "updated_at", "created_by", "number"}
+_SECTION_RESET = {"id", "project_id", "document_overrides"}
+
+
+def _columns(table, reset: set[str]):
+    return [c for c in table.columns if c.name not in reset]
+
+
+def copy_projects(
+    db: Session,
+    project_ids: list[int],
+    user_id: int,
+    with_overrides: bool = False,
+    suffix: str = COPY_SUFFIX,
+) -> list[int]:
+    """
+    Скопировать проекты с секциями. Возвращает id копий в порядке project_ids.
+    with_overrides — переносить ручные правки листов (document_overrides).
+    Коммит — на вызывающем.
+    """
+    projects = models.Project.__table__
+    sections = models.Section.__table__
+    project_cols = _columns(projects, _PROJECT_RESET)
+    section_cols = _columns(sections, _SECTION_RESET)
+    now = datetime.utcnow()
+
+    new_ids = []
+    for project_id in project_ids:
+        project_select = select(
+            *project_cols,
+            (projects.c.number + suffix).label("number"),
+            literal(now, projects.c.created_at.type).label("created_at"),
+            literal(now, projects.c.updated_at.type).label("updated_at"),
+            literal(user_id).label("created_by"),
+        ).where(projects.c.id == project_id)
+        result = db.execute(
+            insert(projects).from_select(
+                [c.name for c in project_cols]
+                + ["number", "created_at", "updated_at", "created_by"],
+                project_select,
+            )
+        )
+        new_id = result.lastrowid
+
+        overrides = (
+            sections.c.document_overrides
+            if with_overrides
+            else literal("{}", sections.c.document_overrides.type)
+        )
+        section_select = (
+            select(
+                *section_cols,
+                literal(new_id).label("project_id"),
+                overrides.label("document_overrides"),
+            )
+            .where(sections.c.project_id == project_id)
+            .order_by(sections.c.order, sections.c.id)
+        )
+        db.execute(
+            insert(sections).from_select(
+                [c.name for c in section_cols] + ["project_id", "document_overrides"],
+                section_select,
+            )
+        )
+        new_ids.append(new_id)
+    return new_ids
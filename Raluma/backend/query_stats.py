@@ -0,0 +1,141 @@
+"""
+Статистика запросов к БД.
+
+Слушатели движка (install) замеряют каждый запрос:
+  - счётчик raluma_db_queries_total и число запросов на HTTP-запрос (metrics);
+  - этап «db» в трассе запроса (tracing → Server-Timing);
+  - сводка по нормализованному тексту запроса: сколько раз, суммарно, максимум
+    (top() → GET /api/admin/queries);
+  - запросы дольше SLOW_QUERY_MS — в лог raluma.slow_query строкой JSON
+    вместе с EXPLAIN QUERY PLAN.
+
+Нормализация: литералы и списки параметров сворачиваются, поэтому
+IN (?, ?, ?) и IN (?, ?) считаются одним запросом.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+import metrics
+import tracing
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+# Сколько разных запросов помнить; новые сверх лимита не учитываются
+MAX_STATEMENTS = int(os.getenv("QUERY_STATS_MAX", "500"))
+
+logger = logging.getLogger("raluma.slow_query")
+
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACE = re.compile(r"\s+")
+
+_lock = threading.Lock()
+_stats: dict[str, list[float]] = {}  # запрос → [раз, сумма с, максимум с]
+
+metrics.counter("raluma_db_queries_total", "Запросы к БД")
+metrics.counter("raluma_db_slow_queries_total", "Запросы дольше SLOW_QUERY_MS")
+
+
+def normalize(statement: str) -> str:
+    sql = _STRING.sub("?", statement)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PARAM_LIST.sub("?, …", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _record(statement: str, duration: float) -> None:
+    key = normalize(statement)
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            if len(_stats) >= MAX_STATEMENTS:
+                return
+            entry = _stats[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += duration
+        entry[2] = max(entry[2], duration)
+
+
+def top(limit: int = 20, order: str = "total") -> list[dict]:
+    """Самые дорогие запросы: order — total | max | avg | count."""
+    with _lock:
+        rows = [
+            {
+                "statement": sql,
+                "count": int(count),
+                "total_ms": round(total * 1000, 2),
+                "avg_ms": round(total / count * 1000, 3),
+                "max_ms": round(peak * 1000, 2),
+            }
+            for sql, (count, total, peak) in _stats.items()
+        ]
+    key = {"total": "total_ms", "max": "max_ms", "avg": "avg_ms", "count": "count"}
+    rows.sort(key=lambda r: r[key[order]], reverse=True)
+    return rows[:limit]
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def explain(dbapi_conn, statement: str, parameters) -> list[str]:
+    """EXPLAIN QUERY PLAN на том же соединении (в обход слушателей)."""
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    if isinstance(parameters, list):  # executemany — план по первому набору
+        parameters = parameters[0] if parameters else ()
+    cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN не удался: {e}"]
+    finally:
+        cursor.close()
+
+
+def _log_slow(dbapi_conn, statement: str, parameters, duration: float) -> None:
+    metrics.inc("raluma_db_slow_queries_total")
+    record = {
+        "ts": time.time(),
+        "duration_ms": round(duration * 1000, 2),
+        "statement": _SPACE.sub(" ", statement).strip(),
+        "plan": explain(dbapi_conn, statement, parameters),
+    }
+    logger.warning(json.dumps(record, ensure_ascii=False))
+
+
+def install(engine) -> None:
+    """Повесить слушатели на движок SQLAlchemy."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+        metrics.count_query()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        duration = time.perf_counter() - start
+        trace = tracing.current()
+        if trace is not None:
+            trace.add("db", start, duration)
+        _record(statement, duration)
+        if duration * 1000 >= SLOW_QUERY_MS:
+            _log_slow(conn.connection.dbapi_connection, statement, parameters, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # after_cursor_execute не будет — снимаем метку начала
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
@@ -200,6 +200,11 @@ class ProjectOut(ProjectBase):
     model_config = {"from_attributes": True}
 
 
+class ProjectCopyRequest(BaseModel):
+    project_ids: List[int]
+    with_overrides: bool = False
+
+
 class ProjectList(ProjectBase):
     id: int
     created_at: datetime
@@ -207,3 +212,13 @@ class ProjectList(ProjectBase):
     created_by: int
 
     model_config = {"from_attributes": True}
+
+
+# ── Cutting ───────────────────────────────────────────────────────────────────
+
+
+class CuttingRequest(BaseModel):
+    project_ids: List[int]
+    stock_lengths: Optional[List[float]] = None
+    kerf_mm: Optional[float] = None
+    trim_mm: Optional[float] = None
@@ -3,9 +3,16 @@ import sys
 
 # Must be set BEFORE any app imports — overrides the DB engine at module load time
 os.environ["DATABASE_URL"] = "sqlite:///./test_raluma.db"
+os.environ["PDF_CACHE_DIR"] = "./test_cache/pdf"
+os.environ["JINJA_CACHE_DIR"] = "./test_cache/jinja"
+os.environ["BACKUP_DIR"] = "./test_cache/backups"
+os.environ["RENDER_WORKERS"] = "0"  # рендер в потоке — подменяется в тестах
+os.environ["BCRYPT_ROUNDS"] = "4"  # минимальная стоимость — быстрые тесты
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import shutil
+
 import pytest
 from fastapi.testclient import TestClient
 from main import app
@@ -20,9 +27,11 @@ def client():
     from database import engine
 
     engine.dispose()
-    # Clean up test DB file after session
-    if os.path.exists("./test_raluma.db"):
-        os.remove("./test_raluma.db")
+    # Clean up test DB files (and WAL side files) after session
+    for path in ("./test_raluma.db", "./test_raluma.db-wal", "./test_raluma.db-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree("./test_cache", ignore_errors=True)
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,61 @@
+"""
+Тесты кэша картинок профилей (engine/assets.py).
+"""
+
+import base64
+import io
+import os
+
+from PIL import Image
+
+from engine.assets import AssetStore
+
+
+def _write_jpg(path, size):
+    Image.new("RGB", size, (200, 30, 30)).save(path, format="JPEG")
+
+
+def _decode(uri):
+    return base64.b64decode(uri.split(",", 1)[1])
+
+
+def test_data_uri_and_missing(tmp_path):
+    _write_jpg(tmp_path / "RS1.jpg", (50, 50))
+    store = AssetStore(str(tmp_path))
+    assert store.data_uri("RS1.jpg").startswith("data:image/jpeg;base64,")
+    assert store.data_uri("nope.jpg") == ""
+    assert store.data_uri("") == ""
+    assert store.data_uri("../RS1.jpg") == ""
+
+
+def test_encoded_once(tmp_path):
+    _write_jpg(tmp_path / "RS1.jpg", (50, 50))
+    store = AssetStore(str(tmp_path))
+    assert store.data_uri("RS1.jpg") is store.data_uri("RS1.jpg")
+
+
+def test_reload_on_mtime_change(tmp_path):
+    path = tmp_path / "RS1.jpg"
+    _write_jpg(path, (50, 50))
+    store = AssetStore(str(tmp_path))
+    first = store.data_uri("RS1.jpg")
+    _write_jpg(path, (80, 40))
+    os.utime(path, ns=(1, 1))
+    second = store.data_uri("RS1.jpg")
+    assert second != first
+    assert Image.open(io.BytesIO(_decode(second))).size == (80, 40)
+
+
+def test_downscale_to_print_size(tmp_path):
+    _write_jpg(tmp_path / "RS2.jpg", (2000, 500))
+    store = AssetStore(str(tmp_path), max_px=200)
+    img = Image.open(io.BytesIO(_decode(store.data_uri("RS2.jpg"))))
+    assert max(img.size) == 200
+
+
+def test_preload(tmp_path):
+    _write_jpg(tmp_path / "RS3.jpg", (10, 10))
+    store = AssetStore(str(tmp_path))
+    assert store.preload() == 1
+    assert "RS3.jpg" in store._assets
+    assert AssetStore(str(tmp_path / "missing")).preload() == 0
@@ -0,0 +1,128 @@
+"""
+Тесты онлайн-бэкапа (backup.py) и /api/admin/backups.
+"""
+
+import fcntl
+import sqlite3
+import threading
+import time
+
+import backup
+
+
+def _make_db(path, rows=2000):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.executemany(
+        "INSERT INTO t (v) VALUES (?)", [(f"row {i} " * 10,) for i in range(rows)]
+    )
+    conn.commit()
+    return conn
+
+
+def _dump(path):
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    rows = conn.execute("SELECT id, v FROM t ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_full_and_incremental_restore(tmp_path):
+    src = tmp_path / "live.db"
+    out = tmp_path / "backups"
+    conn = _make_db(src)  # соединение открыто: WAL не сброшен в файл
+
+    full = backup.run_backup(source_path=str(src), directory=str(out))
+    assert full.kind == "full" and full.status == "done"
+    assert full.pages_done == full.pages_total > 0
+
+    conn.execute("UPDATE t SET v = 'changed' WHERE id = 5")
+    conn.execute("INSERT INTO t (v) VALUES ('new')")
+    conn.commit()
+    inc = backup.run_backup(incremental=True, source_path=str(src), directory=str(out))
+    assert inc.kind == "incremental"
+    assert 0 < inc.pages_written < full.pages_written // 4
+    assert inc.file.startswith(full.file.removesuffix(".full.db.gz") + "_")
+
+    conn.execute("DELETE FROM t WHERE id > 100")
+    conn.commit()
+    backup.run_backup(incremental=True, source_path=str(src), directory=str(out))
+
+    expected = conn.execute("SELECT id, v FROM t ORDER BY id").fetchall()
+    restored = tmp_path / "restored.db"
+    assert backup.restore(str(out / full.file), str(restored)) == 2
+    assert _dump(restored) == expected
+
+    # Точка во времени — после первого инкремента
+    base = full.file.removesuffix(".full.db.gz")
+    until = inc.file.removesuffix(".inc.gz").removeprefix(base + "_")
+    n = backup.restore(str(out / full.file), str(restored), until=until)
+    assert n == 1
+    rows = _dump(restored)
+    assert len(rows) == 2001 and rows[4][1] == "changed"
+    conn.close()
+
+
+def test_incremental_without_base_is_full(tmp_path):
+    src = tmp_path / "live.db"
+    _make_db(src, rows=10).close()
+    st = backup.run_backup(
+        incremental=True, source_path=str(src), directory=str(tmp_path / "b")
+    )
+    assert st.kind == "full"
+
+
+def test_rotation_keeps_last_chains(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "KEEP", 2)
+    src = tmp_path / "live.db"
+    _make_db(src, rows=10).close()
+    out = tmp_path / "b"
+    for _ in range(3):
+        backup.run_backup(source_path=str(src), directory=str(out))
+        backup.run_backup(incremental=True, source_path=str(src), directory=str(out))
+    files = [f["file"] for f in backup.list_backups(str(out))]
+    assert sum(f.endswith(".full.db.gz") for f in files) == 2
+    assert sum(f.endswith(".inc.gz") for f in files) == 2
+
+
+def test_backup_waits_for_directory_lock(tmp_path):
+    src = tmp_path / "live.db"
+    _make_db(src, rows=10).close()
+    out = tmp_path / "b"
+    out.mkdir()
+    done = []
+    with open(out / "backup.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # как другой процесс (cron/CLI)
+        t = threading.Thread(
+            target=lambda: done.append(
+                backup.run_backup(source_path=str(src), directory=str(out))
+            )
+        )
+        t.start()
+        time.sleep(0.2)
+        assert done == []
+        fcntl.flock(lock, fcntl.LOCK_UN)
+    t.join(timeout=10)
+    assert done[0].status == "done"
+    assert "backup.lock" not in [f["file"] for f in backup.list_backups(str(out))]
+
+
+def test_admin_backup_endpoint(client, admin_headers):
+    r = client.post("/api/admin/backups", headers=admin_headers)
+    assert r.status_code in (202, 409)
+    for _ in range(100):
+        status = client.get("/api/admin/backups/status", headers=admin_headers).json()
+        if status["status"] != "running":
+            break
+        time.sleep(0.05)
+    assert status["status"] == "done"
+    assert status["pages_done"] == status["pages_total"]
+
+    files = client.get("/api/admin/backups", headers=admin_headers).json()
+    assert status["file"] in [f["file"] for f in files]
+
+
+def test_admin_backup_requires_auth(client):
+    assert client.post("/api/admin/backups").status_code in (401, 403)
@@ -0,0 +1,32 @@
+"""
+Тесты бенчмарка calculate_slide: корпус и порог регрессии.
+"""
+
+from benchmarks.bench_slide_calc import compare, corpus
+from engine.slide_calc import calculate_slide
+
+BASE = {"calls_per_s": 10000, "p99_us": 100, "alloc_kib_per_call": 6}
+
+
+def test_corpus_is_deterministic_and_valid():
+    a, b = corpus(50, seed=1), corpus(50, seed=1)
+    assert [vars(s) for s in a] == [vars(s) for s in b]
+    assert {s.rails for s in a} == {3, 5}
+    for s in a:
+        assert calculate_slide(s).profiles
+
+
+def test_compare_within_threshold():
+    current = {"calls_per_s": 9500, "p99_us": 108, "alloc_kib_per_call": 6.2}
+    assert compare(BASE, current, 10) == []
+
+
+def test_compare_reports_regressions():
+    current = {"calls_per_s": 8000, "p99_us": 130, "alloc_kib_per_call": 6}
+    failures = compare(BASE, current, 10)
+    assert [f.split(":")[0] for f in failures] == ["calls_per_s", "p99_us"]
+
+
+def test_compare_improvement_is_not_regression():
+    current = {"calls_per_s": 20000, "p99_us": 50, "alloc_kib_per_call": 3}
+    assert compare(BASE, current, 10) == []
@@ -0,0 +1,99 @@
+"""
+Тесты сводной спецификации проекта (GET /api/projects/{pid}/bom).
+"""
+
+from engine.slide_calc import calculate_by_key
+
+SECTION = {
+    "name": "Секция",
+    "system": "СЛАЙД",
+    "width": 2000,
+    "height": 2400,
+    "panels": 3,
+    "rails": 3,
+    "threshold": "Стандартный анод",
+    "inter_glass_profile": "Алюминиевый RS2061",
+    "profile_left_wall": True,
+    "profile_right_wall": True,
+}
+
+
+def _add_section(client, headers, project_id, **fields):
+    r = client.post(
+        f"/api/projects/{project_id}/sections",
+        headers=headers,
+        json={**SECTION, **fields},
+    )
+    assert r.status_code == 201
+    return r.json()
+
+
+def _line(lines, article, length=None):
+    return [
+        x
+        for x in lines
+        if x["article"] == article and (length is None or x["length_mm"] == length)
+    ]
+
+
+def test_bom_sums_quantities(client, admin_headers, project):
+    _add_section(client, admin_headers, project["id"], quantity=1)
+    _add_section(client, admin_headers, project["id"], quantity=2)
+    _add_section(client, admin_headers, project["id"], width=3000, quantity=1)
+    client.post(
+        f"/api/projects/{project['id']}/sections",
+        headers=admin_headers,
+        json={"name": "ЦС1", "system": "ЦС"},
+    )
+
+    r = client.get(f"/api/projects/{project['id']}/bom", headers=admin_headers)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["sections"] == 3
+    lines = data["lines"]
+    # Порог: 2 позиции по длине, количества × quantity секций
+    assert _line(lines, "RS2323", 1968.0)[0]["qty"] == 3
+    assert _line(lines, "RS2323", 2968.0)[0]["qty"] == 1
+    # Ролики: 3 панели × 2 × (1 + 2 + 1)
+    assert _line(lines, "RU005")[0]["qty"] == 24
+    assert _line(lines, "RS150")[0]["qty"] == 4
+
+
+def test_bom_recomputes_only_changed_section(client, admin_headers, project):
+    s1 = _add_section(client, admin_headers, project["id"])
+    _add_section(client, admin_headers, project["id"], width=2500)
+    client.get(f"/api/projects/{project['id']}/bom", headers=admin_headers)
+
+    client.put(
+        f"/api/projects/{project['id']}/sections/{s1['id']}",
+        headers=admin_headers,
+        json={**SECTION, "width": 2100},
+    )
+    before = calculate_by_key.cache_info()
+    client.get(f"/api/projects/{project['id']}/bom", headers=admin_headers)
+    after = calculate_by_key.cache_info()
+    assert after.misses - before.misses == 1
+    assert after.hits - before.hits == 1
+
+
+def test_bom_csv(client, admin_headers, project):
+    _add_section(client, admin_headers, project["id"])
+    r = client.get(
+        f"/api/projects/{project['id']}/bom",
+        headers=admin_headers,
+        params={"format": "csv"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    text = r.content.decode("utf-8-sig")
+    assert text.splitlines()[0].startswith("Тип;Артикул;Наименование")
+    assert "RS2323;Порог 3-рельсовый;1968;" in text
+
+
+def test_bom_bad_format(client, admin_headers, project):
+    r = client.get(
+        f"/api/projects/{project['id']}/bom",
+        headers=admin_headers,
+        params={"format": "xml"},
+    )
+    assert r.status_code == 422
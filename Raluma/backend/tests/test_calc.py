@@ -0,0 +1,59 @@
+"""
+Тесты расчёта без сохранения (POST /api/calc/slide).
+"""
+
+from types import SimpleNamespace
+
+from engine.slide_calc import calculate_by_key, calculate_slide_cached
+
+PAYLOAD = {
+    "name": "Секция 1",
+    "system": "СЛАЙД",
+    "width": 2000,
+    "height": 2400,
+    "panels": 3,
+    "quantity": 1,
+    "rails": 3,
+    "threshold": "Стандартный анод",
+    "first_panel_inside": "Справа",
+    "inter_glass_profile": "Алюминиевый RS2061",
+    "profile_left_wall": True,
+    "profile_right_wall": True,
+}
+
+
+def test_calc_slide(client, admin_headers):
+    r = client.post("/api/calc/slide", headers=admin_headers, json=PAYLOAD)
+    assert r.status_code == 200
+    data = r.json()
+    assert {p["article"] for p in data["profiles"]} >= {"RS2323", "RS1313"}
+    threshold = [p for p in data["profiles"] if p["article"] == "RS2323"][0]
+    assert threshold["length_mm"] == 1968
+    assert len(data["glass"]) == 2
+
+
+def test_calc_slide_reflects_input(client, admin_headers):
+    r = client.post(
+        "/api/calc/slide", headers=admin_headers, json={**PAYLOAD, "width": 3000}
+    )
+    threshold = [p for p in r.json()["profiles"] if p["article"] == "RS2323"][0]
+    assert threshold["length_mm"] == 2968
+
+
+def test_calc_slide_requires_auth(client):
+    r = client.post("/api/calc/slide", json=PAYLOAD)
+    assert r.status_code == 403
+
+
+def test_calc_slide_does_not_touch_db(client, admin_headers, project):
+    client.post("/api/calc/slide", headers=admin_headers, json=PAYLOAD)
+    r = client.get(f"/api/projects/{project['id']}/sections", headers=admin_headers)
+    assert r.json() == []
+
+
+def test_cache_hit_on_normalized_input():
+    calculate_by_key.cache_clear()
+    a = calculate_slide_cached(SimpleNamespace(width=2000, name="A"))
+    b = calculate_slide_cached(SimpleNamespace(width=2000.0, name="B"))
+    assert a is b
+    assert calculate_by_key.cache_info().hits == 1
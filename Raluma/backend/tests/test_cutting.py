@@ -0,0 +1,164 @@
+"""
+Тесты раскроя профилей (engine.cutting и /api/.../cutting).
+"""
+
+import random
+import time
+
+from engine import cutting
+from engine.pdf import render_cutting_html
+
+SECTION = {
+    "name": "Секция",
+    "system": "СЛАЙД",
+    "width": 2000,
+    "height": 2400,
+    "panels": 3,
+    "rails": 3,
+    "threshold": "Стандартный анод",
+    "inter_glass_profile": "Алюминиевый RS2061",
+    "bubble_left": True,
+    "floor_latches_left": True,
+}
+
+
+def _check_plan(plan, groups, kerf, trim):
+    for g in plan.groups:
+        expected = sorted(groups[(g.article, g.name, g.color)])
+        assert sorted(c for b in g.bars for c in b.cuts) == expected
+        for b in g.bars:
+            assert sum(b.cuts) + kerf * len(b.cuts) + trim <= b.stock_mm + 1e-6
+            assert b.stock_mm in plan.stock_lengths
+
+
+class TestOptimizer:
+    def test_packs_all_pieces(self):
+        groups = {("RS2323", "Порог", ""): [1968.0] * 5 + [2968.0] * 3}
+        plan = cutting.optimize_cutting(groups, [6000], kerf_mm=4, trim_mm=10)
+        _check_plan(plan, groups, 4, 10)
+        assert plan.pieces == 8
+        # 3 × (2968 + 1968) и 1968 + 1968 — оптимум, меньше 4 хлыстов нельзя
+        assert plan.bars == 4
+        assert 0 < plan.yield_pct <= 100
+
+    def test_picks_shorter_stock(self):
+        groups = {("RS2021", "Стекольный профиль", ""): [5000.0, 2000.0]}
+        plan = cutting.optimize_cutting(groups, [6000, 3000], kerf_mm=4, trim_mm=0)
+        assert sorted(b.stock_mm for b in plan.groups[0].bars) == [3000, 6000]
+
+    def test_oversize_reported(self):
+        groups = {("RS1313", "Верхний", ""): [7000.0, 1000.0]}
+        plan = cutting.optimize_cutting(groups, [6000], kerf_mm=4, trim_mm=0)
+        assert plan.oversize == [
+            {"article": "RS1313", "color": "", "length_mm": 7000.0}
+        ]
+        assert plan.pieces == 1
+
+    def test_improve_empties_weak_bar(self):
+        bars = [[3000.0], [3000.0], [1000.0]]
+        cutting._improve(bars, 6000, 0)
+        assert sorted(map(sum, bars)) == [3000.0, 4000.0]
+
+    def test_thousands_of_pieces_fast(self):
+        rnd = random.Random(7)
+        groups = {
+            ("RS2021", "Стекольный профиль", ""): [
+                round(rnd.uniform(300, 2900), 1) for _ in range(3000)
+            ],
+            ("RS2323", "Порог", ""): [
+                rnd.choice([1968.0, 2968.0, 987.0]) for _ in range(2000)
+            ],
+        }
+        t0 = time.perf_counter()
+        plan = cutting.optimize_cutting(groups, [6000], kerf_mm=4, trim_mm=10)
+        assert time.perf_counter() - t0 < 1
+        _check_plan(plan, groups, 4, 10)
+        assert plan.yield_pct > 90
+
+    def test_excludes_seal_and_pieces(self):
+        from types import SimpleNamespace
+
+        from engine.slide_calc import calculate_slide
+
+        calc = calculate_slide(SimpleNamespace(**_section_defaults()))
+        groups = cutting.pieces_from_results([calc])
+        articles = {a for a, _, _ in groups}
+        assert "RS1002" not in articles
+        assert "RS205" not in articles
+        assert "RS2323" in articles
+
+
+def _section_defaults():
+    import schemas
+
+    return schemas.SectionBase(**SECTION).model_dump()
+
+
+class TestApi:
+    def _add(self, client, headers, project_id, **fields):
+        r = client.post(
+            f"/api/projects/{project_id}/sections",
+            headers=headers,
+            json={**SECTION, **fields},
+        )
+        assert r.status_code == 201
+
+    def test_project_plan(self, client, admin_headers, project):
+        self._add(client, admin_headers, project["id"], quantity=2)
+        r = client.get(
+            f"/api/projects/{project['id']}/cutting",
+            headers=admin_headers,
+            params={"stock": [6000, 4000], "kerf": 3},
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert data["project_ids"] == [project["id"]]
+        assert data["stock_lengths"] == [4000, 6000]
+        assert data["kerf_mm"] == 3
+        threshold = next(g for g in data["groups"] if g["article"] == "RS2323")
+        assert threshold["pieces"] == 2
+
+    def test_bad_params(self, client, admin_headers, project):
+        r = client.get(
+            f"/api/projects/{project['id']}/cutting",
+            headers=admin_headers,
+            params={"kerf": -1},
+        )
+        assert r.status_code == 400
+
+    def test_multi_project(self, client, admin_headers, project):
+        r = client.post(
+            "/api/projects",
+            headers=admin_headers,
+            json={"number": "CUT-2", "customer": "Заказчик"},
+        )
+        other = r.json()
+        self._add(client, admin_headers, project["id"])
+        self._add(client, admin_headers, other["id"])
+
+        r = client.post(
+            "/api/cutting",
+            headers=admin_headers,
+            json={"project_ids": [project["id"], other["id"]]},
+        )
+        assert r.status_code == 200
+        threshold = next(g for g in r.json()["groups"] if g["article"] == "RS2323")
+        assert threshold["pieces"] == 2
+        # Два порога 1968 мм — из одного хлыста
+        assert len(threshold["bars"]) == 1
+
+        client.delete(f"/api/projects/{other['id']}", headers=admin_headers)
+        r = client.post(
+            "/api/cutting",
+            headers=admin_headers,
+            json={"project_ids": [project["id"], other["id"]]},
+        )
+        assert r.status_code == 404
+
+
+def test_cutting_html_collapses_identical_bars():
+    groups = {("RS2323", "Порог", ""): [2968.0] * 6}
+    plan = cutting.optimize_cutting(groups, [6000], kerf_mm=4, trim_mm=10)
+    html = render_cutting_html([type("P", (), {"number": "П-1"})()], plan)
+    assert "× 3" in html
+    assert "2968 + 2968" in html
@@ -0,0 +1,32 @@
+"""
+Тесты профиля SQLite (database.SQLITE_PROFILE).
+"""
+
+import sqlite3
+
+import pytest
+
+from database import SQLITE_PROFILE, apply_sqlite_profile, engine, optimize_db
+
+
+def test_profile_applied_to_app_connections(client):
+    with engine.connect() as conn:
+        pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()  # noqa: E731
+        assert pragma("journal_mode") == "wal"
+        assert pragma("busy_timeout") == SQLITE_PROFILE["busy_timeout"]
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("temp_store") == 2  # MEMORY
+        assert pragma("cache_size") == SQLITE_PROFILE["cache_size"]
+
+
+def test_rejects_unknown_values(tmp_path):
+    conn = sqlite3.connect(tmp_path / "x.db")
+    with pytest.raises(ValueError):
+        apply_sqlite_profile(conn, {"journal_mode": "WAL; DROP TABLE users"})
+    with pytest.raises(ValueError):
+        apply_sqlite_profile(conn, {"cache_size": "1; DROP TABLE users"})
+    conn.close()
+
+
+def test_optimize_db(client):
+    optimize_db()
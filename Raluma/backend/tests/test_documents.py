@@ -1,9 +1,10 @@
 """
 Тесты API производственных документов (preview, overrides).
-PDF-генерацию не тестируем (требует WeasyPrint + системные библиотеки).
+PDF-генерацию подменяем (WeasyPrint требует системные библиотеки).
 """
 
 import json
+import os
 
 
 def _create_slide_section(client, admin_headers, project_id):
@@ -80,6 +81,81 @@ class TestPreview:
         assert "только для системы СЛАЙД" in r.text
 
 
+class TestPreviewEtag:
+    def _url(self, project, section):
+        return f"/api/projects/{project['id']}/sections/{section['id']}/preview"
+
+    def test_not_modified(self, client, admin_headers, project):
+        section = _create_slide_section(client, admin_headers, project["id"])
+        token = admin_headers["Authorization"].replace("Bearer ", "")
+        r = client.get(self._url(project, section), params={"token": token})
+        etag = r.headers["etag"]
+
+        r = client.get(
+            self._url(project, section),
+            params={"token": token},
+            headers={"If-None-Match": etag},
+        )
+        assert r.status_code == 304
+        assert r.headers["etag"] == etag
+        assert r.content == b""
+
+    def test_overrides_change_etag(self, client, admin_headers, project):
+        section = _create_slide_section(client, admin_headers, project["id"])
+        token = admin_headers["Authorization"].replace("Bearer ", "")
+        etag = client.get(
+            self._url(project, section), params={"token": token}
+        ).headers["etag"]
+        client.patch(
+            f"/api/projects/{project['id']}/sections/{section['id']}/overrides",
+            headers=admin_headers,
+            json={"overrides": {"threshold_length": "1999"}},
+        )
+        r = client.get(
+            self._url(project, section),
+            params={"token": token},
+            headers={"If-None-Match": etag},
+        )
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+
+    def test_asset_overwrite_changes_etag(
+        self, client, admin_headers, project, monkeypatch, tmp_path
+    ):
+        from engine.assets import store
+
+        monkeypatch.setattr(store, "directory", str(tmp_path))
+        image = tmp_path / "RS1.jpg"
+        image.write_bytes(b"old")
+        os.utime(image, ns=(1, 1))
+        section = _create_slide_section(client, admin_headers, project["id"])
+        token = admin_headers["Authorization"].replace("Bearer ", "")
+        etag = client.get(
+            self._url(project, section), params={"token": token}
+        ).headers["etag"]
+
+        # Перезапись на месте (cp/rsync): mtime каталога не меняется
+        dir_mtime = os.stat(tmp_path).st_mtime_ns
+        image.write_bytes(b"new image")
+        assert os.stat(tmp_path).st_mtime_ns == dir_mtime
+        r = client.get(
+            self._url(project, section),
+            params={"token": token},
+            headers={"If-None-Match": etag},
+        )
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+
+    def test_etag_requires_auth(self, client, admin_headers, project):
+        section = _create_slide_section(client, admin_headers, project["id"])
+        token = admin_headers["Authorization"].replace("Bearer ", "")
+        etag = client.get(
+            self._url(project, section), params={"token": token}
+        ).headers["etag"]
+        r = client.get(self._url(project, section), headers={"If-None-Match": etag})
+        assert r.status_code == 401
+
+
 class TestOverrides:
     def test_save_overrides(self, client, admin_headers, project):
         section = _create_slide_section(client, admin_headers, project["id"])
@@ -155,3 +231,160 @@ class TestOverrides:
             json={"overrides": {"x": "1"}},
         )
         assert r.status_code == 404
+
+
+class TestPdfCache:
+    """generate_pdf подменяется — WeasyPrint в тестах не нужен."""
+
+    def _patch_pdf(self, monkeypatch, tmp_path):
+        from engine import pdf_cache
+
+        monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+        calls = []
+
+        def fake_generate_pdf(html):
+            calls.append(html)
+            return b"%PDF-fake " + str(len(calls)).encode()
+
+        monkeypatch.setattr("engine.pdf.generate_pdf", fake_generate_pdf)
+        return calls
+
+    def test_second_download_is_cache_hit(
+        self, client, admin_headers, project, monkeypatch, tmp_path
+    ):
+        calls = self._patch_pdf(monkeypatch, tmp_path)
+        section = _create_slide_section(client, admin_headers, project["id"])
+        url = f"/api/projects/{project['id']}/sections/{section['id']}/pdf"
+
+        r1 = client.get(url, headers=admin_headers)
+        r2 = client.get(url, headers=admin_headers)
+        assert r1.status_code == 200
+        assert r2.content == r1.content
+        assert len(calls) == 1
+
+    def test_overrides_change_key(
+        self, client, admin_headers, project, monkeypatch, tmp_path
+    ):
+        calls = self._patch_pdf(monkeypatch, tmp_path)
+        section = _create_slide_section(client, admin_headers, project["id"])
+        pid, sid = project["id"], section["id"]
+
+        client.get(f"/api/projects/{pid}/sections/{sid}/pdf", headers=admin_headers)
+        client.patch(
+            f"/api/projects/{pid}/sections/{sid}/overrides",
+            headers=admin_headers,
+            json={"overrides": {"threshold_length": "1999"}},
+        )
+        r = client.get(f"/api/projects/{pid}/sections/{sid}/pdf", headers=admin_headers)
+        assert r.status_code == 200
+        assert len(calls) == 2
+
+    def test_eviction_keeps_size_under_limit(self, tmp_path, monkeypatch):
+        from engine import pdf_cache
+
+        monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(pdf_cache, "MAX_BYTES", 250)
+        pdf_cache.put("aa" + "0" * 62, b"x" * 100)
+        pdf_cache.put("bb" + "0" * 62, b"x" * 100)
+        # Обращение делает первый файл «свежим» — вытеснен будет второй
+        os.utime(pdf_cache._path("aa" + "0" * 62), (1, 1))
+        os.utime(pdf_cache._path("bb" + "0" * 62), (2, 2))
+        assert pdf_cache.get("aa" + "0" * 62) == b"x" * 100
+        pdf_cache.put("cc" + "0" * 62, b"x" * 100)
+
+        assert pdf_cache.get("aa" + "0" * 62) is not None
+        assert pdf_cache.get("bb" + "0" * 62) is None
+        assert pdf_cache.get("cc" + "0" * 62) is not None
+
+
+class TestProjectPdf:
+    def _patch_pdf(self, monkeypatch, tmp_path):
+        from engine import pdf_cache, render_pool
+
+        monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+        pooled = []
+        submit = render_pool._submit
+
+        def spy_submit(fn, arg):
+            pooled.append(fn.__name__)
+            return submit(fn, arg)
+
+        def generate_pdf(html):
+            return b"%PDF-sheet"
+
+        def merge_pdfs(parts):
+            return b"%PDF-" + b"x" * len(parts)
+
+        monkeypatch.setattr(render_pool, "_submit", spy_submit)
+        monkeypatch.setattr("engine.pdf.generate_pdf", generate_pdf)
+        monkeypatch.setattr("engine.pdf.merge_pdfs", merge_pdfs)
+        return pooled
+
+    def test_merges_slide_sections(
+        self, client, admin_headers, project, monkeypatch, tmp_path
+    ):
+        pooled = self._patch_pdf(monkeypatch, tmp_path)
+        _create_slide_section(client, admin_headers, project["id"])
+        _create_slide_section(client, admin_headers, project["id"])
+        client.post(
+            f"/api/projects/{project['id']}/sections",
+            headers=admin_headers,
+            json={"name": "ЦС1", "system": "ЦС"},
+        )
+
+        r = client.get(f"/api/projects/{project['id']}/pdf", headers=admin_headers)
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/pdf"
+        assert r.content == b"%PDF-xxx"  # 2 листа + карта раскроя
+        # Вёрстка и склейка — только через render_pool
+        assert pooled == ["generate_pdf"] * 3 + ["merge_pdfs"]
+
+        # Повторный запрос — из кэша, без вёрстки
+        r = client.get(f"/api/projects/{project['id']}/pdf", headers=admin_headers)
+        assert r.status_code == 200
+        assert len(pooled) == 4
+
+    def test_reuses_cached_sheets(
+        self, client, admin_headers, project, monkeypatch, tmp_path
+    ):
+        pooled = self._patch_pdf(monkeypatch, tmp_path)
+        section = _create_slide_section(client, admin_headers, project["id"])
+        client.get(
+            f"/api/projects/{project['id']}/sections/{section['id']}/pdf",
+            headers=admin_headers,
+        )
+        assert len(pooled) == 1
+
+        r = client.get(f"/api/projects/{project['id']}/pdf", headers=admin_headers)
+        assert r.status_code == 200
+        # Лист из кэша: в пул ушли только карта раскроя и склейка
+        assert pooled == ["generate_pdf", "generate_pdf", "merge_pdfs"]
+
+    def test_no_slide_sections(self, client, admin_headers, project):
+        r = client.get(f"/api/projects/{project['id']}/pdf", headers=admin_headers)
+        assert r.status_code == 400
+
+
+def test_jinja_env_is_shared_and_warm():
+    from engine import pdf
+
+    pdf.warmup()
+    env = pdf._get_env()
+    assert pdf._get_env() is env
+    assert env.get_template(pdf.SECTION_TEMPLATE) is env.get_template(
+        pdf.SECTION_TEMPLATE
+    )
+
+
+def test_calc_version_changes_cache_key(monkeypatch):
+    from types import SimpleNamespace
+
+    from engine import pdf_cache
+
+    section = SimpleNamespace(
+        __table__=SimpleNamespace(columns=[]), document_overrides="{}"
+    )
+    project = SimpleNamespace(id=1, number="N", customer="C")
+    key = pdf_cache.cache_key(project, section)
+    monkeypatch.setattr(pdf_cache, "CALC_VERSION", pdf_cache.CALC_VERSION + 1)
+    assert pdf_cache.cache_key(project, section) != key
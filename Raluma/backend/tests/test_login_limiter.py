@@ -0,0 +1,135 @@
+"""
+Тесты ограничения попыток входа (login_limiter).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import login_limiter
+import metrics
+from api import auth as auth_api
+
+
+@pytest.fixture(autouse=True)
+def clean_limiter(monkeypatch):
+    monkeypatch.setattr(login_limiter, "MAX_PER_USER", 3)
+    monkeypatch.setattr(login_limiter, "MAX_PER_IP", 5)
+    monkeypatch.setattr(login_limiter, "TRUST_PROXY", True)
+    login_limiter.reset()
+    yield
+    login_limiter.reset()
+
+
+def _login(client, username, password="wrong", ip="10.0.0.1"):
+    return client.post(
+        "/api/auth/login",
+        json={"username": username, "password": password},
+        headers={"X-Forwarded-For": ip},
+    )
+
+
+def test_user_locked_after_failures(client, monkeypatch):
+    for _ in range(3):
+        assert _login(client, "admin").status_code == 401
+
+    def no_bcrypt(*args):
+        raise AssertionError("bcrypt при блокировке вызываться не должен")
+
+    monkeypatch.setattr(auth_api, "verify_password", no_bcrypt)
+    r = _login(client, "admin", "admin123")
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) > 0
+
+
+def test_username_key_is_case_insensitive(client):
+    for name in ("Ghost", "GHOST", "ghost"):
+        _login(client, name)
+    assert _login(client, "gHoSt").status_code == 429
+
+
+def test_success_resets_user_counter(client):
+    for _ in range(2):
+        _login(client, "admin")
+    assert _login(client, "admin", "admin123").status_code == 200
+    for _ in range(2):
+        assert _login(client, "admin").status_code == 401
+
+
+def test_ip_locked_across_usernames(client):
+    for i in range(5):
+        assert _login(client, f"spray{i}").status_code == 401
+    assert _login(client, "spray_next").status_code == 429
+    # Другой клиент не страдает
+    assert _login(client, "admin", "admin123", ip="10.0.0.2").status_code == 200
+
+
+def test_last_forwarded_address_is_used(client):
+    for i in range(5):
+        _login(client, f"spray{i}", ip=f"1.2.3.{i}, 10.0.0.9")
+    assert _login(client, "other", ip="10.0.0.9").status_code == 429
+
+
+def test_forwarded_for_ignored_without_trusted_proxy(client, monkeypatch):
+    monkeypatch.setattr(login_limiter, "TRUST_PROXY", False)
+    for i in range(5):
+        _login(client, f"spray{i}", ip=f"1.2.3.{i}")
+    # Подмена X-Forwarded-For не уводит от лимита по адресу соединения
+    assert _login(client, "other", ip="1.2.3.99").status_code == 429
+
+
+def test_parallel_attempts_do_not_overshoot():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        waits = list(
+            pool.map(lambda _: login_limiter.attempt("ghost", "10.0.0.1"), range(8))
+        )
+    assert sum(1 for w in waits if w == 0) == 3
+
+
+def test_window_expires(client, monkeypatch):
+    monkeypatch.setattr(login_limiter, "WINDOW", 0.2)
+    for _ in range(3):
+        _login(client, "ghost")
+    assert _login(client, "ghost").status_code == 429
+    time.sleep(0.25)
+    assert _login(client, "ghost").status_code == 401
+
+
+def test_lockouts_in_metrics(client):
+    before = metrics.value("raluma_login_lockouts_total", scope="user")
+    for _ in range(4):
+        _login(client, "ghost")
+    assert metrics.value("raluma_login_lockouts_total", scope="user") == before + 1
+    body = client.get("/metrics").text
+    assert 'raluma_login_lockouts_total{scope="user"}' in body
+    assert "raluma_login_locked_keys 1" in body
+
+
+def test_sqlite_store_shared_between_instances(tmp_path, monkeypatch):
+    path = str(tmp_path / "limiter.db")
+    first = login_limiter.SqliteStore(path)
+    second = login_limiter.SqliteStore(path)
+    now = time.time()
+    for _ in range(3):
+        first.record("user:ghost", now)
+    assert second.check("user:ghost", 3, now) > 0
+    assert second.check("user:ghost", 4, now) == 0
+    assert second.locked({"user": 3}, now) == 1
+    second.clear("user:ghost")
+    assert first.check("user:ghost", 3, now) == 0
+
+
+def test_sqlite_store_attempt_is_atomic(tmp_path):
+    path = str(tmp_path / "limiter.db")
+    stores = [login_limiter.SqliteStore(path) for _ in range(4)]
+    now = time.time()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(
+            pool.map(
+                lambda i: stores[i % 4].attempt([("user:ghost", 3)], now), range(12)
+            )
+        )
+    assert sum(1 for blocked, _ in results if blocked is None) == 3
+    stores[0].release("user:ghost")
+    assert stores[1].check("user:ghost", 3, now) == 0
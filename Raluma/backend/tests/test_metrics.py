@@ -0,0 +1,80 @@
+"""
+Тесты /metrics: гистограммы, метрики маршрутов, этапов листа и БД.
+"""
+
+import metrics
+from engine import pdf_cache
+
+
+def _count(name, **labels):
+    key = metrics._labels_key(labels)
+    series = metrics._histograms[name].get(key)
+    return series[-1] if series else 0
+
+
+def test_histogram_render_is_cumulative():
+    name = metrics.histogram("raluma_test_seconds", "Тест", buckets=(0.1, 1))
+    for v in (0.05, 0.5, 1, 5):
+        metrics.observe(name, v, kind="x")
+    body = metrics.render()
+    assert 'raluma_test_seconds_bucket{kind="x",le="0.1"} 1' in body
+    assert 'raluma_test_seconds_bucket{kind="x",le="1"} 3' in body
+    assert 'raluma_test_seconds_bucket{kind="x",le="+Inf"} 4' in body
+    assert 'raluma_test_seconds_count{kind="x"} 4' in body
+    assert 'raluma_test_seconds_sum{kind="x"} 6.55' in body
+
+
+def test_route_template_and_db_queries(client, admin_headers, project):
+    route = "/api/projects/{project_id}"
+    before = _count("raluma_http_request_db_queries", route=route)
+    r = client.get(f"/api/projects/{project['id']}", headers=admin_headers)
+    assert r.status_code == 200
+    assert _count("raluma_http_request_db_queries", route=route) == before + 1
+    body = client.get("/metrics").text
+    assert (
+        'raluma_http_requests_total{method="GET",'
+        'route="/api/projects/{project_id}",status="200"}'
+    ) in body
+    assert "raluma_http_request_duration_seconds_bucket" in body
+    assert f"/api/projects/{project['id']}" not in body
+    assert "raluma_db_queries_total" in body
+
+
+def test_unmatched_route_label(client):
+    client.get("/no/such/path")
+    assert 'route="unmatched",status="404"' in client.get("/metrics").text
+
+
+def test_stage_timings(client, admin_headers, project, section):
+    token = admin_headers["Authorization"].replace("Bearer ", "")
+    before = {
+        s: _count("raluma_stage_duration_seconds", stage=s)
+        for s in ("calc", "render_html")
+    }
+    r = client.get(
+        f"/api/projects/{project['id']}/sections/{section['id']}/preview",
+        params={"token": token},
+    )
+    assert r.status_code == 200
+    for stage, n in before.items():
+        assert _count("raluma_stage_duration_seconds", stage=stage) == n + 1
+
+
+def test_pdf_bytes(client, admin_headers, project, section, monkeypatch, tmp_path):
+    monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("engine.pdf.generate_pdf", lambda html: b"%PDF-metrics")
+    before = metrics.value("raluma_pdf_bytes_total", kind="section")
+    renders = _count("raluma_stage_duration_seconds", stage="render_pdf")
+    r = client.get(
+        f"/api/projects/{project['id']}/sections/{section['id']}/pdf",
+        headers=admin_headers,
+    )
+    assert r.status_code == 200
+    assert metrics.value("raluma_pdf_bytes_total", kind="section") == before + 12
+    assert _count("raluma_stage_duration_seconds", stage="render_pdf") == renders + 1
+
+
+def test_threadpool_gauges(client):
+    body = client.get("/metrics").text
+    assert "raluma_threadpool_size 40" in body
+    assert "raluma_threadpool_waiting 0" in body
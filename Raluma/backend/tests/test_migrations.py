@@ -0,0 +1,115 @@
+"""
+Тесты версионных миграций (migrations.run_migrations) на отдельной БД.
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+import migrations
+
+
+@pytest.fixture
+def old_db(tmp_path):
+    """БД первого релиза: без новых колонок и без schema_version."""
+    eng = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with eng.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE projects (id INTEGER PRIMARY KEY, number VARCHAR, "
+                "customer VARCHAR, system VARCHAR, created_at DATETIME, "
+                "created_by INTEGER)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE sections (id INTEGER PRIMARY KEY, project_id INTEGER, "
+                "name VARCHAR, ral_color VARCHAR, lock_left VARCHAR, lock_right VARCHAR)"
+            )
+        )
+        conn.execute(text("INSERT INTO projects (id, system) VALUES (1, 'СЛАЙД')"))
+        conn.execute(
+            text(
+                "INSERT INTO sections VALUES "
+                "(1, 1, 'Терраса', 'RAL 9016', '1-сторонний RS3018', NULL)"
+            )
+        )
+    yield eng
+    eng.dispose()
+
+
+def _count_statements(eng):
+    statements = []
+    event.listen(
+        eng,
+        "before_cursor_execute",
+        lambda conn, cursor, stmt, *args: statements.append(stmt),
+    )
+    return statements
+
+
+def test_applies_pending_once(old_db):
+    assert migrations.run_migrations(old_db) == [1, 2, 3, 4, 5]
+
+    with old_db.connect() as conn:
+        cols = migrations._columns(conn, "sections")
+        assert {"system", "slide_rows", "document_overrides"} <= cols
+        row = conn.execute(text("SELECT system, lock_left FROM sections")).one()
+        assert row == ("СЛАЙД", "ЗАМОК-ЗАЩЕЛКА 1стор")
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
+        indexes = {r[1] for r in conn.exec_driver_sql("PRAGMA index_list(projects)")}
+        assert "ix_projects_status_created" in indexes
+        # Существующие строки попали в полнотекстовый индекс
+        hit = conn.exec_driver_sql(
+            "SELECT rowid FROM sections_fts WHERE sections_fts MATCH 'террас*'"
+        ).scalar()
+        assert hit == 1
+
+    statements = _count_statements(old_db)
+    assert migrations.run_migrations(old_db) == []
+    assert statements == ["SELECT MAX(version) FROM schema_version"]
+
+
+def test_creates_tables_in_empty_db(tmp_path):
+    from database import Base
+
+    eng = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    try:
+        assert migrations.run_migrations(eng) == [1, 2, 3, 4, 5]
+        with eng.connect() as conn:
+            tables = {
+                r[0]
+                for r in conn.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            }
+        assert set(Base.metadata.tables) <= tables
+    finally:
+        eng.dispose()
+
+
+def test_failed_migration_rolls_back(old_db, monkeypatch):
+    def broken(conn):
+        conn.exec_driver_sql("UPDATE sections SET lock_right = 'x'")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(
+        migrations,
+        "MIGRATIONS",
+        migrations.MIGRATIONS + [(99, "broken", broken)],
+    )
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 99)
+    with pytest.raises(RuntimeError):
+        migrations.run_migrations(old_db)
+
+    with old_db.connect() as conn:
+        # Откатилось всё, включая версии 1–2 и саму таблицу версий
+        assert migrations.current_version(conn) == 0
+        assert "slide_rows" not in migrations._columns(conn, "sections")
+        assert conn.execute(text("SELECT lock_right FROM sections")).scalar() is None
+
+
+def test_app_db_is_up_to_date(client):
+    from database import engine
+
+    with engine.connect() as conn:
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
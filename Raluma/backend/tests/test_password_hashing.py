@@ -0,0 +1,91 @@
+"""
+Тесты пула bcrypt: стоимость хэша, перехэширование при входе, 503 при перегрузке.
+"""
+
+import threading
+
+import bcrypt
+import pytest
+
+import auth
+import models
+from database import SessionLocal
+
+
+@pytest.fixture
+def user(client, admin_headers):
+    r = client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={
+            "username": "hash_user",
+            "password": "secret123",
+            "display_name": "Хэш",
+            "role": "user",
+        },
+    )
+    data = r.json()
+    yield data
+    client.delete(f"/api/users/{data['id']}", headers=admin_headers)
+
+
+def _stored_hash(user_id: int) -> str:
+    db = SessionLocal()
+    try:
+        return db.get(models.User, user_id).password_hash
+    finally:
+        db.close()
+
+
+def test_hash_uses_configured_rounds():
+    hashed = auth.hash_password("secret")
+    assert hashed.split("$")[2] == f"{auth.BCRYPT_ROUNDS:02d}"
+    assert auth.verify_password("secret", hashed)
+    assert not auth.verify_password("wrong", hashed)
+
+
+def test_needs_rehash():
+    assert not auth.needs_rehash(auth.hash_password("secret"))
+    other = bcrypt.hashpw(b"secret", bcrypt.gensalt(auth.BCRYPT_ROUNDS + 1)).decode()
+    assert auth.needs_rehash(other)
+    assert auth.needs_rehash("garbage")
+
+
+def test_login_rehashes_old_cost(client, user):
+    old = bcrypt.hashpw(b"secret123", bcrypt.gensalt(auth.BCRYPT_ROUNDS + 1)).decode()
+    db = SessionLocal()
+    try:
+        db.get(models.User, user["id"]).password_hash = old
+        db.commit()
+    finally:
+        db.close()
+
+    r = client.post(
+        "/api/auth/login", json={"username": "hash_user", "password": "secret123"}
+    )
+    assert r.status_code == 200
+    new = _stored_hash(user["id"])
+    assert new != old
+    assert not auth.needs_rehash(new)
+
+
+def test_login_overloaded_returns_503(client, user, monkeypatch):
+    full = threading.BoundedSemaphore(1)
+    full.acquire()
+    monkeypatch.setattr(auth, "_hash_slots", full)
+    r = client.post(
+        "/api/auth/login", json={"username": "hash_user", "password": "secret123"}
+    )
+    assert r.status_code == 503
+    assert r.headers["Retry-After"]
+
+
+def test_slot_released_after_hash():
+    slots = auth._hash_slots._value
+    auth.verify_password("secret", auth.hash_password("secret"))
+    # Слот освобождается колбэком future — он мог ещё не отработать
+    for _ in range(100):
+        if auth._hash_slots._value == slots:
+            break
+        threading.Event().wait(0.01)
+    assert auth._hash_slots._value == slots
@@ -0,0 +1,129 @@
+"""
+Тесты профайлера: Sampler, /api/admin/profile и ?profile=1 у листа.
+"""
+
+import threading
+import time
+
+import pytest
+
+import metrics
+import profiler
+from engine import render_pool
+
+
+def _spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _frame_names(profile):
+    return {f["name"] for f in profile["shared"]["frames"]}
+
+
+def test_sampler_sees_own_thread():
+    with profiler.Sampler(threads={threading.get_ident()}, interval_ms=1) as s:
+        _spin(0.1)
+    assert s.samples > 10
+    profile = s.speedscope("тест")
+    assert "_spin" in _frame_names(profile)
+    sampled = profile["profiles"][0]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    n_frames = len(profile["shared"]["frames"])
+    assert all(0 <= i < n_frames for stack in sampled["samples"] for i in stack)
+
+
+def test_only_one_profiler_at_a_time():
+    with profiler.Sampler(threads=set()):
+        with pytest.raises(profiler.ProfilerBusy):
+            with profiler.Sampler(threads=set()):
+                pass
+
+
+def test_admin_profile_endpoint(client, admin_headers):
+    worker = threading.Thread(target=_spin, args=(0.3,))
+    worker.start()
+    r = client.get(
+        "/api/admin/profile",
+        params={"seconds": 0.2, "interval_ms": 2},
+        headers=admin_headers,
+    )
+    worker.join()
+    assert r.status_code == 200
+    assert "_spin" in _frame_names(r.json())
+
+
+def test_admin_profile_busy(client, admin_headers):
+    with profiler.Sampler(threads=set()):
+        r = client.get(
+            "/api/admin/profile", params={"seconds": 0.1}, headers=admin_headers
+        )
+    assert r.status_code == 409
+
+
+def test_profile_call_repeats_fast_work(monkeypatch):
+    monkeypatch.setattr(profiler, "MIN_REQUEST_SECONDS", 0.05)
+    calls = []
+    profile = profiler.profile_call("тест", lambda: calls.append(_spin(0.01)))
+    assert len(calls) >= 5
+    assert profile["name"] == f"тест ×{len(calls)}"
+    assert "_spin" in _frame_names(profile)
+
+
+def test_preview_profile(client, admin_headers, project, section, monkeypatch):
+    monkeypatch.setattr(profiler, "MIN_REQUEST_SECONDS", 0.1)
+    token = admin_headers["Authorization"].replace("Bearer ", "")
+    r = client.get(
+        f"/api/projects/{project['id']}/sections/{section['id']}/preview",
+        params={"token": token, "profile": 1},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert "render_sheet_html" in _frame_names(r.json())
+
+
+def test_pdf_profile(client, admin_headers, project, section, monkeypatch):
+    monkeypatch.setattr(profiler, "MIN_REQUEST_SECONDS", 0.05)
+
+    def no_pool(*args):
+        raise AssertionError("профиль не должен рендерить через пул")
+
+    monkeypatch.setattr(render_pool, "_submit", no_pool)
+    before = metrics.value("raluma_pdf_bytes_total", kind="section")
+    r = client.get(
+        f"/api/projects/{project['id']}/sections/{section['id']}/pdf",
+        params={"profile": 1},
+        headers=admin_headers,
+    )
+    assert r.status_code == 200
+    assert "render_sheet_html" in _frame_names(r.json())
+    assert metrics.value("raluma_pdf_bytes_total", kind="section") == before
+
+
+def test_profile_flag_requires_admin(client, admin_headers, project, section):
+    r = client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={
+            "username": "profile_user",
+            "password": "secret123",
+            "display_name": "Профиль",
+            "role": "manager",
+        },
+    )
+    user = r.json()
+    try:
+        token = client.post(
+            "/api/auth/login",
+            json={"username": "profile_user", "password": "secret123"},
+        ).json()["access_token"]
+        r = client.get(
+            f"/api/projects/{project['id']}/sections/{section['id']}/pdf",
+            params={"profile": 1},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert r.status_code == 403
+    finally:
+        client.delete(f"/api/users/{user['id']}", headers=admin_headers)
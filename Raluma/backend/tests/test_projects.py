@@ -1,3 +1,9 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+
 def test_create_project(client, admin_headers):
     r = client.post(
         "/api/projects",
@@ -78,3 +84,310 @@ def test_delete_project(client, admin_headers):
 def test_projects_require_auth(client):
     r = client.get("/api/projects")
     assert r.status_code == 403
+
+
+class TestProjectPages:
+    @pytest.fixture
+    def many(self, client, admin_headers):
+        ids = []
+        for i in range(7):
+            r = client.post(
+                "/api/projects",
+                headers=admin_headers,
+                json={"number": f"PG-{i}", "customer": f"Страничный {i % 2}"},
+            )
+            ids.append(r.json()["id"])
+            client.put(
+                f"/api/projects/{ids[-1]}",
+                headers=admin_headers,
+                json={"status": "pg-test", "glass_status": f"g{i % 3}"},
+            )
+        yield ids
+        for pid in ids:
+            client.delete(f"/api/projects/{pid}", headers=admin_headers)
+
+    def _pages(self, client, headers, **params):
+        seen, cursor, pages = [], None, 0
+        while True:
+            r = client.get(
+                "/api/projects",
+                headers=headers,
+                params={**params, **({"cursor": cursor} if cursor else {})},
+            )
+            assert r.status_code == 200
+            seen += [p["id"] for p in r.json()]
+            pages += 1
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                return seen, pages
+
+    def test_keyset_pages_cover_everything(self, client, admin_headers, many):
+        seen, pages = self._pages(client, admin_headers, limit=3, status="pg-test")
+        assert seen == sorted(many, reverse=True)
+        assert pages == 3
+
+    def test_filters(self, client, admin_headers, many):
+        seen, _ = self._pages(
+            client, admin_headers, limit=2, status="pg-test", glass_status="g0"
+        )
+        assert seen == [many[6], many[3], many[0]]
+        seen, _ = self._pages(
+            client, admin_headers, status="pg-test", customer="Страничный 1"
+        )
+        assert seen == [many[5], many[3], many[1]]
+        r = client.get(
+            "/api/projects",
+            headers=admin_headers,
+            params={"status": "pg-test", "created_from": "2999-01-01T00:00:00"},
+        )
+        assert r.json() == []
+
+    def test_without_limit_returns_all(self, client, admin_headers, many):
+        r = client.get(
+            "/api/projects", headers=admin_headers, params={"status": "pg-test"}
+        )
+        assert [p["id"] for p in r.json()] == sorted(many, reverse=True)
+        assert "X-Next-Cursor" not in r.headers
+
+    def test_bad_cursor(self, client, admin_headers):
+        r = client.get(
+            "/api/projects", headers=admin_headers, params={"limit": 5, "cursor": "!!"}
+        )
+        assert r.status_code == 400
+
+    def test_customer_prefix_is_like(self, client, admin_headers):
+        ids = []
+        for customer in ("Acme_1", "ACMEX1", "Acmé"):
+            r = client.post(
+                "/api/projects",
+                headers=admin_headers,
+                json={"number": f"LIKE-{customer}", "customer": customer},
+            )
+            ids.append(r.json()["id"])
+        try:
+            for prefix, expected in (("acme_", [ids[0]]), ("ACM", ids[:2] + [ids[2]])):
+                r = client.get(
+                    "/api/projects", headers=admin_headers, params={"customer": prefix}
+                )
+                assert sorted(p["id"] for p in r.json()) == sorted(expected)
+        finally:
+            for project_id in ids:
+                client.delete(f"/api/projects/{project_id}", headers=admin_headers)
+
+    def test_customer_filter_uses_index(self, client):
+        from database import engine
+
+        with engine.connect() as conn:
+            plan = " ".join(
+                row[-1]
+                for row in conn.exec_driver_sql(
+                    "EXPLAIN QUERY PLAN SELECT * FROM projects "
+                    "WHERE customer LIKE 'ac%' ESCAPE '\\'"
+                )
+            )
+        assert "ix_projects_customer_nocase" in plan
+
+    def test_filter_uses_index(self, client):
+        from database import engine
+
+        with engine.connect() as conn:
+            plan = " ".join(
+                row[-1]
+                for row in conn.exec_driver_sql(
+                    "EXPLAIN QUERY PLAN SELECT * FROM projects WHERE status = 'x' "
+                    "ORDER BY created_at DESC, id DESC LIMIT 20"
+                )
+            )
+        assert "ix_projects_status_created" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+@contextmanager
+def _count_queries():
+    from database import engine
+
+    statements = []
+
+    def before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+
+
+class TestProjectLoading:
+    @pytest.fixture
+    def with_sections(self, client, admin_headers, project):
+        for i in range(5):
+            client.post(
+                f"/api/projects/{project['id']}/sections",
+                headers=admin_headers,
+                json={"name": f"С{i}", "system": "СЛАЙД", "width": 1000 + i},
+            )
+        return project
+
+    def test_get_project_query_count(self, client, admin_headers, with_sections):
+        url = f"/api/projects/{with_sections['id']}"
+        with _count_queries() as queries:
+            r = client.get(url, headers=admin_headers)
+        assert len(r.json()["sections"]) == 5
+        # проект и все секции одним запросом (пользователь — из кэша)
+        assert len(queries) == 2
+
+    def test_update_project_query_count(self, client, admin_headers, with_sections):
+        url = f"/api/projects/{with_sections['id']}"
+        with _count_queries() as queries:
+            r = client.put(url, headers=admin_headers, json={"comments": "x"})
+        assert r.json()["comments"] == "x"
+        assert len(r.json()["sections"]) == 5
+        # проект, секции, UPDATE — без перечитывания после commit
+        assert len(queries) == 3
+
+    def test_copy_project_query_count(self, client, admin_headers, with_sections):
+        url = f"/api/projects/{with_sections['id']}/copy"
+        with _count_queries() as queries:
+            r = client.post(url, headers=admin_headers)
+        copy = r.json()
+        assert len(copy["sections"]) == 5
+        # исходный проект, INSERT…SELECT проекта и секций, копия+секции
+        assert len(queries) == 5
+        client.delete(f"/api/projects/{copy['id']}", headers=admin_headers)
+
+    def test_summary_fields(self, client, admin_headers, with_sections):
+        url = f"/api/projects/{with_sections['id']}"
+        with _count_queries() as queries:
+            r = client.get(url, headers=admin_headers, params={"fields": "summary"})
+        assert r.status_code == 200
+        section = r.json()["sections"][0]
+        assert set(section) == {
+            "id",
+            "project_id",
+            "order",
+            "name",
+            "system",
+            "width",
+            "height",
+            "panels",
+            "quantity",
+        }
+        assert r.json()["number"] == with_sections["number"]
+        assert "document_overrides" not in queries[-1]
+
+        r = client.get(url, headers=admin_headers, params={"fields": "name,ral_color"})
+        assert set(r.json()["sections"][0]) == {"id", "name", "ral_color"}
+
+        r = client.get(url, headers=admin_headers, params={"fields": "nope"})
+        assert r.status_code == 400
+
+    def test_get_single_section(self, client, admin_headers, with_sections):
+        url = f"/api/projects/{with_sections['id']}"
+        sid = client.get(url, headers=admin_headers).json()["sections"][2]["id"]
+        r = client.get(f"{url}/sections/{sid}", headers=admin_headers)
+        assert r.status_code == 200
+        assert r.json()["width"] == 1002
+        r = client.get(f"{url}/sections/999999", headers=admin_headers)
+        assert r.status_code == 404
+
+
+class TestProjectCopy:
+    def test_copies_every_column(self, client, admin_headers, project, section):
+        client.put(
+            f"/api/projects/{project['id']}",
+            headers=admin_headers,
+            json={"status": "В работе", "order_items": "[]", "comments": "к"},
+        )
+        client.patch(
+            f"/api/projects/{project['id']}/sections/{section['id']}/overrides",
+            headers=admin_headers,
+            json={"overrides": {"glass_height": "999"}},
+        )
+        r = client.post(
+            f"/api/projects/{project['id']}/copy",
+            headers=admin_headers,
+            params={"with_overrides": True},
+        )
+        assert r.status_code == 201
+        copy = r.json()
+        source = client.get(
+            f"/api/projects/{project['id']}", headers=admin_headers
+        ).json()
+        skip = {"id", "number", "created_at", "updated_at", "sections"}
+        assert {k: v for k, v in copy.items() if k not in skip} == {
+            k: v for k, v in source.items() if k not in skip
+        }
+        src_section = {
+            k: v
+            for k, v in source["sections"][0].items()
+            if k not in ("id", "project_id")
+        }
+        new_section = {
+            k: v
+            for k, v in copy["sections"][0].items()
+            if k not in ("id", "project_id")
+        }
+        assert new_section == src_section
+
+        from database import SessionLocal
+        import models
+
+        with SessionLocal() as db:
+            copied = db.get(models.Section, copy["sections"][0]["id"])
+            assert copied.document_overrides == '{"glass_height": "999"}'
+        client.delete(f"/api/projects/{copy['id']}", headers=admin_headers)
+
+    def test_overrides_reset_by_default(self, client, admin_headers, project, section):
+        client.patch(
+            f"/api/projects/{project['id']}/sections/{section['id']}/overrides",
+            headers=admin_headers,
+            json={"overrides": {"glass_height": "999"}},
+        )
+        copy = client.post(
+            f"/api/projects/{project['id']}/copy", headers=admin_headers
+        ).json()
+
+        from database import SessionLocal
+        import models
+
+        with SessionLocal() as db:
+            copied = db.get(models.Section, copy["sections"][0]["id"])
+            assert copied.document_overrides == "{}"
+        client.delete(f"/api/projects/{copy['id']}", headers=admin_headers)
+
+    def test_bulk_copy(self, client, admin_headers, project, section):
+        r = client.post(
+            "/api/projects",
+            headers=admin_headers,
+            json={"number": "BULK-2", "customer": "Б"},
+        )
+        other = r.json()
+        for i in range(100):
+            client.post(
+                f"/api/projects/{other['id']}/sections",
+                headers=admin_headers,
+                json={"name": f"С{i}", "system": "СЛАЙД", "order": i},
+            )
+        r = client.post(
+            "/api/projects/copy",
+            headers=admin_headers,
+            json={"project_ids": [other["id"], project["id"]]},
+        )
+        assert r.status_code == 201
+        copies = r.json()
+        assert [c["number"] for c in copies] == ["BULK-2-копия", "TEST-001-копия"]
+        sections = client.get(
+            f"/api/projects/{copies[0]['id']}", headers=admin_headers
+        ).json()["sections"]
+        assert [s["name"] for s in sections] == [f"С{i}" for i in range(100)]
+        for pid in (other["id"], copies[0]["id"], copies[1]["id"]):
+            client.delete(f"/api/projects/{pid}", headers=admin_headers)
+
+    def test_bulk_copy_missing_project(self, client, admin_headers, project):
+        r = client.post(
+            "/api/projects/copy",
+            headers=admin_headers,
+            json={"project_ids": [project["id"], 999999]},
+        )
+        assert r.status_code == 404
@@ -0,0 +1,82 @@
+"""
+Тесты статистики запросов к БД (query_stats, /api/admin/queries).
+"""
+
+import json
+import logging
+
+import pytest
+
+import query_stats
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    query_stats.reset()
+    yield
+    query_stats.reset()
+
+
+def test_normalize():
+    a = query_stats.normalize(
+        "SELECT * FROM sections\n WHERE id IN (?, ?, ?) AND name = 'x' LIMIT 10"
+    )
+    b = query_stats.normalize(
+        "SELECT * FROM sections WHERE id IN (?, ?) AND name = 'y''z' LIMIT 5"
+    )
+    assert a == b == "SELECT * FROM sections WHERE id IN (?, …) AND name = ? LIMIT ?"
+
+
+def test_top_queries_endpoint(client, admin_headers, project):
+    for _ in range(3):
+        client.get(f"/api/projects/{project['id']}", headers=admin_headers)
+    r = client.get("/api/admin/queries", headers=admin_headers)
+    assert r.status_code == 200
+    rows = r.json()
+    projects = [row for row in rows if "FROM projects" in row["statement"]]
+    assert projects and projects[0]["count"] >= 3
+    assert set(rows[0]) == {"statement", "count", "total_ms", "avg_ms", "max_ms"}
+    totals = [row["total_ms"] for row in rows]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_top_queries_limit_and_order(client, admin_headers, project):
+    client.get(f"/api/projects/{project['id']}", headers=admin_headers)
+    r = client.get(
+        "/api/admin/queries",
+        params={"limit": 1, "order": "count"},
+        headers=admin_headers,
+    )
+    assert len(r.json()) == 1
+    r = client.get(
+        "/api/admin/queries", params={"order": "bogus"}, headers=admin_headers
+    )
+    assert r.status_code == 422
+
+
+def test_reset(client, admin_headers, project):
+    client.get(f"/api/projects/{project['id']}", headers=admin_headers)
+    assert client.delete("/api/admin/queries", headers=admin_headers).status_code == 200
+    rows = client.get("/api/admin/queries", headers=admin_headers).json()
+    assert not any("FROM projects" in row["statement"] for row in rows)
+
+
+def test_queries_require_auth(client):
+    assert client.get("/api/admin/queries").status_code in (401, 403)
+
+
+def test_slow_query_logged_with_plan(
+    client, admin_headers, project, monkeypatch, caplog
+):
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="raluma.slow_query"):
+        client.get(f"/api/projects/{project['id']}", headers=admin_headers)
+    records = [json.loads(r.getMessage()) for r in caplog.records]
+    selects = [r for r in records if "FROM projects" in r["statement"]]
+    assert selects
+    assert any("projects" in line for line in selects[0]["plan"])
+
+
+def test_db_span_in_server_timing(client, admin_headers, project):
+    r = client.get(f"/api/projects/{project['id']}", headers=admin_headers)
+    assert "db;dur=" in r.headers["Server-Timing"]
@@ -0,0 +1,127 @@
+"""
+Тесты фоновых задач рендеринга PDF.
+RENDER_WORKERS=0 (conftest) — рендер идёт в потоке, generate_pdf подменяется.
+"""
+
+import time
+
+import pytest
+
+from tests.test_documents import _create_slide_section
+
+
+@pytest.fixture
+def fake_pdf(monkeypatch, tmp_path):
+    from engine import pdf_cache
+
+    monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("engine.pdf.generate_pdf", lambda html: b"%PDF-job")
+
+
+def _wait(client, headers, job_id):
+    for _ in range(100):
+        r = client.get(f"/api/render-jobs/{job_id}", headers=headers)
+        if r.json()["status"] in ("done", "failed"):
+            return r.json()
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_job_lifecycle(client, admin_headers, project, fake_pdf):
+    section = _create_slide_section(client, admin_headers, project["id"])
+    r = client.post(
+        f"/api/projects/{project['id']}/sections/{section['id']}/pdf-jobs",
+        headers=admin_headers,
+    )
+    assert r.status_code == 202
+    job = _wait(client, admin_headers, r.json()["job_id"])
+    assert job["status"] == "done"
+
+    r = client.get(f"/api/render-jobs/{job['job_id']}/pdf", headers=admin_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/pdf"
+    assert r.content == b"%PDF-job"
+
+
+def test_failed_job_reports_error(
+    client, admin_headers, project, monkeypatch, tmp_path
+):
+    from engine import pdf_cache
+
+    def broken(html):
+        raise RuntimeError("layout failed")
+
+    monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("engine.pdf.generate_pdf", broken)
+    section = _create_slide_section(client, admin_headers, project["id"])
+    r = client.post(
+        f"/api/projects/{project['id']}/sections/{section['id']}/pdf-jobs",
+        headers=admin_headers,
+    )
+    job = _wait(client, admin_headers, r.json()["job_id"])
+    assert job["status"] == "failed"
+    assert "layout failed" in job["error"]
+    r = client.get(f"/api/render-jobs/{job['job_id']}/pdf", headers=admin_headers)
+    assert r.status_code == 500
+
+
+def test_job_not_found(client, admin_headers):
+    r = client.get("/api/render-jobs/nope", headers=admin_headers)
+    assert r.status_code == 404
+
+
+def test_job_requires_auth(client, project):
+    r = client.post(f"/api/projects/{project['id']}/sections/1/pdf-jobs")
+    assert r.status_code == 403
+
+
+def test_timeout_counts_from_start_not_queue(monkeypatch):
+    from engine import render_pool
+
+    monkeypatch.setattr(render_pool, "TIMEOUT", 0.2)
+    monkeypatch.setattr(render_pool, "_WAIT_GRACE", 0.0)
+    monkeypatch.setattr(render_pool, "_START_POLL", 0.01)
+
+    def slow(html):
+        time.sleep(0.4)
+        return b"%PDF-slow"
+
+    # Один поток рендера (RENDER_WORKERS=0): вторая задача ждёт первую в очереди
+    first = render_pool._submit(slow, "")
+    second = render_pool._submit(lambda html: b"%PDF-fast", "")
+    with pytest.raises(render_pool.RenderTimeout):
+        render_pool.wait(first)
+    assert render_pool.wait(second) == b"%PDF-fast"
+
+
+def test_job_is_queued_until_started_and_queue_is_capped(
+    client, admin_headers, project, monkeypatch, tmp_path
+):
+    import threading
+
+    from engine import pdf_cache, render_pool
+
+    monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(render_pool, "MAX_JOBS", 2)
+    release = threading.Event()
+
+    def blocked(html):
+        release.wait(5)
+        return b"%PDF-job"
+
+    monkeypatch.setattr("engine.pdf.generate_pdf", blocked)
+    section = _create_slide_section(client, admin_headers, project["id"])
+    url = f"/api/projects/{project['id']}/sections/{section['id']}/pdf-jobs"
+    try:
+        first = client.post(url, headers=admin_headers).json()
+        second = client.post(url, headers=admin_headers).json()
+        # Один поток рендера: вторая задача ждёт первую
+        r = client.get(f"/api/render-jobs/{second['job_id']}", headers=admin_headers)
+        assert r.json()["status"] == "queued"
+        r = client.post(url, headers=admin_headers)
+        assert r.status_code == 503
+    finally:
+        release.set()
+    assert _wait(client, admin_headers, first["job_id"])["status"] == "done"
+    assert _wait(client, admin_headers, second["job_id"])["status"] == "done"
+    assert client.post(url, headers=admin_headers).status_code == 202
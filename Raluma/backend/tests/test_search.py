@@ -0,0 +1,101 @@
+"""
+Тесты полнотекстового поиска (GET /api/search).
+"""
+
+import pytest
+
+from api.search import fts_query
+
+
+def _search(client, headers, q):
+    r = client.get("/api/search", headers=headers, params={"q": q})
+    assert r.status_code == 200
+    return r.json()
+
+
+@pytest.fixture
+def indexed(client, admin_headers):
+    r = client.post(
+        "/api/projects",
+        headers=admin_headers,
+        json={"number": "FTS-777", "customer": "Ёлкин Пётр"},
+    )
+    project = r.json()
+    client.put(
+        f"/api/projects/{project['id']}",
+        headers=admin_headers,
+        json={"comments": "Терраса на даче, монтаж в мае"},
+    )
+    r = client.post(
+        f"/api/projects/{project['id']}/sections",
+        headers=admin_headers,
+        json={"name": "Веранда", "system": "СЛАЙД", "ral_color": "RAL 7016"},
+    )
+    yield project, r.json()
+    client.delete(f"/api/projects/{project['id']}", headers=admin_headers)
+
+
+def test_finds_project_by_prefix_and_case(client, admin_headers, indexed):
+    project, _ = indexed
+    # Регистр и окончание слова не важны
+    data = _search(client, admin_headers, "ЁЛК")
+    assert [p["id"] for p in data["projects"]] == [project["id"]]
+    assert "[Ёлкин]" in data["projects"][0]["snippet"]
+    assert (
+        _search(client, admin_headers, "терр мае")["projects"][0]["id"]
+        == (project["id"])
+    )
+
+
+def test_finds_section_by_ral(client, admin_headers, indexed):
+    _, section = indexed
+    hits = _search(client, admin_headers, "7016")["sections"]
+    assert [(h["id"], h["project_number"]) for h in hits] == [
+        (section["id"], "FTS-777")
+    ]
+
+
+def test_index_follows_updates_and_deletes(client, admin_headers, indexed):
+    project, section = indexed
+    client.put(
+        f"/api/projects/{project['id']}",
+        headers=admin_headers,
+        json={"customer": "Соснин"},
+    )
+    assert _search(client, admin_headers, "ёлкин")["projects"] == []
+    assert len(_search(client, admin_headers, "соснин")["projects"]) == 1
+
+    client.delete(
+        f"/api/projects/{project['id']}/sections/{section['id']}",
+        headers=admin_headers,
+    )
+    assert _search(client, admin_headers, "веранда")["sections"] == []
+
+
+def test_user_sees_only_own_projects(client, admin_headers, indexed):
+    r = client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={
+            "username": "fts_user",
+            "password": "secret123",
+            "display_name": "Поиск",
+            "role": "user",
+        },
+    )
+    user_id = r.json()["id"]
+    r = client.post(
+        "/api/auth/login", json={"username": "fts_user", "password": "secret123"}
+    )
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    try:
+        assert _search(client, headers, "ёлкин")["projects"] == []
+        assert _search(client, headers, "7016")["sections"] == []
+    finally:
+        client.delete(f"/api/users/{user_id}", headers=admin_headers)
+
+
+def test_fts_operators_are_escaped(client, admin_headers):
+    assert fts_query('a OR "b" NEAR(c) *') == '"a"* "OR"* "b"* "NEAR"* "c"*'
+    assert _search(client, admin_headers, '" ) NOT (')["projects"] == []
+    assert _search(client, admin_headers, "!!!") == {"projects": [], "sections": []}
@@ -0,0 +1,193 @@
+"""
+Пакетный расчёт (engine/slide_batch.py) обязан давать те же числа,
+что и calculate_slide — на всех конфигурациях из test_slide_calc.py,
+на переборе основных флагов и на корпусе бенчмарка.
+"""
+
+import ast
+import itertools
+import os
+from collections import Counter
+
+from benchmarks.bench_slide_calc import corpus
+from engine import slide_batch
+from engine.slide_batch import (
+    PROFILE_SLOTS,
+    calculate_slide_batch,
+    columns_from_sections,
+)
+from engine.slide_calc import calculate_slide
+from tests.test_slide_calc import _make_section
+
+_SCREW_KEYS = {
+    "4,8×19 A2": "screw_4819",
+    "3,9×13 A2 DIN7504M": "screw_3913m",
+    "4,8×38 A2": "screw_4838",
+    "3,9×13 A2 DIN7504O": "screw_3913o",
+    "5,4×25 A2": "screw_5425",
+    "3,5×13 A2": "screw_3513",
+    "RU1039": "ru1039",
+    "RS150": "rs150",
+}
+_HARDWARE_KEYS = (
+    "rsd1",
+    "rsd2",
+    "rs1121",
+    "rs3018",
+    "rs3019",
+    "rs122",
+    "rs3020",
+    "rs3017",
+    "rs3014",
+    "rs107l",
+    "rs107r",
+    "rs105",
+    "rs106",
+    "rs107",
+)
+
+
+def _slide_calc_test_cases():
+    """Аргументы всех вызовов _make_section(...) из test_slide_calc.py."""
+    path = os.path.join(os.path.dirname(__file__), "test_slide_calc.py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    cases = []
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and getattr(node.func, "id", None) == "_make_section"
+        ):
+            cases.append({k.arg: ast.literal_eval(k.value) for k in node.keywords})
+    return cases
+
+
+def _combinations():
+    for panels, rails, threshold, hb, bub, pb, lock, handle, q in itertools.product(
+        [1, 2, 3, 5],
+        [3, 5],
+        ["Стандартный анод", "Накладной анод"],
+        [False, True],
+        [False, True],
+        [False, True],
+        ["Без", "ЗАМОК-ЗАЩЕЛКА 1стор", "ЗАМОК-ЗАЩЕЛКА 2стор с ключом"],
+        ["Без", "Стеклянная ручка RS3017", "Ручка-кноб RS3014"],
+        [1, 3],
+    ):
+        yield dict(
+            panels=panels,
+            rails=rails,
+            threshold=threshold,
+            profile_left_handle_bar=hb,
+            profile_right_bubble=bub,
+            profile_right_p_bar=pb,
+            profile_left_lock_bar=pb,
+            lock_left=lock,
+            handle_right=handle,
+            quantity=q,
+            width=1733.3,
+            handle_offset_left=37 if hb else 0,
+        )
+
+
+def _scalar_summary(r):
+    profiles = Counter()
+    for p in r.profiles:
+        if p.qty:
+            profiles[(p.article, repr(p.length_mm), p.painted)] += p.qty
+    hardware = {}
+    for h in r.hardware:
+        if h.sub_items:
+            for sub in h.sub_items:
+                hardware[sub.field_key] = repr(sub.value)
+        else:
+            hardware[h.field_key] = repr(h.value)
+    glass = Counter()
+    for g in r.glass:
+        if g.qty:
+            glass[(repr(g.width_mm), repr(g.height_mm))] += g.qty
+    screws = {_SCREW_KEYS[s.article]: s.qty for s in r.screws}
+    return profiles, hardware, glass, screws
+
+
+def _batch_summary(cols, i):
+    profiles = Counter()
+    for slot in PROFILE_SLOTS:
+        if cols[f"{slot}_qty"][i]:
+            key = (
+                cols[f"{slot}_article"][i],
+                repr(cols[f"{slot}_length_mm"][i]),
+                cols[f"{slot}_painted"][i],
+            )
+            profiles[key] += cols[f"{slot}_qty"][i]
+    painted = cols["threshold_painted"][i]
+    h = repr(cols["glass_height"][i])
+    glass = Counter()
+    for pos in ("left", "middle", "right"):
+        qty = cols[f"glass_{pos}_qty"][i]
+        if qty:
+            profiles[("RS2021", repr(cols[f"glass_profile_{pos}"][i]), painted)] += qty
+            glass[(repr(cols[f"glass_{pos}_width"][i]), h)] += qty
+    hardware = {
+        "ru008": repr(cols["ru008_m"][i]),
+        "ru007": repr(cols["ru007_m"][i]),
+        "ru005": repr(cols["ru005"][i]),
+    }
+    for k in _HARDWARE_KEYS:
+        if cols[k][i]:
+            hardware[k] = repr(cols[k][i])
+    screws = {
+        k: cols[k][i]
+        for k in _SCREW_KEYS.values()
+        if cols[k][i] or k in ("screw_4819", "screw_3913m", "screw_4838")
+    }
+    return profiles, hardware, glass, screws
+
+
+def _assert_same(cases):
+    _assert_same_sections([_make_section(**c) for c in cases], cases)
+
+
+def _assert_same_sections(sections, cases=None):
+    cols = calculate_slide_batch(columns_from_sections(sections))
+    for i, s in enumerate(sections):
+        assert _batch_summary(cols, i) == _scalar_summary(calculate_slide(s)), (
+            cases[i] if cases else vars(s)
+        )
+
+
+def test_matches_scalar_on_slide_calc_cases():
+    cases = _slide_calc_test_cases()
+    assert len(cases) > 50
+    _assert_same(cases)
+
+
+def test_matches_scalar_on_flag_combinations():
+    _assert_same(list(_combinations()))
+
+
+def test_matches_scalar_on_benchmark_corpus():
+    _assert_same_sections(corpus(2000))
+
+
+def test_empty_batch():
+    assert calculate_slide_batch(columns_from_sections([]))["glass_height"] == []
+
+
+def test_batch_endpoint(client, admin_headers):
+    payload = [
+        {"name": "A", "width": 2000, "panels": 3, "rails": 3},
+        {"name": "B", "width": 3000, "panels": 4, "rails": 5},
+    ]
+    r = client.post("/api/calc/slide/batch", headers=admin_headers, json=payload)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["count"] == 2
+    assert data["columns"]["threshold_length_mm"] == [2000.0, 3000.0]
+    assert data["columns"]["top_guide_article"] == ["RS1313", "RS1315"]
+
+
+def test_batch_endpoint_limit(client, admin_headers):
+    payload = [{"name": "A", "width": 2000}] * (slide_batch.BATCH_MAX + 1)
+    r = client.post("/api/calc/slide/batch", headers=admin_headers, json=payload)
+    assert r.status_code == 422
@@ -0,0 +1,58 @@
+"""
+Тесты трассировки: заголовок Server-Timing и лог медленных запросов.
+"""
+
+import json
+import logging
+
+import tracing
+
+
+def _timing_names(header: str) -> list[str]:
+    return [part.split(";", 1)[0].strip() for part in header.split(",")]
+
+
+def test_preview_spans(client, admin_headers, project, section):
+    token = admin_headers["Authorization"].replace("Bearer ", "")
+    r = client.get(
+        f"/api/projects/{project['id']}/sections/{section['id']}/preview",
+        params={"token": token},
+    )
+    assert r.status_code == 200
+    names = [n for n in _timing_names(r.headers["Server-Timing"]) if n != "db"]
+    assert names == ["auth", "db_section", "calc", "render_html", "total"]
+
+
+def test_repeated_spans_are_aggregated():
+    token, trace = tracing.begin()
+    try:
+        for _ in range(3):
+            with tracing.span("calc"):
+                pass
+    finally:
+        tracing.end(token)
+    assert trace.server_timing().startswith("calc;dur=")
+    assert 'desc="x3"' in trace.server_timing()
+
+
+def test_span_without_trace_is_noop():
+    with tracing.span("calc"):
+        pass
+    assert tracing.current() is None
+
+
+def test_slow_request_logged(client, admin_headers, monkeypatch, caplog):
+    monkeypatch.setattr(tracing, "SLOW_REQUEST_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="raluma.slow"):
+        client.get("/api/auth/me", headers=admin_headers)
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["route"] == "/api/auth/me"
+    assert record["status"] == 200
+    assert [s["name"] for s in record["spans"] if s["name"] != "db"] == ["auth"]
+
+
+def test_fast_request_not_logged(client, admin_headers, monkeypatch, caplog):
+    monkeypatch.setattr(tracing, "SLOW_REQUEST_MS", 60_000)
+    with caplog.at_level(logging.WARNING, logger="raluma.slow"):
+        client.get("/api/auth/me", headers=admin_headers)
+    assert not caplog.records
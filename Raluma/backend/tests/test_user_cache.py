@@ -0,0 +1,101 @@
+"""
+Тесты кэша пользователей (auth.load_active_user) и /metrics.
+"""
+
+import pytest
+
+import auth
+import metrics
+
+
+@pytest.fixture
+def user(client, admin_headers):
+    r = client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={
+            "username": "cache_user",
+            "password": "secret123",
+            "display_name": "Кэш",
+            "role": "user",
+        },
+    )
+    data = r.json()
+    r = client.post(
+        "/api/auth/login", json={"username": "cache_user", "password": "secret123"}
+    )
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    yield data, headers
+    client.delete(f"/api/users/{data['id']}", headers=admin_headers)
+
+
+def test_second_request_hits_cache(client, user):
+    _, headers = user
+    client.get("/api/auth/me", headers=headers)
+    hits = metrics.value("raluma_user_cache_hits_total")
+    r = client.get("/api/auth/me", headers=headers)
+    assert r.status_code == 200
+    assert metrics.value("raluma_user_cache_hits_total") == hits + 1
+
+
+def test_deactivation_is_immediate(client, admin_headers, user):
+    data, headers = user
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    client.put(
+        f"/api/users/{data['id']}", headers=admin_headers, json={"is_active": False}
+    )
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_role_change_is_immediate(client, admin_headers, user):
+    data, headers = user
+    client.get("/api/auth/me", headers=headers)
+    client.put(
+        f"/api/users/{data['id']}", headers=admin_headers, json={"role": "admin"}
+    )
+    assert client.get("/api/auth/me", headers=headers).json()["role"] == "admin"
+
+
+def test_delete_is_immediate(client, admin_headers, user):
+    data, headers = user
+    client.get("/api/auth/me", headers=headers)
+    client.delete(f"/api/users/{data['id']}", headers=admin_headers)
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_ttl_expiry(client, user, monkeypatch):
+    _, headers = user
+    client.get("/api/auth/me", headers=headers)
+    monkeypatch.setattr(auth.time, "monotonic", lambda: float("inf"))
+    misses = metrics.value("raluma_user_cache_misses_total")
+    client.get("/api/auth/me", headers=headers)
+    assert metrics.value("raluma_user_cache_misses_total") == misses + 1
+
+
+def test_metrics_endpoint(client, admin_headers):
+    client.get("/api/auth/me", headers=admin_headers)
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert "# TYPE raluma_user_cache_hits_total counter" in r.text
+    assert "raluma_user_cache_hit_ratio " in r.text
+
+
+def test_metrics_render_labels():
+    metrics.counter("test_labeled_total", "Тестовый счётчик")
+    metrics.inc("test_labeled_total", route='/a"b')
+    assert 'test_labeled_total{route="/a\\"b"} 1' in metrics.render()
+
+
+def test_invalidate_during_miss_is_not_overwritten(client, user, monkeypatch):
+    data, headers = user
+    auth.invalidate_user(data["id"])
+    generation = auth._cache_generation
+
+    def deactivated_during_select(user_id):
+        seen = generation(user_id)
+        auth.invalidate_user(user_id)  # api/users деактивирует между SELECT и записью
+        return seen
+
+    monkeypatch.setattr(auth, "_cache_generation", deactivated_during_select)
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert data["id"] not in auth._user_cache
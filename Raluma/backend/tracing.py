@@ -0,0 +1,121 @@
+"""
+Трассировка запроса: этапы (span) в пределах одного HTTP-запроса.
+
+Middleware открывает трассу (begin), код отмечает этапы:
+    with tracing.span("calc"):
+        calc = calculate_slide(section)
+Этапы уходят в заголовок ответа Server-Timing (видно во вкладке Network
+браузера), а запросы дольше SLOW_REQUEST_MS пишутся в лог raluma.slow
+одной строкой JSON.
+
+Трасса лежит в contextvar: синхронные эндпоинты FastAPI выполняются
+в threadpool с копией контекста, поэтому этапы из них попадают в ту же
+трассу. Потоки, запущенные вручную (threading.Thread), контекст не
+наследуют — их этапы не пишутся.
+"""
+
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Порог «медленного» запроса, мс; 0 — писать все запросы
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+
+logger = logging.getLogger("raluma.slow")
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: list[tuple[str, float, float]] = []  # (имя, начало, длит.), с
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        self.spans.append((name, start - self.started, duration))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def totals(self) -> dict[str, tuple[float, int]]:
+        """Имя → (суммарная длительность, сколько раз) в порядке первого появления."""
+        out: dict[str, tuple[float, int]] = {}
+        for name, _, duration in self.spans:
+            total, count = out.get(name, (0.0, 0))
+            out[name] = (total + duration, count + 1)
+        return out
+
+    def server_timing(self) -> str:
+        parts = []
+        for name, (total, count) in self.totals().items():
+            part = f"{name};dur={total * 1000:.1f}"
+            if count > 1:
+                part += f';desc="x{count}"'
+            parts.append(part)
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Trace | None] = ContextVar("trace", default=None)
+
+
+def begin():
+    """Открыть трассу для текущего запроса. → (токен для end, трасса)."""
+    trace = Trace()
+    return _current.set(trace), trace
+
+
+def end(token) -> None:
+    _current.reset(token)
+
+
+def current() -> Trace | None:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, t0, time.perf_counter() - t0)
+
+
+def traced(name: str):
+    """Декоратор: весь вызов функции — этап name."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def log_if_slow(trace: Trace, method: str, path: str, route: str, status: int):
+    duration_ms = trace.elapsed() * 1000
+    if duration_ms < SLOW_REQUEST_MS:
+        return
+    record = {
+        "ts": time.time(),
+        "method": method,
+        "path": path,
+        "route": route,
+        "status": status,
+        "duration_ms": round(duration_ms, 1),
+        "spans": [
+            {"name": n, "start_ms": round(s * 1000, 1), "ms": round(d * 1000, 1)}
+            for n, s, d in trace.spans
+        ],
+    }
+    logger.warning(json.dumps(record, ensure_ascii=False))
@@ -1,34 +1,51 @@
 #!/bin/bash
 # Backup SQLite database for Ралюма
-# Usage: ./backup.sh
-# Cron (daily at 03:00): 0 3 * * * /opt/mamajan/Raluma/scripts/backup.sh >> /var/log/raluma-backup.log 2>&1
+# Usage: ./backup.sh [full|incremental]   (default: incremental)
+# Cron:
+#   */5 * * * * /opt/mamajan/Raluma/scripts/backup.sh incremental >> /var/log/raluma-backup.log 2>&1
+#   0 3 * * *   /opt/mamajan/Raluma/scripts/backup.sh full        >> /var/log/raluma-backup.log 2>&1
+#
+# Snapshot is taken inside the backend container via the SQLite online backup
+# API (backend/backup.py): consistent with WAL, paced in page batches, gzip'ed.
+# Incremental backups store only pages changed since the previous snapshot.
+# Restore: docker compose exec backend python -m backup restore <full.db.gz> <out.db>
+#
+# Retention: the container keeps BACKUP_KEEP chains (backup.py); the host copy
+# keeps its own KEEP_DAYS of chains and is never pruned by the container side.
 
 set -e
 
-DB_FILE="/var/lib/docker/volumes/raluma_db_data/_data/raluma.db"
+MODE="${1:-incremental}"
+COMPOSE_DIR="/opt/mamajan/Raluma"
+# BACKUP_DIR inside the container defaults to /app/data/backups (db_data volume)
+SRC_DIR="/var/lib/docker/volumes/raluma_db_data/_data/backups"
 BACKUP_DIR="/opt/mamajan/backups"
 KEEP_DAYS=30
-TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-BACKUP_FILE="${BACKUP_DIR}/raluma_${TIMESTAMP}.db"
 
-# Create backup dir if needed
-mkdir -p "$BACKUP_DIR"
-
-# Check source exists
-if [ ! -f "$DB_FILE" ]; then
-    echo "[$(date)] ERROR: DB file not found: $DB_FILE"
+if [ "$MODE" != "full" ] && [ "$MODE" != "incremental" ]; then
+    echo "Usage: $0 [full|incremental]"
     exit 1
 fi
 
-# Copy DB (SQLite is safe to copy while app is running — WAL mode)
-cp "$DB_FILE" "$BACKUP_FILE"
-echo "[$(date)] Backup created: $BACKUP_FILE ($(du -h "$BACKUP_FILE" | cut -f1))"
+mkdir -p "$BACKUP_DIR"
+
+cd "$COMPOSE_DIR"
+docker compose exec -T backend python -m backup "$MODE"
+
+# Copy finished backup files to the host. No --delete: files rotated out of
+# (or wiped from) the container volume stay on the host.
+rsync -a --include='*.full.db.gz' --include='*.inc.gz' --exclude='*' \
+    "$SRC_DIR/" "$BACKUP_DIR/"
 
-# Remove backups older than KEEP_DAYS days
-DELETED=$(find "$BACKUP_DIR" -name "raluma_*.db" -mtime +$KEEP_DAYS -print -delete | wc -l)
+# Host retention: drop chains whose full backup is older than KEEP_DAYS days
+DELETED=0
+while IFS= read -r full; do
+    rm -f "$full" "${full%.full.db.gz}"_*.inc.gz
+    DELETED=$((DELETED + 1))
+done < <(find "$BACKUP_DIR" -name "raluma_*.full.db.gz" -mtime +$KEEP_DAYS)
 if [ "$DELETED" -gt 0 ]; then
-    echo "[$(date)] Removed $DELETED old backup(s)"
+    echo "[$(date)] Removed $DELETED old backup chain(s)"
 fi
 
-TOTAL=$(find "$BACKUP_DIR" -name "raluma_*.db" | wc -l)
-echo "[$(date)] Total backups: $TOTAL"
+TOTAL=$(find "$BACKUP_DIR" -name "raluma_*.full.db.gz" | wc -l)
+echo "[$(date)] Backup ($MODE) done. Full backups on host: $TOTAL"